@@ -148,15 +148,17 @@ __version__ = "0.51"
 # conda install -c conda-forge tqdm numpy pandas scipy matplotlib ipython ipykernel pywavelets python-Levenshtein biopython scikit-learn, seaborn
 
 # Generic libs
-import os, sys, socket, getpass, datetime, uuid, operator, json, gzip, hashlib, re, math
-import inspect, importlib.util, warnings
+import os, sys, socket, getpass, datetime, uuid, operator, json, gzip, hashlib, re, math, zlib
+import inspect, importlib.util, warnings, threading, sqlite3, zipfile, struct, tempfile
 from pathlib import Path
-from collections import defaultdict, UserDict, OrderedDict, Counter
-from collections.abc import Sequence
+from collections import defaultdict, UserDict, OrderedDict
+from collections.abc import Sequence, Mapping
 from types import SimpleNamespace
 #from dataclasses import dataclass
 #from itertools import islice
 from copy import deepcopy
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
 from time import time
 from tqdm import tqdm
 
@@ -166,12 +168,15 @@ import numpy as np
 import pandas as pd
 from numpy.lib.stride_tricks import sliding_window_view
 from scipy.interpolate import interp1d
+from scipy.fft import rfft, irfft, next_fast_len
 from scipy.signal import  medfilt
 from scipy.ndimage import uniform_filter1d
 from scipy.stats import entropy
 from scipy.spatial.distance import jensenshannon
 from scipy.optimize import minimize_scalar
 from scipy.linalg import svd, pinv
+from scipy.sparse import csr_matrix
+from scipy.sparse.linalg import eigsh
 from difflib import SequenceMatcher
 import matplotlib.pyplot as plt
 import matplotlib.cm as cm # from matplotlib.cm import get_cmap
@@ -190,7 +195,8 @@ optional_dependencies = {
     "Bio.Align": {"package": "biopython", "optional": True, "source": "-c conda-forge"},
     "seaborn": {"package": "seaborn", "optional": False, "source":""},
     "sklearn": {"package": "scikit-learn", "optional":False, "source":""},
-    "umap":{"package": "umap-learn", "optional":True, "source":"-c conda-forge"}
+    "umap":{"package": "umap-learn", "optional":True, "source":"-c conda-forge"},
+    "rapidfuzz": {"package": "rapidfuzz", "optional": True, "source": "-c conda-forge"}
 }
 dependency_status = []
 for module, meta in optional_dependencies.items():
@@ -217,14 +223,20 @@ import Levenshtein
 from Bio.Align import PairwiseAligner
 from sklearn.decomposition import PCA
 from sklearn.manifold import MDS
-from sklearn.metrics import pairwise_distances, silhouette_score
+from sklearn.metrics import silhouette_score
 from sklearn.preprocessing import StandardScaler
 from scipy.cluster.hierarchy import linkage, dendrogram, fcluster
-from scipy.spatial.distance import squareform
+from scipy.spatial.distance import squareform, pdist
+from scipy.spatial import cKDTree
 import seaborn as sns
 #from umap import UMAP
+try: # bulk edit distances (installed with python-Levenshtein)
+    from rapidfuzz.process import cdist as rf_cdist
+    from rapidfuzz.distance import Levenshtein as rf_Levenshtein
+except ImportError:
+    rf_cdist = rf_Levenshtein = None
 
-__all__ = ['DNACodes', 'DNAFullCodes', 'DNApairwiseAnalysis', 'DNAsignal', 'DNAsignal_collection', 'DNAstr', 'SinusoidalEncoder', 'generator', 'import_local_module', 'peaks', 'signal', 'signal_collection']
+__all__ = ['AlignmentCache', 'DNACodes', 'DNAFullCodes', 'DNALibraryIndex', 'DNAalignment', 'DNAdistanceStore', 'DNApairwiseAnalysis', 'DNAsegmentAlignment', 'DNAsegments', 'DNAsignal', 'DNAsignal_collection', 'DNAstr', 'SinusoidalEncoder', 'WaveletKernelCache', 'generator', 'import_local_module', 'peaks', 'signal', 'signal_collection']
 
 # %% load dynamically figprint without pythonpath modification or installation
 def import_local_module(name: str, relative_path: str):
@@ -798,7 +810,7 @@ class SinusoidalEncoder:
 
         Parameters
         ----------
-        code : dict
+        code : DNAsegments or dict
             Must contain:
                 - 'letters': str
                 - 'xloc': list of (start, end) tuples
@@ -817,15 +829,14 @@ class SinusoidalEncoder:
         enc = SinusoidalEncoder(d_model=d_part, N=N)
         grouped = {}
         dx = code.get("dx", 1.0)
-        for letter in set(code["letters"]):
-            indices = [i for i, l in enumerate(code["letters"]) if l == letter]
-            starts = np.array([code["xloc"][i][0] for i in indices])
-            widths = np.array([code["widths"][i] for i in indices])
-            heights = np.array([code["heights"][i] for i in indices])
-            emb_start = enc._sin_embed(starts)
-            emb_width = enc._sin_embed(widths)
-            emb_height = enc._sin_embed(heights)
-            grouped[letter] = np.hstack([emb_start, emb_width, emb_height])
+        code = DNAsegments.from_dict(code)
+        starts, widths, heights = code.xloc[:, 0], code.widths, code.heights
+        for c in np.unique(code.codes):
+            indices = code.codes == c
+            emb_start = enc._sin_embed(starts[indices])
+            emb_width = enc._sin_embed(widths[indices])
+            emb_height = enc._sin_embed(heights[indices])
+            grouped[chr(c)] = np.hstack([emb_start, emb_width, emb_height])
         return grouped
 
     @staticmethod
@@ -1115,11 +1126,516 @@ class SinusoidalEncoder:
         return phases
 
 
+# %% Batched multi-scale wavelet transform (engine used by DNAsignal.compute_cwt)
+def _wavelet_kernel(wavelet="mexh", scale=1, precision=12, int_psi=None, x=None):
+    """
+    Return the sampled integrated wavelet used by `pywt.cwt` at a given scale.
+
+    The kernel is built exactly as in `pywt.cwt` (integrated wavelet on 2**precision points,
+    resampled at `scale` and reversed) so that both engines produce the same coefficients.
+
+    Parameters
+    ----------
+    wavelet : str or pywt.ContinuousWavelet
+        PyWavelets-compatible continuous wavelet (default: 'mexh').
+    scale : float
+        Wavelet scale (must be positive).
+    precision : int
+        Length of the integrated wavelet is 2**precision (pywt default: 12).
+    int_psi, x : np.ndarray, optional
+        Precomputed output of `pywt.integrate_wavelet` (avoids recomputing it for each scale).
+
+    Returns
+    -------
+    np.ndarray
+        Reversed, resampled integrated wavelet (1D).
+    """
+    if scale <= 0:
+        raise ValueError(f"scale must be positive not {scale}")
+    if int_psi is None or x is None:
+        if not isinstance(wavelet, (pywt.ContinuousWavelet, pywt.Wavelet)):
+            wavelet = pywt.DiscreteContinuousWavelet(wavelet)
+        if wavelet.complex_cwt:
+            raise ValueError(f"complex wavelets are not supported by the batched engine ({wavelet.name})")
+        int_psi, x = pywt.integrate_wavelet(wavelet, precision=precision)
+    step = x[1] - x[0]
+    j = (np.arange(scale * (x[-1] - x[0]) + 1) / (scale * step)).astype(int)  # floor
+    j = j[j < int_psi.size]
+    return np.asarray(int_psi[j][::-1])
+
+class WaveletKernelCache:
+    """
+    🗃️ WaveletKernelCache
+    Process-wide LRU cache of wavelet kernels and of their FFT spectra.
+
+    A production batch encodes thousands of traces of identical length with the same scales
+    (e.g., [1, 2, 4, 8, 16, 32]). The integrated wavelet, the resampled kernels and their
+    frequency-domain transforms depend only on (wavelet, scale, n_points, dtype) and are computed
+    once, then reused by all `DNAsignal.compute_cwt` calls of the process.
+
+    Entries are evicted in least-recently-used order when either `maxsize` (number of entries)
+    or `maxbytes` (total size of the cached arrays) is exceeded. Cached arrays are read-only.
+
+    Parameters
+    ----------
+    maxsize : int
+        Maximum number of cached entries (default: 512).
+    maxbytes : int
+        Maximum total size of cached arrays in bytes (default: 256 MB).
+
+    Attributes
+    ----------
+    hits, misses : int
+        Cache statistics.
+    nbytes : int
+        Current size of cached arrays in bytes.
+
+    Methods
+    -------
+    integrated_wavelet(wavelet, precision=12)
+        Return the cached output of `pywt.integrate_wavelet`.
+    kernel(wavelet, scale, precision=12)
+        Return the cached kernel used at `scale` (see `_wavelet_kernel`).
+    spectrum(wavelet, scale, n_points, dtype, nfft, precision=12)
+        Return the cached rfft of the derivative kernel and its L2 norm (see `_cwt_batch`).
+    clear()
+        Empty the cache and reset statistics.
+
+    Example
+    -------
+    >>> WaveletKernelCache.default.clear()
+    >>> DNAsignal(S, encode=True)  # kernels are computed and cached
+    >>> WaveletKernelCache.default
+    <WaveletKernelCache: 14 entries, 2.3 MB, hits=0, misses=14>
+    """
+
+    default = None  # process-wide instance used when cache=None (set below)
+
+    def __init__(self, maxsize=512, maxbytes=256 * 2**20):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self._store = OrderedDict()  # key -> (value, nbytes)
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _wavelet_name(wavelet):
+        """Return the name used in cache keys"""
+        return wavelet if isinstance(wavelet, str) else wavelet.name
+
+    def _get(self, key, factory):
+        """Return the cached value for key or create it with factory()"""
+        with self._lock:
+            if key in self._store:
+                self._store.move_to_end(key)
+                self.hits += 1
+                return self._store[key][0]
+        value = factory()
+        arrays = value if isinstance(value, tuple) else (value,)
+        nbytes = sum(a.nbytes for a in arrays if isinstance(a, np.ndarray))
+        for a in arrays:
+            if isinstance(a, np.ndarray):
+                a.flags.writeable = False
+        with self._lock:
+            self.misses += 1
+            if key not in self._store:
+                self._store[key] = (value, nbytes)
+                self.nbytes += nbytes
+            while len(self._store) > 1 and (len(self._store) > self.maxsize or self.nbytes > self.maxbytes):
+                _, (_, evicted) = self._store.popitem(last=False)
+                self.nbytes -= evicted
+        return value
+
+    def integrated_wavelet(self, wavelet="mexh", precision=12):
+        """Return (int_psi, x) as computed by pywt.integrate_wavelet (cached)"""
+        def factory():
+            w = wavelet
+            if not isinstance(w, (pywt.ContinuousWavelet, pywt.Wavelet)):
+                w = pywt.DiscreteContinuousWavelet(w)
+            if w.complex_cwt:
+                raise ValueError(f"complex wavelets are not supported by the batched engine ({w.name})")
+            int_psi, x = pywt.integrate_wavelet(w, precision=precision)
+            return np.asarray(int_psi), np.asarray(x)
+        return self._get(("psi", self._wavelet_name(wavelet), precision), factory)
+
+    def kernel(self, wavelet="mexh", scale=1, precision=12):
+        """Return the resampled integrated wavelet at scale (cached)"""
+        def factory():
+            int_psi, x = self.integrated_wavelet(wavelet, precision)
+            return _wavelet_kernel(wavelet, scale, precision, int_psi=int_psi, x=x)
+        return self._get(("kernel", self._wavelet_name(wavelet), float(scale), precision), factory)
+
+    def spectrum(self, wavelet="mexh", scale=1, n_points=None, dtype=np.float64, nfft=None, precision=12):
+        """
+        Return the spectrum of the derivative kernel used by `_cwt_batch` and its L2 norm (cached).
+
+        Parameters
+        ----------
+        wavelet : str
+            PyWavelets-compatible continuous wavelet.
+        scale : float
+            Wavelet scale.
+        n_points : int
+            Length of the transformed signals.
+        dtype : np.float32 or np.float64
+            Working precision.
+        nfft : int
+            FFT length (common to all scales of a batch, depends on n_points and on the largest kernel).
+        precision : int
+            Precision of the integrated wavelet.
+
+        Returns
+        -------
+        spectrum : np.ndarray (complex, nfft // 2 + 1)
+        norm : float
+        """
+        dtype = np.dtype(dtype)
+        def factory():
+            k = self.kernel(wavelet, scale, precision)
+            if k.size < 2:
+                raise ValueError(f"Selected scale of {scale} too small.")
+            # derivative kernel: coef = -sqrt(scale) * diff(conv(data, k)), cropped by floor((L-2)/2)+1
+            g = -np.sqrt(scale) * np.diff(np.concatenate(([0.0], k, [0.0])))
+            shift = 1 + (k.size - 2) // 2
+            G = np.zeros(nfft, dtype=dtype)
+            G[:g.size - shift] = g[shift:]
+            G[nfft - shift:] = g[:shift]
+            return rfft(G), np.linalg.norm(G)
+        return self._get(("spectrum", self._wavelet_name(wavelet), float(scale), n_points, dtype.str, nfft, precision), factory)
+
+    def clear(self):
+        """Empty the cache and reset statistics"""
+        with self._lock:
+            self._store.clear()
+            self.nbytes = self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._store)
+
+    def __repr__(self):
+        return (f"<WaveletKernelCache: {len(self)} entries, {self.nbytes / 2**20:.1f} MB, "
+                f"hits={self.hits}, misses={self.misses}>")
+
+    def __str__(self):
+        return repr(self)
+
+WaveletKernelCache.default = WaveletKernelCache()
+
+def _cwt_batch(data, scales, wavelet="mexh", precision=12, cache=None, direct_fraction=0.1):
+    """
+    Batched Continuous Wavelet Transform of a 1D signal at several scales in one pass.
+
+    The signal spectrum is computed once, all kernels are padded to a common FFT length, and all
+    scales are inverted with a single batched `irfft`. The finite difference and the centering
+    crop applied by `pywt.cwt` are folded into the kernels (derivative + circular shift), so the
+    first `n_points` samples of each inverse transform are the final coefficients. Kernel spectra
+    are shared across calls via `WaveletKernelCache`.
+
+    Coefficients below the round-off floor of the FFT (eps · log2(nfft) · ‖data‖ · ‖kernel‖) are
+    not resolved by the transform (flat regions, vanishing tails). Those whose window of data is
+    constant are set to 0 (`pywt.cwt` returns them exactly 0); the others are recomputed by direct
+    convolution (see `_cwt_direct`) only where they can change the segmentation, i.e. next to a
+    sign change of the derivative, observed or within the round-off (the ends of such level slopes,
+    e.g. ties at the top of symmetric peaks, are recomputed as well). Above `direct_fraction` of
+    the samples, the whole scale is convolved at once. Both engines thus yield the same DNA codes.
+
+    Parameters
+    ----------
+    data : array-like
+        1D real signal (float32 inputs are transformed in float32, others in float64).
+    scales : list of float
+        Wavelet scales.
+    wavelet : str
+        PyWavelets-compatible continuous wavelet (default: 'mexh').
+    precision : int
+        Precision of the integrated wavelet (see `_wavelet_kernel`).
+    cache : WaveletKernelCache, False or None
+        Kernel cache (None = WaveletKernelCache.default, False = no caching).
+    direct_fraction : float
+        Fraction of recomputed samples above which a scale is convolved as a whole (default: 0.1).
+
+    Returns
+    -------
+    np.ndarray
+        C-contiguous array of shape (n_scales, n_points); row i holds the coefficients at scales[i].
+    """
+    data = np.asarray(data)
+    dtype = np.float32 if data.dtype == np.float32 else np.float64
+    data = data.astype(dtype, copy=False)
+    if data.ndim != 1:
+        raise ValueError(f"data must be 1D not {data.ndim}D")
+    if cache is None:
+        cache = WaveletKernelCache.default
+    elif cache is False:
+        cache = WaveletKernelCache(maxsize=3 * len(scales) + 1, maxbytes=np.inf)  # local, discarded
+    n = data.shape[0]
+    nfft = next_fast_len(n + max(cache.kernel(wavelet, scale, precision).size for scale in scales) + 1, real=True)
+    spectra, norms = zip(*(cache.spectrum(wavelet, scale, n, dtype, nfft, precision) for scale in scales))
+    full = irfft(np.stack(spectra) * rfft(data, nfft), nfft, axis=-1)
+    block = np.ascontiguousarray(full[:, :n], dtype=dtype)
+    # values below the FFT round-off floor are noise: zeros where the data window is constant,
+    # exact values (direct convolution) where the sign of the derivative may change
+    floor = np.finfo(dtype).eps * np.log2(nfft) * np.linalg.norm(data) * np.asarray(norms)
+    # number of value changes along the data padded with zeros (as the convolution), so that
+    # a kernel window is constant when the counts at both of its ends are equal (plain slices)
+    Kmax = max(cache.kernel(wavelet, scale, precision).size for scale in scales)
+    padded = np.concatenate((np.zeros(Kmax + 1, dtype=dtype), data, np.zeros(Kmax + 2, dtype=dtype)))
+    changes = np.concatenate(([0], np.cumsum(padded[1:] != padded[:-1])))
+    for i, scale in enumerate(scales):
+        kernel = cache.kernel(wavelet, scale, precision).astype(dtype)
+        K = kernel.size
+        if K < 2:  # pywt.cwt rejects such small scales, keep the FFT values
+            continue
+        weak = np.abs(block[i]) <= floor[i]
+        f = (K - 2) // 2  # coef[j] depends on data[j+f-K+1 ... j+f+1] (see _cwt_direct)
+        flat = changes[Kmax + f + 2:Kmax + f + 2 + n] == changes[Kmax + f - K + 2:Kmax + f - K + 2 + n]
+        block[i, weak & flat] = 0.0  # identical windows: the direct convolution gives exactly 0
+        # weak samples next to a sign change of the derivative, observed or within round-off
+        slope = np.diff(block[i])
+        unsure = np.abs(slope) <= 2 * floor[i]  # sign of the slope below the round-off
+        turn = np.zeros(n, dtype=bool)  # the derivative may change sign at sample q
+        turn[1:-1] = np.sign(slope[1:]) != np.sign(slope[:-1])
+        turn[1:] |= unsure
+        turn[:-1] |= unsure
+        near = turn.copy()
+        near[1:] |= turn[:-1]
+        near[:-1] |= turn[1:]
+        level = np.zeros(n, dtype=bool)  # ends of slopes below the round-off (plateaus, ties)
+        level[1:] |= unsure
+        level[:-1] |= unsure
+        idx = np.flatnonzero(~flat & ((weak & near) | level))
+        if idx.size > direct_fraction * n:
+            block[i] = _cwt_direct(data, kernel, scale, np.arange(n))  # one convolution of the whole scale
+        elif idx.size:
+            block[i, idx] = _cwt_direct(data, kernel, scale, idx, block[i, idx])
+    return block
+
+
+def _cwt_direct(data, kernel, scale, idx, values=None):
+    """
+    CWT coefficients of `data` at the indices `idx` computed by direct convolution (as `pywt.cwt`).
+
+    Close indices (gaps shorter than the kernel, or than 2**15 / kernel length for short kernels)
+    are grouped in runs, and each run is obtained from `np.convolve` over the slice of data it
+    depends on, so that the cost scales with the number of requested coefficients, not with the
+    length of the signal.
+
+    Parameters
+    ----------
+    data : np.ndarray
+        1D signal.
+    kernel : np.ndarray
+        Reversed, resampled integrated wavelet (see `_wavelet_kernel`), in the dtype of data.
+    scale : float
+        Wavelet scale.
+    idx : np.ndarray of int
+        Sorted indices of the requested coefficients.
+    values : np.ndarray or None
+        Current coefficients at idx (e.g. from the FFT), returned when the kernel is too short
+        for a direct convolution (default: zeros).
+
+    Returns
+    -------
+    np.ndarray
+        Coefficients at idx.
+    """
+    n, K = data.shape[0], kernel.size
+    out = np.zeros(idx.size, dtype=data.dtype) if values is None else np.array(values, dtype=data.dtype)
+    if K < 2:  # pywt.cwt rejects such small scales, keep the given values
+        return out
+    f = (K - 2) // 2  # crop applied by pywt.cwt: coef[i] = -sqrt(scale) * (conv[i+f+1] - conv[i+f])
+    factor = -np.sqrt(scale)
+    cuts = np.flatnonzero(np.diff(idx) > max(K, 2**15 // K)) + 1  # short gaps: one call is cheaper
+    for r0, r1 in zip(np.r_[0, cuts].tolist(), np.r_[cuts, idx.size].tolist()):
+        a, b = int(idx[r0]), int(idx[r1 - 1])
+        lo, hi = a + f - K + 1, b + f + 2
+        if lo >= 0 and hi <= n:  # conv[a+f ... b+f+1] overlap the kernel fully
+            conv = np.convolve(data[lo:hi], kernel, mode="valid")
+        else:
+            lo, hi = max(0, lo), min(n, hi)
+            conv = np.convolve(data[lo:hi], kernel)[a + f - lo:b + f + 2 - lo]
+        if r1 - r0 == 1:
+            out[r0] = factor * (conv[1] - conv[0])
+        else:
+            out[r0:r1] = (factor * (conv[1:] - conv[:-1]))[idx[r0:r1] - a]
+    return out
+
+
 # %% Low-Level classes to store code and codefull DNA
+class DNAsegments(Mapping):
+    """
+    🧬 DNAsegments
+    Compact, columnar table of the symbolic segments encoded at one scale (array-backed).
+
+    Each segment is stored as one row across NumPy columns instead of one Python object per
+    segment. The table keeps the dict-style read access of the legacy `codes[scale]` entries
+    (keys: 'letters', 'widths', 'heights', 'xloc', 'iloc', 'dx'), so that `code['letters']`,
+    `code['xloc'][i][0]` or `code.get('dx')` work unchanged.
+
+    Columns
+    -------
+    codes : np.ndarray (uint8)
+        ASCII codes of the letters (ABCXYZ_).
+    start, end : np.ndarray (int32)
+        Index bounds of each segment (iloc); `end` is exclusive for the last segment only.
+    widths, heights : np.ndarray (float32 or float64)
+        x-span and y-delta of each segment.
+
+    Derived fields (computed on access)
+    -----------------------------------
+    letters : str
+        Symbolic sequence (decoded once from `codes` and cached).
+    iloc : np.ndarray (n, 2)
+        Columns (start, end).
+    xloc : np.ndarray (n, 2)
+        Columns (x_start, x_end), read from the shared x-array (or derived from `dx`).
+    n : int
+        Number of segments.
+    nbytes : int
+        Memory used by the columns.
+    runs : tuple
+        Run-length form (codes, widths in samples).
+
+    Methods
+    -------
+    align(other, band=None, anchors=None, ..., expand=False)
+        Width-aware alignment of the segments (DNAsegmentAlignment, full resolution on request).
+
+    Example
+    -------
+    >>> code = dna.codes[4]            # DNAsegments
+    >>> code['letters']                # 'YAZBYAZB...'
+    >>> code.codes                     # array([89, 65, 90, 66, ...], dtype=uint8)
+    >>> dict(code)                     # legacy dict view
+    """
+
+    _keys = ('letters', 'widths', 'heights', 'xloc', 'iloc', 'dx')
+
+    def __init__(self, codes, start, end, widths, heights, x=None, dx=1.0, dtype=np.float64):
+        self.codes = np.asarray(codes, dtype=np.uint8)
+        self.start = np.asarray(start, dtype=np.int32)
+        self.end = np.asarray(end, dtype=np.int32)
+        self.widths = np.asarray(widths, dtype=dtype)
+        self.heights = np.asarray(heights, dtype=dtype)
+        self.x = x # shared with the owner (not copied)
+        self.dx = dx
+        self._xloc = None # explicit x bounds (legacy entries only)
+        self._letters = None
+
+    @classmethod
+    def from_dict(cls, code, dtype=np.float64):
+        """Build a DNAsegments table from a legacy dict entry (letters, widths, heights, iloc, xloc, dx)"""
+        if isinstance(code, DNAsegments):
+            return code
+        iloc = np.asarray(code["iloc"], dtype=np.int32).reshape(-1, 2)
+        obj = cls(np.frombuffer(str(code["letters"]).encode("ascii"), dtype=np.uint8),
+                  iloc[:, 0], iloc[:, 1], code["widths"], code["heights"],
+                  dx=code.get("dx", 1.0), dtype=dtype)
+        obj._xloc = np.asarray(code["xloc"], dtype=dtype).reshape(-1, 2)
+        return obj
+
+    @property
+    def n(self):
+        """Number of segments"""
+        return self.codes.shape[0]
+
+    @property
+    def letters(self):
+        """Symbolic sequence as str (cached)"""
+        if self._letters is None:
+            self._letters = self.codes.tobytes().decode("ascii")
+        return self._letters
+
+    @property
+    def iloc(self):
+        """(n, 2) array of index bounds"""
+        return np.column_stack((self.start, self.end))
+
+    @property
+    def xloc(self):
+        """(n, 2) array of x bounds"""
+        if self._xloc is not None:
+            return self._xloc
+        last = self.end.copy()
+        if last.size:
+            last[-1] -= 1 # the last segment includes its end point
+        if self.x is None:
+            return np.column_stack((self.start * self.dx, last * self.dx))
+        return np.column_stack((self.x[self.start], self.x[last]))
+
+    @property
+    def nbytes(self):
+        """Memory used by the columns (bytes)"""
+        return sum(a.nbytes for a in (self.codes, self.start, self.end, self.widths, self.heights))
+
+    @property
+    def runs(self):
+        """Run-length form (codes, widths) with widths in samples (as expanded by encode_dna_full)"""
+        return self.codes, np.maximum(1, self.end.astype(np.int64) - self.start)
+
+    def align(self, other, band=None, anchors=None, match_score=1.0, mismatch_score=-1.0, gap_score=-1.0,
+              max_shift=None, expand=False):
+        """
+        Align the segments of self with those of other (width-aware, run-length alignment).
+
+        Each segment is a run of its letter over its width in samples. Runs are aligned as wholes
+        (see `_rle_align`), which is much cheaper than aligning the full-resolution strings.
+
+        Parameters
+        ----------
+        other : DNAsegments (or legacy dict entry)
+            Reference segments.
+        band : int or None
+            Half-width of the band in segments (None = full DP).
+        anchors : None, 'motifs' or list of (i_other, j_self)
+            Anchor segments of the band.
+        match_score, mismatch_score, gap_score : float
+            Scores per sample (default: 1, -1, -1).
+        max_shift : int or None
+            Maximum distance (in segments) between paired motifs (anchors='motifs').
+        expand : bool
+            If True, return the full-resolution DNAalignment instead of the run-level result.
+
+        Returns
+        -------
+        DNAsegmentAlignment (or DNAalignment if expand is True)
+        """
+        other = DNAsegments.from_dict(other)
+        opts = dict(band=band, anchors=anchors, match_score=match_score, mismatch_score=mismatch_score,
+                    gap_score=gap_score, max_shift=max_shift)
+        result = _rle_align(*other.runs, *self.runs, engineOpts=opts, **opts)
+        return result.expand() if expand else result
+
+    def __getitem__(self, key):
+        if key not in self._keys:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_letters"] = None # recomputed on demand
+        return state
+
+    def __repr__(self):
+        preview = self.letters[:24] + ("..." if self.n > 24 else "")
+        return f"<DNAsegments: {self.n} segments '{preview}', {self.nbytes} bytes>"
+
+    def __str__(self):
+        return repr(self)
+
 class DNACodes(UserDict):
     """
     🧬 DNACodes
     Dictionary-like container for symbolic signal encodings at multiple scales.
+    Values are `DNAsegments` tables (or legacy dicts of lists) indexed by scale.
 
     Attributes
     ----------
@@ -1595,8 +2111,13 @@ class DNAsignal:
         Dictionary-like container of full-resolution symbolic strings per scale.
     scales : array-like
         Set of scales used in the Continuous Wavelet Transform (powers of 2 by default).
+    cwt_block : np.ndarray
+        Contiguous (n_scales, n_points) array of CWT coefficients (rows follow `scales`).
+    cwt_coeffs : dict[int, np.ndarray]
+        CWT coefficients by scale (views into `cwt_block`).
     transforms : signal_collection
-        Stores the CWT-transformed signals, each as a `signal` object, indexed by scale.
+        CWT-transformed signals, each as a `signal` object, indexed by scale
+        (built lazily from `cwt_coeffs` on first access).
     codes : dict[int, DNAstr]
         Symbolic codes by scale level. Each is a `DNAstr` object representing
         the symbolic sequence at that scale.
@@ -1617,9 +2138,9 @@ class DNAsignal:
     -------
     normalize_signal(mode="zscore+shift")
         Normalizes the internal signal (preserves positivity).
-    compute_cwt(scales=None, normalize=False)
-        Computes the Continuous Wavelet Transform using the Ricker wavelet
-        and stores the transformed signals in `transforms`.
+    compute_cwt(scales=None, apply_filter=False, wavelet="mexh", method="fft")
+        Computes the Continuous Wavelet Transform using the Ricker wavelet (all scales in one
+        batched FFT pass) and stores the transformed signals in `transforms`.
     sparsify_cwt(self, scale: Union[int, float], threshold: float, inplace: bool = True)
         Zero out wavelet coefficients below a threshold for a specific scale.
     encode_dna()
@@ -1665,6 +2186,8 @@ class DNAsignal:
         Convert signal into triplet-based symbolic encoding (per scale).
     encode_dna_full(scales=None, resolution='index', repeat=True, n_points=None)
         Generate full-resolution DNA strings by repeating letters (to `codesfull`).
+    encode_all(scales=None, apply_filter=False, wavelet="mexh", resolution='index', ...)
+        Fused CWT + segmentation + full strings for all scales in one pass (`codes` and `codesfull`).
 
     Methods: Sinusoidal Encoding
     ----------------------------
@@ -1739,22 +2262,26 @@ class DNAsignal:
         self.dtype = dtype
         self.filtered_signal = None
         self.scales = []
-        self.cwt_coeffs = {}  # scale -> array
+        self.cwt_coeffs = {}  # scale -> array (view into cwt_block)
+        self.cwt_block = None # (n_scales, n_points) array
+        self._transforms = None # lazy signal_collection (see transforms)
         self.codes = DNACodes()  # dict-like[scale]-> {letters, widths, heights}
 
         # encode and plots on request
         if plot and "plot_signals" in plotter:
             self.plot_signals()
         if encode:
-            self.compute_cwt(scales=scales) # minimum encoder
+            if "encode_dna_full" in encoder:
+                self.encode_all(scales=scales) # fused CWT + codes + codesfull
+            else:
+                self.compute_cwt(scales=scales) # minimum encoder
+                if "encode_dna" in encoder:
+                    self.encode_dna(scales=scales)
             if plot and "plot_transforms" in plotter:
                 self.plot_transforms()
-            if ("encode_dna" in encoder) or ("encode_dna_full" in encoder):
-                self.encode_dna(scales=scales)
-                if plot and "plot_codes" in plotter:
-                    self.plot_codes(scales=scales)
-            if ("encode_dna_full" in encoder):
-                self.encode_dna_full()
+            if plot and "plot_codes" in plotter and self.codes:
+                for scale in self.codes:
+                    self.plot_codes(scale)
 
     def normalize_signal(self, mode="zscore+shift"):
         """
@@ -1857,7 +2384,7 @@ class DNAsignal:
         s[s < threshold] = 0
         return s
 
-    def compute_cwt(self, scales=None, apply_filter=False, wavelet="mexh"):
+    def compute_cwt(self, scales=None, apply_filter=False, wavelet="mexh", method="fft"):
         """
         Compute Continuous Wavelet Transform (CWT) using the Mexican Hat wavelet.
 
@@ -1870,16 +2397,25 @@ class DNAsignal:
 
         wavelet : str (default='mexh')
             The name of the PyWavelets-compatible wavelet.
+        method : {'fft', 'pywt'} (default='fft')
+            'fft' computes all scales in one pass with the batched FFT engine (`_cwt_batch`).
+            'pywt' calls `pywt.cwt` scale by scale (direct convolution, legacy behavior).
+
         Sets
         ----
         self.scales : list
             The list of actual scales used.
         self.filtered_signal : ndarray
             Filtered or raw signal used for CWT.
+        self.cwt_block : ndarray
+            Contiguous (n_scales, n_points) array of coefficients (rows ordered as self.scales).
         self.cwt_coeffs : dict
-            Dictionary mapping each scale to its 1D coefficient array.
-        self.transforms : signal_collection
-            Collection of `signal` objects storing the transformed signals for each scale.
+            Dictionary mapping each scale to its 1D coefficient array (a view into cwt_block).
+
+        Notes
+        -----
+        `self.transforms` (collection of `signal` objects) is not built here: it is created
+        lazily from `cwt_coeffs` when first accessed (plotting, export).
         """
         if scales is None:
             scales = [2 ** i for i in range(5)]
@@ -1890,19 +2426,63 @@ class DNAsignal:
             self.filtered_signal = self.apply_baseline_filter(self.signal,delta_t=self.sampling_dt)
         else:
             self.filtered_signal = self.signal
-        self.transforms = signal_collection()
-        for scale in self.scales:
-            coef, _ = pywt.cwt(self.filtered_signal, [scale], wavelet)
-            self.cwt_coeffs[scale] = coef[0]  # Access directly via scale
-            sig = signal(
-                x=self.x.copy(),
-                y=coef[0],
-                name=f"CWT_scale_{scale}",
-                x_label="x",
-                y_label="CWT amplitude",
-                y_unit="a.u.",
-                source="CWT")
-            self.transforms.append(sig)
+        if method == "fft":
+            self.cwt_block = _cwt_batch(self.filtered_signal, self.scales, wavelet)
+        elif method == "pywt":
+            self.cwt_block, _ = pywt.cwt(self.filtered_signal, self.scales, wavelet)
+        else:
+            raise ValueError(f'method must be "fft" or "pywt" not "{method}"')
+        for i, scale in enumerate(self.scales):
+            self.cwt_coeffs[scale] = self.cwt_block[i]  # Access directly via scale (view)
+        self._transforms = None # signal wrappers are created on first access (see transforms)
+
+    @property
+    def transforms(self):
+        """
+        CWT-transformed signals as a `signal_collection` (one `signal` per scale).
+
+        The collection is a plotting/export convenience layer built lazily from `cwt_coeffs` on
+        first access (x is shared, not copied) and cached until the next `compute_cwt()` or
+        `sparsify_cwt()`. Headless encoding never creates these `signal` objects.
+
+        Raises
+        ------
+        AttributeError
+            If the CWT has not been computed yet.
+        """
+        if getattr(self, "_transforms", None) is None:
+            if getattr(self, "cwt_block", None) is None:
+                raise AttributeError("No transformed signals found. Run `compute_cwt()` first.")
+            self._transforms = signal_collection(*(
+                signal(
+                    x=self.x,
+                    y=self.cwt_coeffs[scale],
+                    name=f"CWT_scale_{scale}",
+                    x_label="x",
+                    y_label="CWT amplitude",
+                    y_unit="a.u.",
+                    source="CWT")
+                for scale in self.scales))
+        return self._transforms
+
+    @transforms.setter
+    def transforms(self, value):
+        self._transforms = value
+
+    def __setstate__(self, state):
+        """Restore pickled DNAsignals, including those saved before the (n_scales, n_points) CWT block"""
+        if "transforms" in state:  # former instance attribute, now the lazy `transforms` property
+            state["_transforms"] = state.pop("transforms")
+        state.setdefault("_transforms", None)
+        if "cwt_block" not in state:
+            coeffs, scales = state.get("cwt_coeffs") or {}, state.get("scales") or []
+            if scales and all(scale in coeffs for scale in scales):
+                block = np.vstack([np.asarray(coeffs[scale]) for scale in scales])
+                state["cwt_coeffs"] = {**coeffs, **{scale: block[i] for i, scale in enumerate(scales)}}
+                state["cwt_block"] = block
+            else:
+                state["cwt_block"] = None
+        self.__dict__.update(state)
 
     def pseudoinverse(self, scales=None, rank=None, return_weights=False, name=None):
         """
@@ -2018,14 +2598,8 @@ class DNAsignal:
         for s in target_scales:
             coeffs = target.cwt_coeffs[s]
             thres = threshold if threshold is not None else 0.01 * np.max(np.abs(coeffs))
-            target.cwt_coeffs[s] = np.where(np.abs(coeffs) < thres, 0.0, coeffs)
-
-            if hasattr(target, "transforms"):
-                for sig in target.transforms:
-                    if sig.name == f"CWT_scale_{s}":
-                        sig.y = target.cwt_coeffs[s]
-                        sig._events("sparsify", {"scale": s, "threshold": thres})
-                        break
+            coeffs[np.abs(coeffs) < thres] = 0.0 # in place (view into cwt_block)
+        target._transforms = None # rebuilt from the sparsified coefficients on next access
 
         return None if inplace else target
 
@@ -2052,53 +2626,32 @@ class DNAsignal:
 
         Sets
         ----
-        self.codes : dict
-            Dictionary mapping each scale to a struct with:
+        self.codes : DNACodes
+            Dictionary mapping each scale to a `DNAsegments` table read as a struct with:
                 - letters : str (symbolic encoding)
-                - widths  : list of float (x-span of each segment)
-                - heights : list of float (y-delta of each segment)
-                - iloc    : list of index-pair tuples (start, end+1)
-                - xloc    : list of x-span tuples (x_start, x_end)
+                - widths  : array of float (x-span of each segment)
+                - heights : array of float (y-delta of each segment)
+                - iloc    : (n, 2) array of index pairs (start, end+1)
+                - xloc    : (n, 2) array of x-spans (x_start, x_end)
                 - dx      : segment step (dx)
         """
         if scales is None:
             scales = self.scales
         if not isinstance(scales,(list,tuple)):
             scales = [scales]
-        if not hasattr(self, 'cwt_coeffs') or not self.cwt_coeffs:
+        if not hasattr(self, 'cwt_coeffs') or any(scale not in self.cwt_coeffs for scale in scales):
             self.compute_cwt(scales)
         dx = self.x[1]-self.x[0]
-        for scale in scales:
-            coef = self.cwt_coeffs[scale]
-            letters, widths, heights, iloc, xloc = [], [], [], [], []
-            monotonic = np.diff(coef)
-            mono_sign = np.sign(monotonic)
-            sign_changes = np.where(np.diff(mono_sign) != 0)[0] + 1  # +1 because diff shortens by 1
-            start_idx = 0
-            segment_ends = np.append(sign_changes, len(coef) - 1)
-            for count, idx in enumerate(segment_ends):
-                xsegment = self.x[start_idx:idx + 1]
-                segment = coef[start_idx:idx + 1]
-                if len(segment) < 2:
-                    letters.append('_')
-                else:
-                    start, end = segment[0], segment[-1]
-                    letter = self._get_letter(start, end)
-                    letters.append(letter)
-                widths.append(xsegment[-1] - xsegment[0])
-                heights.append(segment[-1] - segment[0])
-                xloc.append((xsegment[0],xsegment[-1]))
-                is_last = count == len(segment_ends) - 1
-                iloc.append((start_idx, idx + 1 if is_last else idx))
-                start_idx = idx #idx + 1 (segments are continguous)
-            # update codes
-            self.codes[scale] = {'letters': ''.join(letters),
-                                 'widths': widths,
-                                 'heights': heights,
-                                 'xloc':xloc,
-                                 'iloc':iloc,
-                                 'dx':dx}
-            return self.codes # for chaining
+        # all scales are segmented in a single pass over the (n_scales, n_points) block
+        if list(scales) == list(self.scales) and self.cwt_block is not None:
+            block = self.cwt_block
+        else:
+            block = np.vstack([self.cwt_coeffs[scale] for scale in scales])
+        for scale, seg in zip(scales, self._segment_monotonic(block, self.x)):
+            # update codes (columnar table, dict-style access)
+            self.codes[scale] = DNAsegments(seg.letters, seg.start, seg.end, seg.widths, seg.heights,
+                                            x=self.x, dx=dx, dtype=self.dtype)
+        return self.codes # for chaining
 
     def sinencode_dna(self, scales=None, d_part=32, N=10000):
         """
@@ -2183,49 +2736,106 @@ class DNAsignal:
         elif not isinstance(scales, (list, tuple)):
             raise TypeError("scales must be a list, int, or None")
 
-        if not hasattr(self, 'codes') or not self.codes:
-            self.encode_dna(scales)
+        missing = [scale for scale in scales if scale not in self.codes]
+        if missing:
+            self.encode_dna(missing) # all missing scales in one call
 
+        if resolution == 'x' and n_points is None and scales:
+            n_points = self._full_points(self.codes[scales[0]]) # shared by all scales
         result = DNAFullCodes()
         for scale in scales:
-            if scale not in self.codes:
-                self.encode_dna([scale])
-            code = self.codes[scale]
-            if not repeat:
-                result[scale] = code['letters']
-                continue
-            if resolution == 'index':
-                sequence = ''.join(
-                    letter * max(1, (j - i)) for letter, (i, j) in zip(code['letters'], code['iloc'])
-                )
-            elif resolution == 'x':
-                if n_points is None:
-                    total_span = sum(x2 - x1 for x1, x2 in code['xloc'])
-                    n_points = int(np.ceil(total_span * 10))  # adjustable density
-                x_start = code['xloc'][0][0]
-                x_end = code['xloc'][-1][1]
-                grid = np.linspace(x_start, x_end, n_points, endpoint=True)
-                centers = [(x1 + x2) / 2 for x1, x2 in code['xloc']]
-                # Encode letters as integers
-                unique_letters = list(OrderedDict.fromkeys(code['letters']))
-                letter_to_int = {ch: i for i, ch in enumerate(unique_letters)}
-                int_to_letter = {i: ch for ch, i in letter_to_int.items()}
-
-                int_vals = [letter_to_int[ch] for ch in code['letters']]
-                interp_func = interp1d(centers, int_vals, kind='nearest',
-                                       bounds_error=False, fill_value=int_vals[-1])
-                interpolated = np.round(interp_func(grid)).astype(int)
-                sequence = ''.join(int_to_letter[i] for i in interpolated)
-            else:
-                raise ValueError("resolution must be either 'index' or 'x'")
-            result[scale] = DNAstr(sequence,
-                                   dx=code["dx"],
-                                   iloc=(code["iloc"][0][0],code["iloc"][-1][-1]),
-                                   xloc=(code["xloc"][0][0],code["xloc"][-1][-1]),
-                                   x_label=self.x_label, x_unit=self.x_unit)
+            result[scale] = self._full_string(self.codes[scale], resolution=resolution,
+                                              repeat=repeat, n_points=n_points)
         self.codesfull = result
         return self.codesfull # for chaining
 
+    @staticmethod
+    def _full_points(code):
+        """
+        Default number of points of the x-resolution strings (~10 points per x-unit).
+
+        The spans of the segments are summed in order (as Python floats) so that the rounding,
+        and thus the length of the strings, is the same as in the original builder.
+        """
+        xloc = DNAsegments.from_dict(code).xloc
+        total_span = sum((xloc[:, 1] - xloc[:, 0]).tolist())
+        return int(np.ceil(total_span * 10))  # adjustable density
+
+    def _full_string(self, code, resolution='index', repeat=True, n_points=None):
+        """
+        Build the full-resolution DNA-like string of one scale from its segment table.
+
+        Parameters
+        ----------
+        code : DNAsegments or dict
+            Segment table of one scale (entry of self.codes).
+        resolution, repeat, n_points :
+            See `encode_dna_full()`.
+
+        Returns
+        -------
+        DNAstr or str
+            Full string (DNAstr), or the segment letters (str) if repeat is False.
+        """
+        code = DNAsegments.from_dict(code)
+        if not repeat:
+            return code['letters']
+        if resolution == 'index':
+            # each letter repeated over its index span (at least once)
+            codes = np.repeat(code.codes, np.maximum(1, code.end - code.start))
+        elif resolution == 'x':
+            xloc = code.xloc
+            if n_points is None:
+                n_points = self._full_points(code)
+            grid = np.linspace(xloc[0, 0], xloc[-1, 1], n_points, endpoint=True)
+            centers = xloc.mean(axis=1)
+            # nearest segment center (same rule as interp1d(kind='nearest'), last letter outside)
+            idx = np.searchsorted((centers[1:] + centers[:-1]) / 2, grid, side='left')
+            idx[(grid < centers[0]) | (grid > centers[-1])] = code.n - 1
+            codes = code.codes[idx]
+        else:
+            raise ValueError("resolution must be either 'index' or 'x'")
+        return DNAstr.from_codes(codes,
+                      dx=code["dx"],
+                      iloc=(int(code["iloc"][0][0]),int(code["iloc"][-1][-1])),
+                      xloc=(float(code["xloc"][0][0]),float(code["xloc"][-1][-1])),
+                      x_label=self.x_label, x_unit=self.x_unit)
+
+    def encode_all(self, scales=None, apply_filter=False, wavelet="mexh",
+                   resolution='index', repeat=True, n_points=None):
+        """
+        Fused pipeline stage: CWT + segmentation + full strings for all scales in one pass.
+
+        The CWT of all scales is computed as one (n_scales, n_points) block (`compute_cwt`),
+        the block is segmented in a single vectorized pass, and `codes` and `codesfull` are
+        filled together from the same segment tables (no lazy re-entry per scale).
+
+        Parameters
+        ----------
+        scales : list, int, or None
+            Scales to encode (default: see `compute_cwt()`).
+        apply_filter, wavelet :
+            See `compute_cwt()`.
+        resolution, repeat, n_points :
+            See `encode_dna_full()`.
+
+        Returns
+        -------
+        DNAsignal
+            self (for chaining), with `cwt_coeffs`, `codes` and `codesfull` set.
+        """
+        self.compute_cwt(scales=scales, apply_filter=apply_filter, wavelet=wavelet)
+        dx = self.x[1]-self.x[0]
+        self.codesfull = DNAFullCodes()
+        for scale, seg in zip(self.scales, self._segment_monotonic(self.cwt_block, self.x)):
+            self.codes[scale] = DNAsegments(seg.letters, seg.start, seg.end, seg.widths, seg.heights,
+                                            x=self.x, dx=dx, dtype=self.dtype)
+            if resolution == 'x' and n_points is None:
+                n_points = self._full_points(self.codes[scale]) # first scale, shared by all scales
+            self.codesfull[scale] = self._full_string(self.codes[scale], resolution=resolution,
+                                                      repeat=repeat, n_points=n_points)
+        return self # for chaining
+
     def sinencode_dna_full(self, d_model=96, N=10000, operation=None):
         """
         🌀 Encode full-resolution DNA-like strings into sinusoidal embeddings grouped by letter.
@@ -2312,8 +2922,6 @@ class DNAsignal:
         signal
             An approximate `signal` object reconstructed from symbolic information.
         """
-        from sig2dna3.signal import signal  # Adjust path to your actual signal module
-
         if not hasattr(self, codes_attr):
             raise AttributeError(f"DNAsignal has no attribute '{codes_attr}'")
 
@@ -2328,12 +2936,12 @@ class DNAsignal:
         if isinstance(code, str):  # from codesfull
             raise TypeError("Cannot reconstruct signal from 'codesfull' directly. Use decode + pattern extraction.")
 
-        x_centers = [(x1 + x2) / 2 for x1, x2 in code["xloc"]]
-        heights = code["heights"]
+        code = DNAsegments.from_dict(code)
+        x_centers = code.xloc.mean(axis=1)
 
         return signal(
-            x=np.array(x_centers),
-            y=np.array(heights),
+            x=x_centers,
+            y=code.heights,
             name=f"decoded@{scale}",
             type="synthetic",
             x_label=self.x_label,
@@ -2377,6 +2985,74 @@ class DNAsignal:
             return 'C' if e > s else 'X'
         return '_'
 
+    @staticmethod
+    def _segment_monotonic(coef, x=None, tol=1e-12):
+        """
+        Vectorized run-length segmentation of transformed signals into monotonic segments.
+
+        Segment boundaries are the points where the sign of diff(coef) changes. Consecutive
+        segments share their boundary point (segments are contiguous). Letters follow the rules
+        of `_get_letter` applied to the first and last values of each segment.
+
+        A 2D block (n_scales, n_points) is segmented in a single pass: boundaries and letters of
+        all rows are computed at once, then split per row.
+
+        Parameters
+        ----------
+        coef : np.ndarray
+            1D transformed signal (e.g., CWT coefficients at one scale) or 2D block of such signals.
+        x : np.ndarray or None
+            Sampling positions (default: indices).
+        tol : float
+            Values with |value| <= tol are considered as 0 (see `_get_letter`).
+
+        Returns
+        -------
+        SimpleNamespace (list of SimpleNamespace if coef is 2D)
+            with fields (all NumPy arrays, one entry per segment):
+                - letters : uint8 ASCII codes of the letters (ABCXYZ_)
+                - start, end : index bounds (iloc), end is exclusive for the last segment only
+                - xstart, xend : x bounds (xloc)
+                - widths : x[end] - x[start]
+                - heights : coef[end] - coef[start]
+        """
+        coef = np.asarray(coef)
+        block = np.atleast_2d(coef)
+        m, n = block.shape
+        if x is None:
+            x = np.arange(n)
+        # segment ends: sign changes of the derivative + last point of each row
+        isend = np.zeros((m, n), dtype=bool)
+        isend[:, 1:n-1] = np.diff(np.sign(np.diff(block, axis=1)), axis=1) != 0
+        isend[:, n-1] = True
+        rows, ends = np.nonzero(isend)
+        first = np.concatenate(([0], np.cumsum(isend.sum(axis=1))[:-1])) # first segment of each row
+        starts = np.empty_like(ends)
+        starts[1:] = ends[:-1]
+        starts[first] = 0
+        cs, ce = block[rows, starts], block[rows, ends]
+        s = np.where(np.abs(cs) > tol, cs, 0.0)
+        e = np.where(np.abs(ce) > tol, ce, 0.0)
+        letters = np.select(
+            [s == e,
+             (s < 0) & (e > 0),
+             (s > 0) & (e < 0),
+             (s <= 0) & (e <= 0) & (e > s),
+             (s <= 0) & (e <= 0),
+             (s >= 0) & (e >= 0) & (e > s),
+             (s >= 0) & (e >= 0)],
+            [ord('_'), ord('A'), ord('Z'), ord('B'), ord('Y'), ord('C'), ord('X')],
+            default=ord('_')).astype(np.uint8)
+        letters[ends == starts] = ord('_') # single-point segment (n < 2)
+        stop = ends.copy()
+        stop[np.append(first[1:] - 1, ends.size - 1)] += 1 # the last segment includes its last point
+        xs, xe = x[starts], x[ends]
+        fields = dict(letters=letters, start=starts, end=stop, xstart=xs, xend=xe,
+                      widths=xe - xs, heights=ce - cs)
+        split = {k: np.split(v, first[1:]) for k, v in fields.items()}
+        segments = [SimpleNamespace(**{k: split[k][i] for k in fields}) for i in range(m)]
+        return segments if coef.ndim > 1 else segments[0]
+
     @staticmethod
     def _get_triangle_from_letter(letter,x0,y0,w,h):
         """returns the triangle (counter-clockwise, x are incr) """
@@ -2608,8 +3284,6 @@ class DNAsignal:
             Specific scales or names to plot.
         kwargs : passed to `signal_collection.plot`
         """
-        if not hasattr(self, "transforms"):
-            raise AttributeError("No transformed signals found. Run `compute_cwt()` first.")
         self.transforms.plot(indices=indices, title=f"CWT Transforms: {self.name}", **kwargs)
 
     def plot_codes(self, scale, ax=None, colormap=None, alpha=0.4):
@@ -2648,9 +3322,9 @@ class DNAsignal:
         # Retrieve segment data
         code_data = self.codes[scale]
         letters = code_data['letters']
-        widths = code_data['widths']
-        heights = code_data['heights']
-        xloc = code_data['xloc']
+        widths = np.asarray(code_data['widths'])
+        heights = np.asarray(code_data['heights'])
+        xloc = np.asarray(code_data['xloc'])
         coef = self.cwt_coeffs[scale]
         x = self.x if hasattr(self, 'x') and self.x is not None else np.arange(len(coef))
 
@@ -2666,7 +3340,7 @@ class DNAsignal:
             repeatedletter_withnext = letter if i<(nletters-1) else False
             repeated = repeatedletter_withprevious or repeatedletter_withnext
             y0 = last_y if cross_flags[letter] or repeated else 0.0
-            x0, w, h = xloc[i][0], widths[i], heights[i]
+            x0, w, h = xloc[i, 0], widths[i], heights[i]
             last_y = y0 + h
             x,y = self._get_triangle_from_letter(letter,x0,y0,w,h)
             triangle = [[x[0], y[0]], [x[1], y[1]], [x[2], y[2]], [x[0], y[0]]]
@@ -2725,9 +3399,32 @@ class DNAsignal:
         plt.tight_layout()
         return fig
 
+    @staticmethod
+    def _use_pool(n_jobs, executor):
+        """True if a pairwise builder must run in parallel"""
+        return executor is not None or (n_jobs is not None and n_jobs != 1)
+
+    @staticmethod
+    def _pairwise_items(list_DNAsignals, scale):
+        """Compact items shipped to workers: uint8 codes and (dx, engine, engineOpts) of codesfull[scale]"""
+        codes = [o.codesfull[scale] for o in list_DNAsignals]
+        return [c.codes for c in codes], [(c.dx, c.engine, c.engineOpts) for c in codes]
+
+    @staticmethod
+    def _condensed_output(n, dtype=np.float64, out=None):
+        """Condensed output of a builder and its DNAdistanceStore (None for an in-memory vector)"""
+        if out is None:
+            return np.zeros(n * (n - 1) // 2, dtype=dtype), None
+        if not isinstance(out, DNAdistanceStore):
+            out = DNAdistanceStore(n, out, dtype=dtype)
+        if out.n != n:
+            raise ValueError(f"out stores {out.n} samples, not {n}")
+        return out.d, out
+
     @staticmethod
     def _pairwiseEntropyDistance(list_DNAsignals, scale=None,
-                  engine=None, engineOpts=None,):
+                  engine=None, engineOpts=None, cache=None, n_jobs=None, executor=None, dtype=np.float64,
+                  out=None):
         """
         Calculate excess-entropy pairwise distances.
 
@@ -2735,13 +3432,21 @@ class DNAsignal:
         ----------
         list_DNAsignals : list of valid DNAsignals (mandatory)
         scale           : int (mandatory)
-        engine          : {'difflib', 'bio'} or None (default)
+        engine          : {'difflib', 'bio', 'banded', 'rle'} or None (default)
         engineOpts      : dict, optional (alignment parameters for the selected engine)
+                          use engine='rle' with engineOpts={'expand': False} for full-length runs
+                          (alignments are computed and kept in run-length form)
+        cache           : AlignmentCache, None (default = AlignmentCache.default, if enabled) or False (no caching)
+                          (workers of a parallel run share only its on-disk tier)
+        n_jobs          : int or None (default = serial), number of worker processes (-1 = all CPUs)
+        executor        : concurrent.futures.Executor, optional (used instead of a new process pool)
+        dtype           : float dtype of the stored distances (default = np.float64, np.float32 halves memory)
+        out             : DNAdistanceStore, str or Path, optional (disk-backed output, a path creates a new store;
+                          default = in-memory condensed vector)
 
         Returns
         -------
-        D      : nxn np.array of excess entropy distances (H(A) + H(B) - 2 * H(A*B))
-        names  : list of signal names
+        DNApairwiseAnalysis holding the condensed excess entropy distances (H(A) + H(B) - 2 * H(A*B))
         """
 
         if not isinstance(list_DNAsignals, list):
@@ -2754,35 +3459,48 @@ class DNAsignal:
         if scale <= 0:
             raise ValueError("scale must be positive")
 
-        n = len(list_DNAsignals)
-        D = np.zeros((n, n), dtype=np.float64)
+        cache = AlignmentCache.default if cache is None else (None if cache is False else cache)
 
+        n = len(list_DNAsignals)
         total_pairs = n * (n - 1) // 2
+        d, store = DNAsignal._condensed_output(n, dtype, out)  # condensed distances (upper triangle)
         pair_index = 0
         start_time = time()
 
-        with tqdm(total=total_pairs, desc="Pairwise distances", unit="pair") as pbar:
-            for i in range(n):
-                A = list_DNAsignals[i].codesfull[scale]
-                for j in range(i):
-                    B = list_DNAsignals[j].codesfull[scale]
-                    A.align(B, engine=engine, engineOpts=engineOpts)
-                    D[i, j] = A.excess_entropy(B)
-                    pair_index += 1
-                    pbar.update(1)
-                    # Optional: show elapsed/ETA in tqdm (already included by default)
-
-        D += D.T
+        if DNAsignal._use_pool(n_jobs, executor):
+            items, meta = DNAsignal._pairwise_items(list_DNAsignals, scale)
+            _pairwise_parallel(items, "entropy",
+                               opts=dict(engine=engine, engineOpts=engineOpts,
+                                         cache_path=None if cache is None or cache.path is None else str(cache.path)),
+                               meta=meta, n_jobs=n_jobs, executor=executor, desc="Pairwise distances", out=d)
+        else:
+            with tqdm(total=total_pairs, desc="Pairwise distances", unit="pair") as pbar:
+                for i in range(n):
+                    A = list_DNAsignals[i].codesfull[scale]
+                    for j in range(i):
+                        B = list_DNAsignals[j].codesfull[scale]
+                        if cache is not None:
+                            aln = cache.align(A, B, engine=engine, engineOpts=engineOpts)
+                        else:
+                            aln = A.align(B, engine=engine, engineOpts=engineOpts, store=False)
+                        d[_condensed_index(n, i, j)] = A.excess_entropy(B, alignment=aln)
+                        pair_index += 1
+                        pbar.update(1)
+                        # Optional: show elapsed/ETA in tqdm (already included by default)
+            if cache is not None:
+                cache.flush()
+
         names = [o.name for o in list_DNAsignals]
         elapsed = time() - start_time
         print(f"Pairwise distances computation completed in {elapsed:.2f} seconds.")
-        return DNApairwiseAnalysis(D,names,list_DNAsignals)
+        return DNApairwiseAnalysis(d if store is None else store,names,list_DNAsignals,metric="entropy",
+                                   metricOpts=dict(scale=scale, engine=engine, engineOpts=engineOpts))
 
     @staticmethod
     def _pairwiseJaccardMotifDistance(list_DNAsignals, scale=None,
                                        pattern='YAZB', minlen=4,
                                        classification='any',  # 'canonical', 'variant', or 'any'
-                                       plot=True):
+                                       plot=True, n_jobs=None, executor=None, dtype=np.float64, out=None):
         """
         Compute pairwise Jaccard distances based on motif presence across symbolic DNAstr sequences.
 
@@ -2800,13 +3518,20 @@ class DNAsignal:
             Filter for motif type.
         plot : bool
             Whether to plot motif positions for each sequence.
+        n_jobs : int or None, optional
+            Number of worker processes (-1 = all CPUs). None or 1 (default) runs serially.
+        executor : concurrent.futures.Executor, optional
+            Executor used instead of a new process pool (it is not shut down).
+        dtype : float dtype, optional
+            Dtype of the stored distances (default np.float64, np.float32 halves memory).
+        out : DNAdistanceStore, str or Path, optional
+            Disk-backed output (a path creates a new DNAdistanceStore); distances are written to it
+            block by block and the analysis reads them lazily. Default: in-memory condensed vector.
 
         Returns
         -------
-        D : np.ndarray
-            Symmetric pairwise Jaccard distance matrix.
-        names : list of str
-            List of DNAsignal names.
+        DNApairwiseAnalysis
+            Object holding the condensed pairwise Jaccard distances.
         """
         if not isinstance(list_DNAsignals, list):
             raise TypeError("list_DNAsignals must be a list.")
@@ -2814,20 +3539,10 @@ class DNAsignal:
             raise ValueError("scale must be a positive integer.")
 
         n = len(list_DNAsignals)
-        motif_sets = []
-
         for i, obj in enumerate(list_DNAsignals):
             if not isinstance(obj, DNAsignal):
                 raise TypeError(f"Element {i} is not a DNAsignal.")
-            dna = obj.codesfull[scale]
-            df = dna.extract_motifs(pattern=pattern, minlen=minlen, plot=False)
-            if classification == 'canonical':
-                df = df[df['classification'] == 'canonical']
-            elif classification == 'variant':
-                df = df[df['classification'] == 'variant']
-            # Represent a sequence as set of motif *start* positions
-            motif_set = set(df['start']) if not df.empty else set()
-            motif_sets.append(motif_set)
+        motifs = DNAsignal._motifSpans(list_DNAsignals, scale, pattern, minlen, classification)
 
         if plot:
             # Assume all DNAstr have same length, dx, and iloc
@@ -2836,19 +3551,13 @@ class DNAsignal:
             iloc = list_DNAsignals[0].codesfull[scale].iloc
             x_start = iloc * dx if isinstance(iloc, int) else iloc[0] * dx
             x_vals = np.arange(L) * dx + x_start
-            prevalence = np.zeros(L, dtype=int)
-
-            for obj in list_DNAsignals:
-                dna = obj.codesfull[scale]
-                df = dna.extract_motifs(pattern=pattern, minlen=minlen, plot=False)
-                if classification == 'canonical':
-                    df = df[df['classification'] == 'canonical']
-                elif classification == 'variant':
-                    df = df[df['classification'] == 'variant']
-                for _, row in df.iterrows():
-                    start = row['start']
-                    width = row['end'] - row['start']  # assuming inclusive-exclusive
-                    prevalence[start:start + width] += 1
+            # coverage counted with a difference array (+1 at start, -1 at end)
+            coverage = np.zeros(L + 1, dtype=int)
+            for start, end in motifs:
+                inside = start < L
+                np.add.at(coverage, start[inside], 1)
+                np.add.at(coverage, np.minimum(end[inside], L), -1)
+            prevalence = np.cumsum(coverage[:L])
 
             plt.figure(figsize=(12, 4))
             plt.plot(x_vals, prevalence/n, marker='o', linestyle='-', alpha=0.8)
@@ -2859,30 +3568,33 @@ class DNAsignal:
             plt.tight_layout()
             plt.show()
 
-        D = np.zeros((n, n), dtype=np.float64)
         total_pairs = n * (n - 1) // 2
+        d, store = DNAsignal._condensed_output(n, dtype, out)  # condensed distances (upper triangle)
         pair_index = 0
         start_time = time()
 
-        with tqdm(total=total_pairs, desc="Pairwise Jaccard (motif)", unit="pair") as pbar:
-            for i in range(n):
-                A = motif_sets[i]
-                for j in range(i):
-                    B = motif_sets[j]
-                    intersection = len(A & B)
-                    union = len(A | B)
-                    distance = 1.0 if union == 0 else 1 - intersection / union
-                    D[i, j] = distance
-                    pbar.update(1)
-
-        D += D.T
+        # a sequence is represented by the set of its motif *start* positions
+        starts = [np.unique(start) for start, _ in motifs]
+        if DNAsignal._use_pool(n_jobs, executor):
+            _pairwise_parallel(starts, "jaccard", n_jobs=n_jobs, executor=executor,
+                               desc="Pairwise Jaccard (motif)", out=d)
+        elif n > 1:
+            X, counts = _jaccard_incidence(starts, _jaccard_width(starts))  # built once, sliced by row blocks
+            block = max(1, int(64 * 2**20 // (8 * n)))  # rows of about 64 MB
+            for i0 in range(0, n - 1, block):
+                i1 = min(n, i0 + block)
+                _write_condensed_rows(d, n, i0, _jaccard_from_incidence(X[i0:i1], counts[i0:i1], X, counts))
+
         names = [o.name for o in list_DNAsignals]
         elapsed = time() - start_time
         print(f"Jaccard motif-based distance computation completed in {elapsed:.2f} seconds.")
-        return DNApairwiseAnalysis(D, names, list_DNAsignals)
+        return DNApairwiseAnalysis(d if store is None else store, names, list_DNAsignals, metric="jaccard",
+                                   metricOpts=dict(scale=scale, pattern=pattern, minlen=minlen,
+                                                   classification=classification))
 
     @staticmethod
-    def _pairwiseJensenShannonDistance(list_DNAsignals, scale=None):
+    def _pairwiseJensenShannonDistance(list_DNAsignals, scale=None, n_jobs=None, executor=None, dtype=np.float64,
+                                       out=None):
         """
         Calculate pairwise Jensen-Shannon distances between DNAstr codes at a given scale.
 
@@ -2892,11 +3604,20 @@ class DNAsignal:
             List of valid DNAsignal instances.
         scale : int
             Scale index to select the code from `codesfull`.
+        n_jobs : int or None, optional
+            Number of worker processes (-1 = all CPUs). None or 1 (default) runs serially.
+        executor : concurrent.futures.Executor, optional
+            Executor used instead of a new process pool (it is not shut down).
+        dtype : float dtype, optional
+            Dtype of the stored distances (default np.float64, np.float32 halves memory).
+        out : DNAdistanceStore, str or Path, optional
+            Disk-backed output (a path creates a new DNAdistanceStore); distances are written to it
+            block by block and the analysis reads them lazily. Default: in-memory condensed vector.
 
         Returns
         -------
         DNApairwiseAnalysis
-            Matrix object containing pairwise Jensen-Shannon distances.
+            Object holding the condensed pairwise Jensen-Shannon distances.
         """
         if not isinstance(list_DNAsignals, list):
             raise TypeError("list_DNAsignals must be a list")
@@ -2909,30 +3630,36 @@ class DNAsignal:
             raise ValueError("scale must be non-negative")
 
         n = len(list_DNAsignals)
-        D = np.zeros((n, n), dtype=np.float64)
         total_pairs = n * (n - 1) // 2
+        d, store = DNAsignal._condensed_output(n, dtype, out)  # condensed distances (upper triangle)
         start_time = time()
 
-        with tqdm(total=total_pairs, desc="Jensen-Shannon", unit="pair") as pbar:
-            for i in range(n):
-                A = list_DNAsignals[i].codesfull[scale]
-                for j in range(i):
-                    B = list_DNAsignals[j].codesfull[scale]
-                    D[i, j] = A.jensen_shannon(B)
-                    pbar.update(1)
+        if DNAsignal._use_pool(n_jobs, executor):
+            # workers receive the (n, k) letter distributions and apply the closed form by row segments
+            P, _ = DNAstr._jensen_shannon_profiles(DNAstr.histograms([o.codesfull[scale] for o in list_DNAsignals])[0])
+            _pairwise_parallel(list(P), "jensenshannon", n_jobs=n_jobs, executor=executor,
+                               desc="Jensen-Shannon", out=d)
+        else:
+            # closed form on the (n, k) histogram matrix, by blocks of rows
+            DNAstr.pairwise_jensen_shannon([o.codesfull[scale] for o in list_DNAsignals], out=d)
 
-        D += D.T
         names = [o.name for o in list_DNAsignals]
         elapsed = time() - start_time
         print(f"Jensen-Shannon distance matrix completed in {elapsed:.2f} seconds.")
-        return DNApairwiseAnalysis(D, names, list_DNAsignals)
+        return DNApairwiseAnalysis(d if store is None else store, names, list_DNAsignals,
+                                   metric="jensenshannon", metricOpts=dict(scale=scale))
 
     @staticmethod
     def _pairwiseLevenshteinDistance(list_DNAsignals, scale=None,
                                       use_alignment=False,
                                       engine=None,
                                       engineOpts=None,
-                                      forced=False):
+                                      forced=False,
+                                      cache=None,
+                                      n_jobs=None,
+                                      executor=None,
+                                      dtype=np.float64,
+                                      out=None):
         """
         Compute pairwise Levenshtein distances between codes at a given scale.
 
@@ -2945,16 +3672,31 @@ class DNAsignal:
         use_alignment : bool, optional
             If True, align codes before computing distance. Default is Full.
         engine : str, optional
-            Alignment engine ('difflib' or 'bio') if use_alignment is True.
+            Alignment engine ('difflib', 'bio' or 'banded') if use_alignment is True.
         engineOpts : dict, optional
             Parameters for the alignment engine.
         forced : bool, optional
             If True, allow forced alignment even if dx mismatches.
+        cache : AlignmentCache, None or False, optional
+            Alignment cache used if use_alignment is True
+            (None = AlignmentCache.default if enabled, False = no caching).
+            Workers of a parallel run share only its on-disk tier.
+        n_jobs : int or None, optional
+            Number of worker processes (-1 = all CPUs). None or 1 (default) runs serially.
+            Without alignment, distances are evaluated in bulk by DNAstr.pairwise_levenshtein and
+            n_jobs is its number of threads (None = all CPUs).
+        executor : concurrent.futures.Executor, optional
+            Executor used instead of a new process pool (it is not shut down).
+        dtype : float dtype, optional
+            Dtype of the stored distances (default np.float64, np.float32 halves memory).
+        out : DNAdistanceStore, str or Path, optional
+            Disk-backed output (a path creates a new DNAdistanceStore); distances are written to it
+            block by block and the analysis reads them lazily. Default: in-memory condensed vector.
 
         Returns
         -------
         DNApairwiseAnalysis
-            Object holding the nxn Levenshtein distance matrix.
+            Object holding the condensed Levenshtein distances.
         """
         if not isinstance(list_DNAsignals, list):
             raise TypeError("list_DNAsignals must be a list")
@@ -2967,27 +3709,136 @@ class DNAsignal:
             raise ValueError("scale must be non-negative")
 
         n = len(list_DNAsignals)
-        D = np.zeros((n, n), dtype=np.float64)
         total_pairs = n * (n - 1) // 2
+        d, store = DNAsignal._condensed_output(n, dtype, out)  # condensed distances (upper triangle)
         start_time = time()
 
-        with tqdm(total=total_pairs, desc="Levenshtein", unit="pair") as pbar:
-            for i in range(n):
-                A = list_DNAsignals[i].codesfull[scale]
-                for j in range(i):
-                    B = list_DNAsignals[j].codesfull[scale]
-                    D[i, j] = A.levenshtein(B,
-                                            use_alignment=use_alignment,
-                                            engine=engine,
-                                            engineOpts=engineOpts,
-                                            forced=forced)
-                    pbar.update(1)
-
-        D += D.T
+        cache = AlignmentCache.default if cache is None else (None if cache is False else cache)
+
+        if not use_alignment and executor is None:
+            # bulk evaluation (multithreaded, no per-pair Python dispatch)
+            DNAstr.pairwise_levenshtein([o.codesfull[scale] for o in list_DNAsignals],
+                                        workers=-1 if n_jobs is None else n_jobs, out=d)
+        elif DNAsignal._use_pool(n_jobs, executor):
+            items, meta = DNAsignal._pairwise_items(list_DNAsignals, scale)
+            _pairwise_parallel(items, "levenshtein",
+                               opts=dict(use_alignment=use_alignment, engine=engine, engineOpts=engineOpts,
+                                         forced=forced,
+                                         cache_path=None if cache is None or cache.path is None else str(cache.path)),
+                               meta=meta, n_jobs=n_jobs, executor=executor, desc="Levenshtein", out=d)
+        else:
+            with tqdm(total=total_pairs, desc="Levenshtein", unit="pair") as pbar:
+                for i in range(n):
+                    A = list_DNAsignals[i].codesfull[scale]
+                    for j in range(i):
+                        B = list_DNAsignals[j].codesfull[scale]
+                        k = _condensed_index(n, i, j)
+                        if use_alignment and cache is not None:
+                            d[k] = Levenshtein.distance(*cache.align(A, B, engine=engine,
+                                                                     engineOpts=engineOpts, forced=forced))
+                        else:
+                            d[k] = A.levenshtein(B,
+                                                 use_alignment=use_alignment,
+                                                 engine=engine,
+                                                 engineOpts=engineOpts,
+                                                 forced=forced)
+                        pbar.update(1)
+            if use_alignment and cache is not None:
+                cache.flush()
+
         names = [o.name for o in list_DNAsignals]
         elapsed = time() - start_time
         print(f"Levenshtein distance matrix completed in {elapsed:.2f} seconds.")
-        return DNApairwiseAnalysis(D, names, list_DNAsignals)
+        return DNApairwiseAnalysis(d if store is None else store, names, list_DNAsignals, metric="levenshtein",
+                                   metricOpts=dict(scale=scale, use_alignment=use_alignment, engine=engine,
+                                                   engineOpts=engineOpts, forced=forced))
+
+    @staticmethod
+    def _motifSpans(list_DNAsignals, scale, pattern='YAZB', minlen=4, classification='any'):
+        """(start, end) arrays of the motifs of each signal at scale (cached on its DNAstr)"""
+        spans = []
+        for obj in list_DNAsignals:
+            m = obj.codesfull[scale].motif_positions(pattern=pattern, minlen=minlen)
+            if classification == 'canonical':
+                keep = m.canonical
+            elif classification == 'variant':
+                keep = ~m.canonical
+            else:
+                keep = np.ones(m.start.size, dtype=bool)
+            spans.append((m.start[keep], m.end[keep]))
+        return spans
+
+    @staticmethod
+    def _crossDistance(list_A, list_B, metric, scale, cache=None, symmetric=False, **metricOpts):
+        """
+        Rectangular distances between two lists of DNAsignal, with the metrics of the pairwise builders.
+
+        Parameters
+        ----------
+        list_A, list_B : list of DNAsignal
+            Row and column signals (list_B is ignored if symmetric is True).
+        metric : {'entropy', 'jaccard', 'jensenshannon', 'levenshtein'}
+            Metric (see `_pairwiseEntropyDistance`, `_pairwiseJaccardMotifDistance`, ...).
+        scale : int
+            Scale index in codesfull.
+        cache : AlignmentCache, None (default = AlignmentCache.default, if enabled) or False (no caching)
+            Used by alignment-based metrics.
+        symmetric : bool
+            If True, return the square distances within list_A (pairs i > j are evaluated once).
+        metricOpts : options of the builder (engine, engineOpts, use_alignment, forced, pattern,
+            minlen, classification)
+
+        Returns
+        -------
+        np.ndarray (len(list_A), len(list_B)) of float64
+        """
+        if scale is None or not isinstance(scale, int):
+            raise TypeError(f"scale must be an int not a {type(scale).__name__}")
+        list_B = list_A if symmetric else list_B
+        A = [o.codesfull[scale] for o in list_A]
+        B = [o.codesfull[scale] for o in list_B]
+        C = np.zeros((len(A), len(B)), dtype=np.float64)
+        if not A or not B:
+            return C
+        engine, engineOpts = metricOpts.get("engine"), metricOpts.get("engineOpts")
+        forced = metricOpts.get("forced", False)
+        if metric == "jaccard":
+            opts = {k: metricOpts[k] for k in ("pattern", "minlen", "classification") if k in metricOpts}
+            starts_A = [np.unique(st) for st, _ in DNAsignal._motifSpans(list_A, scale, **opts)]
+            starts_B = starts_A if symmetric else [np.unique(st) for st, _ in DNAsignal._motifSpans(list_B, scale, **opts)]
+            C[:] = _jaccard_distances(starts_A, starts_B)
+        elif metric == "jensenshannon":
+            # closed form JSD(p, q) = H((p + q) / 2) - (H(p) + H(q)) / 2 on letter histograms (base 2)
+            P, Hp = DNAstr._jensen_shannon_profiles(DNAstr.histograms(A if symmetric else A + B)[0])
+            PA, PB = P[:len(A)], (P if symmetric else P[len(A):])
+            HA, HB = Hp[:len(A)], (Hp if symmetric else Hp[len(A):])
+            for i in range(len(A)):
+                C[i] = DNAstr._jensen_shannon_block(PA[i:i + 1], HA[i:i + 1], PB, HB)[0]
+        elif metric == "levenshtein" and not metricOpts.get("use_alignment", False) and rf_cdist is not None:
+            C[:] = rf_cdist([str(a) for a in A], [str(b) for b in B], scorer=rf_Levenshtein.distance,
+                            dtype=np.int32, workers=-1)
+        elif metric in ("entropy", "levenshtein"):
+            aligned = metric == "entropy" or metricOpts.get("use_alignment", False)
+            cache = AlignmentCache.default if cache is None else (None if cache is False else cache)
+            for i, a in enumerate(A):
+                for j in range(i if symmetric else len(B)):
+                    b = B[j]
+                    if not aligned:
+                        C[i, j] = Levenshtein.distance(str(a), str(b))
+                        continue
+                    aln = (cache.align(a, b, engine=engine, engineOpts=engineOpts, forced=forced)
+                           if cache is not None else
+                           a.align(b, engine=engine, engineOpts=engineOpts, forced=forced, store=False))
+                    C[i, j] = a.excess_entropy(b, alignment=aln) if metric == "entropy" else Levenshtein.distance(*aln)
+            if symmetric:
+                C += C.T
+            if aligned and cache is not None:
+                cache.flush()
+        else:
+            raise ValueError(f"unknown metric '{metric}'")
+        if symmetric:
+            np.fill_diagonal(C, 0.0)
+        return C
 
 
     @property
@@ -3003,50 +3854,1176 @@ class DNAsignal:
             return None
 
 # ------------------------
-# DNAstr class
+# DNAalignment class
 # ------------------------
-class DNAstr(str):
+class DNAalignment:
     """
-    A symbolic DNA-like sequence class supporting alignment, entropy analysis,
-    edit-distance metrics, and signal reconstruction from symbolic codes.
+    Immutable result of the pairwise alignment of two DNAstr sequences (returned by DNAstr.align).
 
-    Extended from `str`, it is designed for symbolic transformations of signals
-    (e.g., wavelet-encoded GC-MS peaks or time series).
+    An alignment result holds the two aligned strings (gaps are spaces), the match mask and the
+    engine used to produce them. It does not depend on the state of the aligned DNAstr objects:
+    the same sequence can be aligned against several partners (or concurrently) and each result
+    can be kept, cached or shipped to another process.
 
-    Main Features
-    -------------
-    - Supports symbolic operations for pattern recognition, entropy, alignment.
-    - Encodes x-resolution (`dx`), original index (`iloc`), and physical x-range (`xloc`).
-    - Aligns sequences with visual inspection and rich diffs.
-    - Converts symbolic strings into synthetic numerical signals.
+    For backward compatibility, the result unpacks as `(aligned_self, aligned_other)`:
 
-    Operators
-    ---------
-    + : concatenate two DNAstr objects
-    - : symbolic difference after alignment (mismatches only)
-    == : equality comparison (exact content and dx)
+        aligned_self, aligned_other = A.align(B)
 
-    Key Methods
-    -----------
-    - __init__ / __new__      : Constructor with metadata (`dx`, `iloc`, `xloc`)
-    - align(other)            : Align this DNAstr to another, update mask and aligned views
-    - wrapped_alignment()     : Pretty terminal view of the alignment with colors and symbols
-    - html_alignment()        : Rich HTML display of the alignment (Jupyter)
-    - plot_alignment()        : Visualize waveform alignment with symbolic signals
-    - plot_mask()             : Color block plot showing matches/mismatches/gaps
-    - find(pattern, regex=False) : Search for symbolic patterns with fuzziness or regex
-    - to_signal()             : Convert symbolic code into synthetic signal (NumPy)
-    - vectorized()            : Convert string to integer codes
-    - summary()               : Print entropy and character frequencies
-    - mutation_counts         : Property: {'matches', 'mismatches', 'indels'}
-    - entropy                 : Property: Shannon entropy
-    - mutual_entropy(other)   : Mutual entropy of two sequences
-    - excess_entropy(other)   : Excess entropy H1 + H2 - 2 * H12
-    - jensen_shannon(other)   : Jensen-Shannon divergence
-    - jaccard(other)          : Jaccard similarity
-    - alignment_stats         : Property: Match, substitution, gap counts
-    - score(normalized=True) : Alignment score (fraction of matches)
-    - has(other: str)         : Check if a pattern or substring exists
+    Key methods/properties
+    ----------------------
+    - mask                    : '=' for matches, '*' for substitutions, ' ' for gaps
+    - stats                   : Match, substitution, gap counts
+    - score(normalized=True)  : Alignment score (fraction of matches)
+    - aligned_code            : Aligned self restricted to letters A-C and X-Z
+    - mutual_entropy          : Shannon entropy of the aligned code
+    - query / reference       : Unaligned sequences (gaps removed)
+    - ref_hash                : SHA256 hash of the aligned reference (computed on demand)
+
+    Attributes
+    ----------
+    aligned_self : str
+        Aligned form of the query sequence (self in DNAstr.align).
+    aligned_other : str
+        Aligned form of the reference sequence (other in DNAstr.align).
+    engine : str
+        Alignment engine: 'difflib', 'bio' or 'banded'.
+    engineOpts : dict
+        Options passed to the alignment engine (copy).
+
+    Example
+    -------
+    >>> A, B = DNAstr("AABBCC"), DNAstr("AACBCC")
+    >>> aln = A.align(B)
+    >>> aln.mask, aln.score()
+    ('==*===', 0.8333333333333334)
+    """
+
+    __slots__ = ("aligned_self", "aligned_other", "engine", "engineOpts", "_mask", "_stats", "_ref_hash")
+
+    def __init__(self, aligned_self, aligned_other, engine="difflib", engineOpts=None):
+        """
+        Build an alignment result from two aligned strings of equal length.
+
+        Parameters
+        ----------
+        aligned_self, aligned_other : str
+            Aligned sequences, gaps are spaces.
+        engine : str, optional
+            Engine which produced the alignment (default: 'difflib').
+        engineOpts : dict, optional
+            Engine options (copied).
+        """
+        aligned_self, aligned_other = str(aligned_self), str(aligned_other)
+        if len(aligned_self) != len(aligned_other):
+            raise RuntimeError("Mismatch in alignment lengths: check alignment logic.")
+        for k, v in (("aligned_self", aligned_self), ("aligned_other", aligned_other), ("engine", engine),
+                     ("engineOpts", dict(engineOpts or {})), ("_mask", None), ("_stats", None), ("_ref_hash", None)):
+            object.__setattr__(self, k, v)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("DNAalignment objects are immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("DNAalignment objects are immutable")
+
+    def __reduce__(self):
+        return (self.__class__, (self.aligned_self, self.aligned_other, self.engine, self.engineOpts))
+
+    def __iter__(self):
+        """Unpack as (aligned_self, aligned_other)"""
+        yield self.aligned_self
+        yield self.aligned_other
+
+    def __len__(self):
+        """Length of the alignment (including gaps)"""
+        return len(self.aligned_self)
+
+    def __eq__(self, other):
+        if not isinstance(other, DNAalignment):
+            return NotImplemented
+        return (self.aligned_self == other.aligned_self and self.aligned_other == other.aligned_other
+                and self.engine == other.engine)
+
+    def __hash__(self):
+        return hash((self.aligned_self, self.aligned_other, self.engine))
+
+    @property
+    def mask(self):
+        """Alignment mask: '=' for matches, '*' for substitutions, ' ' for gaps (computed once)"""
+        if self._mask is None:
+            a, b = self.aligned_self, self.aligned_other
+            if a.isascii() and b.isascii():
+                ca = np.frombuffer(a.encode("ascii"), dtype=np.uint8)
+                cb = np.frombuffer(b.encode("ascii"), dtype=np.uint8)
+                m = np.where(ca == cb, ord('='), np.where((ca != 32) & (cb != 32), ord('*'), 32))
+                mask = m.astype(np.uint8).tobytes().decode("ascii")
+            else:
+                mask = ''.join('=' if x == y else '*' if y != ' ' and x != ' ' else ' '
+                               for x, y in zip(a, b))
+            object.__setattr__(self, "_mask", mask)
+        return self._mask
+
+    @property
+    def stats(self):
+        """Dictionary with the number of matches, substitutions and gaps"""
+        if self._stats is None:
+            m = self.mask
+            object.__setattr__(self, "_stats", {"matches": m.count('='),
+                                                "substitutions": m.count('*'),
+                                                "gaps": m.count(' ')})
+        return dict(self._stats)
+
+    def score(self, normalized=True):
+        """
+        Return an alignment score, optionally normalized.
+
+        Parameters
+        ----------
+        normalized : bool
+            If True (default), return score as a fraction of total aligned positions.
+
+        Returns
+        -------
+        float
+            Alignment score.
+        """
+        score = self.stats["matches"]
+        return score / len(self) if normalized else score
+
+    @property
+    def query(self):
+        """Unaligned query sequence (gaps removed)"""
+        return self.aligned_self.replace(' ', '')
+
+    @property
+    def reference(self):
+        """Unaligned reference sequence (gaps removed)"""
+        return self.aligned_other.replace(' ', '')
+
+    @property
+    def ref_hash(self):
+        """SHA256 hash of the aligned reference sequence"""
+        if self._ref_hash is None:
+            object.__setattr__(self, "_ref_hash", hashlib.sha256(self.aligned_other.encode()).hexdigest())
+        return self._ref_hash
+
+    @property
+    def aligned_code(self):
+        """Aligned self restricted to the letters A-C and X-Z"""
+        return re.sub(r'[^A-CX-Z]', '', self.aligned_self)
+
+    @property
+    def mutual_entropy(self):
+        """Shannon entropy of the aligned code"""
+        return DNAstr._entropy_from_counts(np.bincount(DNAstr._as_codes(self.aligned_code), minlength=256))
+
+    def is_alignment_of(self, other, engine, engineOpts=None):
+        """Return True if this result is the alignment of the (unaligned) `other` with `engine` and `engineOpts`"""
+        return (self.engine == engine and self.engineOpts == dict(engineOpts or {})
+                and len(other) == len(self.aligned_other) - self.aligned_other.count(' ')
+                and self.reference == str(other))
+
+    def __repr__(self):
+        s = self.stats
+        return (f"<DNAalignment ({self.engine}): {len(self)} positions - "
+                f"{s['matches']} matches, {s['substitutions']} substitutions, {s['gaps']} gaps>")
+
+    def __str__(self):
+        return f"{self.aligned_other}\n{self.mask}\n{self.aligned_self}"
+
+class DNAsegmentAlignment(DNAalignment):
+    """
+    Immutable alignment of two sequences in run-length form (returned by the 'rle' engine).
+
+    Each aligned position is a run (letter, width) of the query and/or of the reference. The
+    aligned strings hold one letter per run (gaps are spaces) and `widths_self`/`widths_other`
+    hold the widths of the runs (0 for gaps). Statistics, score and mutual entropy are
+    weighted by the widths, i.e. they equal those of the full-resolution alignment returned by
+    `expand()`, which is only built when requested.
+
+    Attributes
+    ----------
+    widths_self, widths_other : np.ndarray (int64)
+        Widths of the aligned runs (0 for gaps).
+
+    Methods
+    -------
+    expand() : full-resolution DNAalignment (each run repeated over its width; the surplus of the
+               wider run of a pair is aligned against gaps).
+    """
+
+    __slots__ = ("widths_self", "widths_other")
+
+    def __init__(self, aligned_self, aligned_other, widths_self, widths_other, engine="rle", engineOpts=None):
+        super().__init__(aligned_self, aligned_other, engine=engine, engineOpts=engineOpts)
+        ws = np.asarray(widths_self, dtype=np.int64)
+        wo = np.asarray(widths_other, dtype=np.int64)
+        if ws.size != len(self.aligned_self) or wo.size != len(self.aligned_other):
+            raise ValueError("widths must have one value per aligned position")
+        ws.flags.writeable = wo.flags.writeable = False
+        object.__setattr__(self, "widths_self", ws)
+        object.__setattr__(self, "widths_other", wo)
+
+    def __reduce__(self):
+        return (self.__class__, (self.aligned_self, self.aligned_other, self.widths_self, self.widths_other,
+                                 self.engine, self.engineOpts))
+
+    def __eq__(self, other):
+        if not isinstance(other, DNAsegmentAlignment):
+            return NotImplemented
+        return (super().__eq__(other) and np.array_equal(self.widths_self, other.widths_self)
+                and np.array_equal(self.widths_other, other.widths_other))
+
+    __hash__ = DNAalignment.__hash__
+
+    @property
+    def n_samples(self):
+        """Length of the full-resolution alignment"""
+        return int(np.maximum(self.widths_self, self.widths_other).sum())
+
+    @property
+    def stats(self):
+        """Dictionary with the number of matches, substitutions and gaps (full resolution)"""
+        if self._stats is None:
+            ws, wo = self.widths_self, self.widths_other
+            overlap = np.minimum(ws, wo)
+            same = np.frombuffer(self.mask.encode("ascii"), dtype=np.uint8) == ord('=')
+            object.__setattr__(self, "_stats", {"matches": int(overlap[same].sum()),
+                                                "substitutions": int(overlap[~same].sum()),
+                                                "gaps": int(np.abs(ws - wo).sum())})
+        return dict(self._stats)
+
+    def score(self, normalized=True):
+        """Alignment score (matches, as a fraction of the full-resolution length if normalized)"""
+        score = self.stats["matches"]
+        return score / max(1, self.n_samples) if normalized else score
+
+    @property
+    def mutual_entropy(self):
+        """Shannon entropy of the aligned code (letters A-C and X-Z weighted by their widths)"""
+        codes = DNAstr._as_codes(self.aligned_self)
+        counts = np.bincount(codes, weights=self.widths_self, minlength=256)
+        keep = np.zeros(256, dtype=bool)
+        keep[[ord(c) for c in "ABCXYZ"]] = True
+        return DNAstr._entropy_from_counts(counts[keep])
+
+    def expand(self):
+        """Return the full-resolution alignment (DNAalignment)"""
+        ws, wo = self.widths_self, self.widths_other
+        total = np.maximum(ws, wo)
+        def full(aligned, w):
+            codes = np.stack((DNAstr._as_codes(aligned), np.full(w.size, ord(' '), dtype=np.uint8)), axis=1)
+            reps = np.stack((w, total - w), axis=1)
+            return np.repeat(codes.ravel(), reps.ravel()).tobytes().decode("ascii")
+        return DNAalignment(full(self.aligned_self, ws), full(self.aligned_other, wo),
+                            engine=self.engine, engineOpts=self.engineOpts)
+
+    def __repr__(self):
+        s = self.stats
+        return (f"<DNAsegmentAlignment ({self.engine}): {len(self)} runs, {self.n_samples} positions - "
+                f"{s['matches']} matches, {s['substitutions']} substitutions, {s['gaps']} gaps>")
+
+class AlignmentCache:
+    """
+    🗃️ AlignmentCache
+    Cache of pairwise DNAstr alignments keyed by content digests.
+
+    The pairwise builders (`DNAsignal._pairwiseEntropyDistance`, `_pairwiseLevenshteinDistance`)
+    align every pair of sequences. Alignments depend only on the content of both sequences and on
+    the engine and its options: they are looked up here with the key
+    (digest(A), digest(B), engine, engineOpts) before being computed. Running several metrics on
+    the same collection, or recomputing a matrix after adding a few samples, only aligns the new pairs.
+
+    Two tiers are used:
+        - an in-memory LRU tier (bounded by `maxsize` entries and `maxbytes` characters);
+        - an optional on-disk tier (SQLite database `alignments.sqlite` in the directory `path`),
+          shared between sessions. Aligned strings (and the run widths of the run-length results,
+          DNAsegmentAlignment) are stored zlib-compressed.
+
+    Caching is explicit: pass a cache to the builders (cache=...), or enable a process-wide cache
+    used whenever cache=None with `AlignmentCache.enable_default()` (`disable_default()` drops it
+    and releases its memory). No alignment is cached by default.
+
+    Parameters
+    ----------
+    path : str, Path or None
+        Directory of the on-disk tier (created if needed). None (default) = memory only.
+    maxsize : int
+        Maximum number of alignments kept in memory (default: 100000).
+    maxbytes : int
+        Maximum total length (characters) of the aligned strings kept in memory (default: 256 MB).
+    digest : {'blake2b', 'sha256'}
+        Digest algorithm of the keys (default: 'blake2b', see DNAstr.digest).
+
+    Attributes
+    ----------
+    hits, misses : int
+        Cache statistics (disk hits are counted as hits).
+    nbytes : int
+        Current size of the in-memory tier (characters).
+
+    Methods
+    -------
+    align(A, B, engine=None, engineOpts=None, forced=False)
+        Return the cached alignment of A against B or compute and store it (same as A.align(B, store=False)).
+    get(A, B, engine, engineOpts) / put(A, B, alignment)
+        Low-level access.
+    flush()
+        Commit pending writes of the on-disk tier.
+    clear(disk=False)
+        Empty the in-memory tier (and the on-disk tier if disk=True), reset statistics.
+    close()
+        Flush and close the on-disk tier.
+    enable_default(path=None, **kwargs), disable_default()
+        Set or drop the process-wide cache AlignmentCache.default (class methods).
+
+    Example
+    -------
+    >>> cache = AlignmentCache("~/.sig2dna/alignments")
+    >>> D = DNAsignal._pairwiseEntropyDistance(dnalist, scale=4, engine="bio", cache=cache)
+    >>> L = DNAsignal._pairwiseLevenshteinDistance(dnalist, scale=4, use_alignment=True, engine="bio", cache=cache)
+    >>> cache
+    <AlignmentCache: 190 entries in memory, 190 on disk, hits=190, misses=190>
+    """
+
+    default = None  # process-wide instance used when cache=None (opt-in, see enable_default)
+    _sqlfile = "alignments.sqlite"
+    _commit_every = 256
+
+    def __init__(self, path=None, maxsize=100_000, maxbytes=256 * 2**20, digest="blake2b"):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.digest = digest
+        self._store = OrderedDict()  # key -> (DNAalignment, nbytes)
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.RLock()
+        self.path = None
+        self._db = None
+        self._pending = 0
+        if path is not None:
+            self.path = Path(path).expanduser()
+            self.path.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(self.path / self._sqlfile), check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS alignments ("
+                             "a TEXT, b TEXT, engine TEXT, opts TEXT, aligned_self BLOB, aligned_other BLOB, "
+                             "widths_self BLOB, widths_other BLOB, PRIMARY KEY (a, b, engine, opts))")
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(alignments)")}
+            for column in ("widths_self", "widths_other"):  # databases created without run widths
+                if column not in columns:
+                    self._db.execute(f"ALTER TABLE alignments ADD COLUMN {column} BLOB")
+            self._db.commit()
+
+    @classmethod
+    def enable_default(cls, path=None, **kwargs):
+        """Create (or replace) the process-wide cache used by the builders when cache=None and return it"""
+        cls.disable_default()
+        cls.default = cls(path, **kwargs)
+        return cls.default
+
+    @classmethod
+    def disable_default(cls):
+        """Close and drop the process-wide cache (the builders no longer cache by default)"""
+        if cls.default is not None:
+            cls.default.close()
+        cls.default = None
+
+    @staticmethod
+    def _opts_key(engineOpts):
+        """Canonical text representation of engine options"""
+        return json.dumps(engineOpts or {}, sort_keys=True, default=str)
+
+    def key(self, A, B, engine, engineOpts=None):
+        """Return the cache key of the alignment of A against B"""
+        return (DNAstr.digest(A, self.digest), DNAstr.digest(B, self.digest), engine, self._opts_key(engineOpts))
+
+    def _remember(self, key, alignment):
+        """Insert in the in-memory tier (LRU eviction)"""
+        nbytes = 2 * len(alignment)
+        with self._lock:
+            if key not in self._store:
+                self._store[key] = (alignment, nbytes)
+                self.nbytes += nbytes
+            while len(self._store) > 1 and (len(self._store) > self.maxsize or self.nbytes > self.maxbytes):
+                _, (_, evicted) = self._store.popitem(last=False)
+                self.nbytes -= evicted
+
+    def _lookup(self, key):
+        """Return the cached DNAalignment for key or None"""
+        with self._lock:
+            if key in self._store:
+                self._store.move_to_end(key)
+                self.hits += 1
+                return self._store[key][0]
+            if self._db is not None:
+                row = self._db.execute("SELECT aligned_self, aligned_other, widths_self, widths_other "
+                                       "FROM alignments WHERE a=? AND b=? AND engine=? AND opts=?", key).fetchone()
+                engineOpts = json.loads(key[3])
+                if row is not None and row[2] is None and key[2] == "rle" and not engineOpts.get("expand", True):
+                    row = None  # run-level result stored without its widths (older database): recompute
+                if row is not None:
+                    aligned_self, aligned_other = zlib.decompress(row[0]).decode(), zlib.decompress(row[1]).decode()
+                    if row[2] is None:
+                        alignment = DNAalignment(aligned_self, aligned_other, engine=key[2], engineOpts=engineOpts)
+                    else:
+                        alignment = DNAsegmentAlignment(aligned_self, aligned_other,
+                                                        *(np.frombuffer(zlib.decompress(w), dtype=np.int64)
+                                                          for w in row[2:]),
+                                                        engine=key[2], engineOpts=engineOpts)
+                    self.hits += 1
+                    self._remember(key, alignment)
+                    return alignment
+            self.misses += 1
+        return None
+
+    def _insert(self, key, alignment):
+        """Insert in both tiers"""
+        self._remember(key, alignment)
+        if self._db is not None:
+            with self._lock:
+                widths = ((zlib.compress(alignment.widths_self.tobytes()),
+                           zlib.compress(alignment.widths_other.tobytes()))
+                          if isinstance(alignment, DNAsegmentAlignment) else (None, None))
+                self._db.execute("INSERT OR REPLACE INTO alignments VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                 key + (zlib.compress(alignment.aligned_self.encode()),
+                                        zlib.compress(alignment.aligned_other.encode())) + widths)
+                self._pending += 1
+                if self._pending >= self._commit_every:
+                    self.flush()
+
+    def get(self, A, B, engine, engineOpts=None):
+        """Return the cached alignment of A against B (DNAalignment) or None"""
+        return self._lookup(self.key(A, B, engine, engineOpts))
+
+    def put(self, A, B, alignment):
+        """Store the alignment (DNAalignment) of A against B"""
+        self._insert(self.key(A, B, alignment.engine, alignment.engineOpts), alignment)
+
+    def align(self, A, B, engine=None, engineOpts=None, forced=False):
+        """
+        Return the alignment of A against B, from the cache or computed with A.align(B, store=False).
+
+        Parameters
+        ----------
+        A, B : DNAstr
+            Sequences to align.
+        engine, engineOpts, forced :
+            See DNAstr.align (defaults are resolved from A as in DNAstr.align).
+
+        Returns
+        -------
+        DNAalignment
+        """
+        if not isinstance(A, DNAstr) or not isinstance(B, DNAstr):
+            raise TypeError("Alignment requires DNAstr instances")
+        if not forced and A.dx != B.dx:
+            raise ValueError("dx mismatch. Use forced=True to override.")
+        engine = engine or A.engine
+        engineOpts = engineOpts or A.engineOpts.get(engine, {})
+        key = self.key(A, B, engine, engineOpts)
+        alignment = self._lookup(key)
+        if alignment is None:
+            alignment = A.align(B, engine=engine, engineOpts=engineOpts, forced=True, store=False)
+            self._insert(key, alignment)
+        return alignment
+
+    def flush(self):
+        """Commit pending writes of the on-disk tier"""
+        with self._lock:
+            if self._db is not None and self._pending:
+                self._db.commit()
+                self._pending = 0
+
+    def clear(self, disk=False):
+        """Empty the in-memory tier (and the on-disk tier if disk is True) and reset statistics"""
+        with self._lock:
+            self._store.clear()
+            self.nbytes = self.hits = self.misses = 0
+            if disk and self._db is not None:
+                self._db.execute("DELETE FROM alignments")
+                self._db.commit()
+                self._pending = 0
+
+    def close(self):
+        """Flush and close the on-disk tier (the in-memory tier remains usable)"""
+        with self._lock:
+            if self._db is not None:
+                self.flush()
+                self._db.close()
+                self._db = None
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def __len__(self):
+        return len(self._store)
+
+    @property
+    def ndisk(self):
+        """Number of alignments stored on disk (0 without on-disk tier)"""
+        with self._lock:
+            if self._db is None:
+                return 0
+            return self._db.execute("SELECT COUNT(*) FROM alignments").fetchone()[0]
+
+    def __repr__(self):
+        disk = f", {self.ndisk} on disk" if self._db is not None else ""
+        return (f"<AlignmentCache: {len(self)} entries in memory{disk}, "
+                f"hits={self.hits}, misses={self.misses}>")
+
+    def __str__(self):
+        return repr(self)
+
+# ------------------------
+# Parallel pairwise distances
+# ------------------------
+# The lower triangle of a pairwise matrix (pairs i > j, enumerated row by row) is split into
+# contiguous blocks with the same number of pairs. Workers receive only the compact arrays of the
+# items (uint8 symbol codes or motif positions) through shared memory and write their block of
+# distances directly into a shared condensed vector (upper triangle, scipy's squareform layout),
+# held in shared memory or in the memory-mapped file of a DNAdistanceStore.
+
+def _xlogx(a):
+    """Elementwise a log(a), 0 where a <= 0"""
+    return np.where(a > 0, a * np.log(np.where(a > 0, a, 1.0)), 0.0)
+
+def _pair_blocks(n, n_blocks):
+    """Split the n(n-1)/2 pairs into n_blocks ranges [k0, k1) of pair indices with balanced sizes"""
+    total = n * (n - 1) // 2
+    edges = np.unique(np.linspace(0, total, max(1, n_blocks) + 1).round().astype(np.int64))
+    return [(int(a), int(b)) for a, b in zip(edges[:-1], edges[1:])]
+
+def _pair_index(k):
+    """Return (i, j), i > j, of the pair indices k (row-major order of the lower triangle)"""
+    k = np.asarray(k, dtype=np.int64)
+    i = ((1 + np.sqrt(1 + 8 * k.astype(np.float64))) // 2).astype(np.int64)
+    i -= (i * (i - 1) // 2 > k)            # guard against round-off of sqrt
+    i += ((i + 1) * i // 2 <= k)
+    return i, k - i * (i - 1) // 2
+
+def _condensed_index(n, i, j):
+    """Position of the pairs (i, j), i != j, in the condensed vector of a symmetric (n, n) matrix"""
+    i, j = np.asarray(i, dtype=np.int64), np.asarray(j, dtype=np.int64)
+    i, j = np.minimum(i, j), np.maximum(i, j)
+    return n * i - i * (i + 1) // 2 + (j - i - 1)
+
+def _condensed_rows(d, n, i0, i1):
+    """Dense rows i0...i1-1 (i1 - i0, n) of the symmetric matrix stored as the condensed vector d"""
+    out = np.zeros((i1 - i0, n), dtype=np.float64)
+    for r in range(i0, i1):  # upper part (j > r): the contiguous segment of row r
+        start = n * r - r * (r + 1) // 2
+        out[r - i0, r + 1:] = d[start:start + n - r - 1]
+    if i1 - i0 == 1:  # lower part of a single row: one value per segment of the rows above
+        if i0 > 0:
+            out[0, :i0] = d[_condensed_index(n, np.arange(i0), i0)]
+        return out
+    # lower part (j < r): contiguous slices (j, max(i0, j + 1)...i1-1) of the rows above, mirrored
+    lower = np.zeros((i1 - 1, i1 - i0), dtype=np.float64)
+    for j in range(i1 - 1):
+        a = max(i0, j + 1)
+        start = n * j - j * (j + 1) // 2 - j - 1
+        lower[j, a - i0:] = d[start + a:start + i1]
+    out[:, :i1 - 1] += lower.T
+    return out
+
+def _condensed_upper_block(d, n, i0, i1):
+    """Rows i0...i1-1 (i1 - i0, n) of the strict upper triangle (zeros at j <= r), read contiguously from d"""
+    out = np.zeros((i1 - i0, n), dtype=np.float64)
+    start = n * i0 - i0 * (i0 + 1) // 2
+    for r in range(i0, i1):
+        out[r - i0, r + 1:] = d[start:start + n - r - 1]
+        start += n - r - 1
+    return out
+
+def _condensed_nearest(d, n, i, k=5):
+    """Indices and distances of the k nearest samples of sample i (condensed distances d)"""
+    row = _condensed_rows(d, n, i, i + 1)[0]
+    row[i] = np.inf
+    k = max(0, min(int(k), n - 1))
+    idx = np.argpartition(row, k - 1)[:k] if 0 < k < n else np.zeros(0, dtype=np.int64)
+    idx = idx[np.argsort(row[idx], kind="stable")]
+    return idx, row[idx]
+
+def _write_condensed_rows(d, n, i0, rows):
+    """Write the upper part (j > i) of the dense rows i0...i0+len(rows)-1 into the condensed vector d"""
+    for k, row in enumerate(rows):
+        r = i0 + k
+        start = n * r - r * (r + 1) // 2
+        d[start:start + n - r - 1] = row[r + 1:]
+
+def _condensed_submatrix(d, n, idx):
+    """Square submatrix D[idx][:, idx] of the symmetric matrix stored as the condensed vector d"""
+    idx = np.asarray(idx, dtype=np.int64)
+    m = idx.size
+    S = np.zeros((m, m), dtype=d.dtype)
+    if m > 1:
+        I, J = np.triu_indices(m, 1)
+        S[I, J] = S[J, I] = d[_condensed_index(n, idx[I], idx[J])]
+    return S
+
+def _ward_nn_chain(X):
+    """
+    Ward linkage of the observations X (n, d) by the nearest-neighbour chain algorithm.
+
+    Clusters are represented by their coordinate sums and sizes, the Ward distance between two
+    clusters being sqrt(2 |u| |v| / (|u| + |v|)) * ||c_u - c_v|| (the heights of scipy's ward linkage).
+    The chain follows scipy's nn_chain: it starts at the first active slot, ties are resolved in favour
+    of the previous element of the chain and then of the lowest slot, and a merged cluster takes the
+    larger of its two slots. Exact ties are thus broken as scipy does; scipy updates its distances by
+    the Lance-Williams recurrence, whose round-off can break a tie that is exact here (e.g. 2 vs
+    1.9999999999999998), so tied heights may then pair different clusters.
+
+    The chain is a Python loop of about 2n-3n steps, each scanning the active clusters with numpy:
+    time is O(n^2 d) and memory O(n d) (no distance matrix). Returns a scipy linkage matrix.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    n = X.shape[0]
+    if n < 2:
+        return np.zeros((0, 4))
+    sums, sizes = X.copy(), np.ones(n)
+    active = np.ones(n, dtype=bool)
+    merges = []  # (slot x, slot y, height) with x < y; the merged cluster takes slot y
+    chain = []
+    while len(merges) < n - 1:
+        if not chain:
+            chain.append(int(np.argmax(active)))
+        x = chain[-1]
+        idx = np.flatnonzero(active)
+        idx = idx[idx != x]
+        # squared Ward distances from the sums: 2 ||s_v |u| - s_u |v|||^2 / (|u| |v| (|u| + |v|))
+        diff = sums[idx] * sizes[x] - sums[x] * sizes[idx][:, None]
+        dist = 2 * np.einsum('ij,ij->i', diff, diff) / (sizes[x] * sizes[idx] * (sizes[x] + sizes[idx]))
+        k = int(np.argmin(dist))
+        if len(chain) > 1:  # ties are resolved in favour of the previous element of the chain
+            j = int(np.searchsorted(idx, chain[-2]))
+            if dist[j] <= dist[k]:
+                k = j
+        y = int(idx[k])
+        if len(chain) > 1 and y == chain[-2]:
+            del chain[-2:]
+            x, y = min(x, y), max(x, y)
+            merges.append((x, y, np.sqrt(dist[k])))
+            sums[y] += sums[x]
+            sizes[y] += sizes[x]
+            active[x] = False
+        else:
+            chain.append(y)
+    # sort merges by height and relabel slots as scipy cluster ids (union-find)
+    Z = np.zeros((n - 1, 4))
+    parent, cid, csize = np.arange(n), np.arange(n), np.ones(n, dtype=np.int64)
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+    for k, m in enumerate(sorted(range(n - 1), key=lambda m: merges[m][2])):
+        a, b, h = merges[m]
+        ra, rb = find(a), find(b)
+        Z[k] = (min(cid[ra], cid[rb]), max(cid[ra], cid[rb]), h, csize[ra] + csize[rb])
+        parent[rb] = ra
+        cid[ra], csize[ra] = n + k, csize[ra] + csize[rb]
+    return Z
+
+def _jaccard_incidence(starts, width):
+    """Sparse incidence matrix (n, width) of the motif starts of n sequences and the number of starts of each"""
+    counts = np.array([a.size for a in starts], dtype=np.int64)
+    cols = np.concatenate(starts) if counts.sum() else np.zeros(0, dtype=np.int64)
+    rows = np.repeat(np.arange(len(starts)), counts)
+    return csr_matrix((np.ones(cols.size, dtype=np.int32), (rows, cols)), shape=(len(starts), width)), counts
+
+def _jaccard_from_incidence(XA, nA, XB, nB):
+    """Jaccard distances between the rows of two incidence matrices (counts nA, nB of their sets)"""
+    # intersections = XA.XB', unions = |A| + |B| - |A & B|
+    inter = (XA @ XB.T).toarray()
+    union = nA[:, None] + nB[None, :] - inter
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(union == 0, 1.0, 1 - inter / np.where(union == 0, 1, union))
+
+def _jaccard_width(*collections):
+    """Number of positions covered by the motif starts of one or several collections"""
+    return 1 + max([int(a.max()) for starts in collections for a in starts if a.size] or [0])
+
+def _jaccard_distances(starts_A, starts_B):
+    """Jaccard distances between the sets of motif starts of two collections (sparse incidence products)"""
+    width = _jaccard_width(starts_A, starts_B)
+    XA, nA = _jaccard_incidence(starts_A, width)
+    XB, nB = (XA, nA) if starts_B is starts_A else _jaccard_incidence(starts_B, width)
+    return _jaccard_from_incidence(XA, nA, XB, nB)
+
+_worker_caches = {}  # per-process AlignmentCache instances opened by workers (path -> cache)
+
+def _pair_distance(metric, A, B, opts):
+    """Distance between two items (DNAstr or motif position arrays) for the pairwise builders"""
+    if metric == "entropy" or (metric == "levenshtein" and opts.get("use_alignment")):
+        path = opts.get("cache_path")
+        cache = None
+        if path is not None:
+            cache = _worker_caches.get(path)
+            if cache is None:
+                cache = _worker_caches[path] = AlignmentCache(path)
+        if cache is not None:
+            aln = cache.align(A, B, engine=opts.get("engine"), engineOpts=opts.get("engineOpts"),
+                              forced=opts.get("forced", False))
+        else:
+            aln = A.align(B, engine=opts.get("engine"), engineOpts=opts.get("engineOpts"),
+                          forced=opts.get("forced", False), store=False)
+        if metric == "entropy":
+            return A.excess_entropy(B, alignment=aln)
+        return Levenshtein.distance(*aln)
+    elif metric == "levenshtein":
+        return Levenshtein.distance(str(A), str(B))
+    elif metric == "jensenshannon":
+        return A.jensen_shannon(B)
+    elif metric == "jaccard":
+        union = np.union1d(A, B).size
+        return 1.0 if union == 0 else 1 - np.intersect1d(A, B, assume_unique=True).size / union
+    raise ValueError(f"unknown metric '{metric}'")
+
+def _jensen_shannon_pair_block(P, k0, k1, d, n, base=2):
+    """Jensen-Shannon distances of the pairs [k0, k1) from the letter distributions P (n, k), by row segments"""
+    Hp = -_xlogx(P).sum(axis=1)
+    i_first, i_last = int(_pair_index(k0)[0]), int(_pair_index(k1 - 1)[0])
+    for i in range(i_first, i_last + 1):  # pairs (i, j) of row i are contiguous in j
+        row0 = i * (i - 1) // 2
+        j0, j1 = max(k0, row0) - row0, min(k1, row0 + i) - row0
+        d[_condensed_index(n, np.arange(j0, j1), i)] = DNAstr._jensen_shannon_block(
+            P[i:i + 1], Hp[i:i + 1], P[j0:j1], Hp[j0:j1], base)[0]
+
+def _pairwise_block_worker(task):
+    """Compute the pairs [k0, k1) of a block and write them into the shared condensed distances"""
+    (k0, k1), metric, opts, items_name, items_dtype, offsets, meta, D_spec, n = task
+    shm_items = shared_memory.SharedMemory(name=items_name)
+    # D_spec = ('shm', name) for shared memory or ('file', path, dtype, offset) for a memmap file
+    shm_D = shared_memory.SharedMemory(name=D_spec[1]) if D_spec[0] == "shm" else None
+    try:
+        items = np.ndarray((int(offsets[-1]),), dtype=items_dtype, buffer=shm_items.buf)
+        if shm_D is not None:
+            d = np.ndarray((n * (n - 1) // 2,), dtype=np.float64, buffer=shm_D.buf)
+        else:
+            d = np.memmap(D_spec[1], dtype=D_spec[2], mode="r+", offset=D_spec[3], shape=(n * (n - 1) // 2,))
+        if metric == "jensenshannon":  # items are the (n, k) letter distributions: closed form by row segments
+            _jensen_shannon_pair_block(items.reshape(n, int(offsets[1] - offsets[0])), k0, k1, d, n,
+                                       opts.get("base", 2))
+        else:
+            rebuilt = {}
+            def get(i):
+                if i not in rebuilt:
+                    a = items[offsets[i]:offsets[i + 1]]
+                    if metric == "jaccard":
+                        rebuilt[i] = a.copy()
+                    else:
+                        dx, engine, engineOpts = meta[i]
+                        rebuilt[i] = DNAstr.from_codes(a, dx=dx, engine=engine, engineOpts=deepcopy(engineOpts))
+                return rebuilt[i]
+            I, J = _pair_index(np.arange(k0, k1))
+            K = _condensed_index(n, I, J)
+            for i, j, k in zip(I.tolist(), J.tolist(), K.tolist()):
+                d[k] = _pair_distance(metric, get(i), get(j), opts)
+        for cache in _worker_caches.values():
+            cache.flush()
+        if shm_D is None:
+            d.flush()
+        del items, d
+    finally:
+        shm_items.close()
+        if shm_D is not None:
+            shm_D.close()
+    return k1 - k0
+
+def _pairwise_parallel(items, metric, opts=None, meta=None, n_jobs=None, executor=None, desc="Pairwise distances",
+                       out=None):
+    """
+    Compute the condensed pairwise distances of items with a pool of workers.
+
+    Parameters
+    ----------
+    items : list of np.ndarray (1D)
+        Compact representation of each item: uint8 codes of DNAstr (DNAstr.codes), motif positions or,
+        for 'jensenshannon', letter distributions (rows of equal length).
+    metric : {'entropy', 'levenshtein', 'jensenshannon', 'jaccard'}
+        Pair distance (see `_pair_distance`; 'jensenshannon' uses the closed form of
+        `DNAstr.pairwise_jensen_shannon` by row segments).
+    opts : dict
+        Options of the metric (engine, engineOpts, forced, use_alignment, cache_path).
+    meta : list of tuples (dx, engine, engineOpts)
+        Attributes used to rebuild DNAstr items in workers.
+    n_jobs : int
+        Number of worker processes (-1 = all CPUs) when executor is None.
+    executor : concurrent.futures.Executor or None
+        Executor to use instead of a new ProcessPoolExecutor (it is not shut down).
+    desc : str
+        Progress bar label.
+    out : np.ndarray (n(n-1)/2,), optional
+        Output array. Workers write directly into a file-backed np.memmap (DNAdistanceStore.d);
+        other arrays receive a copy of the shared-memory result.
+
+    Returns
+    -------
+    d : np.ndarray (n(n-1)/2,)
+        Condensed distances (layout of scipy.spatial.distance.squareform), out if given.
+    """
+    n = len(items)
+    opts = opts or {}
+    if n_jobs is None or n_jobs < 1:
+        n_jobs = os.cpu_count() or 1
+    dtype = np.result_type(*[np.asarray(a).dtype for a in items]) if n else np.uint8
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(a) for a in items])
+    shm_items = shared_memory.SharedMemory(create=True, size=max(1, int(offsets[-1]) * np.dtype(dtype).itemsize))
+    to_file = isinstance(out, np.memmap) and out.filename is not None and out.size == n * (n - 1) // 2
+    shm_D = None if to_file else shared_memory.SharedMemory(create=True, size=max(1, n * (n - 1) // 2 * 8))
+    D_spec = ("file", out.filename, out.dtype.str, out.offset) if to_file else ("shm", shm_D.name)
+    own_executor = executor is None
+    try:
+        buf = np.ndarray((int(offsets[-1]),), dtype=dtype, buffer=shm_items.buf)
+        for i, a in enumerate(items):
+            buf[offsets[i]:offsets[i + 1]] = a
+        if to_file:
+            out.flush()
+        else:
+            d = np.ndarray((n * (n - 1) // 2,), dtype=np.float64, buffer=shm_D.buf)
+            d[:] = 0.0
+        blocks = _pair_blocks(n, 4 * n_jobs)
+        if own_executor:
+            executor = ProcessPoolExecutor(max_workers=n_jobs)
+        tasks = [(b, metric, opts, shm_items.name, np.dtype(dtype).str, offsets, meta, D_spec, n) for b in blocks]
+        with tqdm(total=n * (n - 1) // 2, desc=desc, unit="pair") as pbar:
+            for future in as_completed([executor.submit(_pairwise_block_worker, t) for t in tasks]):
+                pbar.update(future.result())
+        if to_file:
+            result = out   # workers wrote to the file, visible through the shared page cache
+        elif out is not None:
+            out[:] = d
+            result = out
+        else:
+            result = d.copy()
+        del buf
+        if not to_file:
+            del d
+    finally:
+        if own_executor and executor is not None:
+            executor.shutdown()
+        for shm in (shm_items, shm_D):
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+    return result
+
+
+# ------------------------
+# Banded global aligner ('banded' engine of DNAstr.align)
+# ------------------------
+_MOTIF_RE = re.compile(r'Y+A+Z+B+')
+
+def _motif_anchors(a, b, band, max_shift=None):
+    """
+    Anchors (i, j) pairing the starts of YAZB-like motifs of a with the nearest motifs of b.
+
+    A motif of `a` starting at i is paired with the motif of `b` starting closest to the position
+    expected from the length ratio, if it is within max_shift (default: 4 * band). Anchors are then
+    filtered to be strictly increasing in both sequences.
+    """
+    m, n = len(a), len(b)
+    if m == 0 or n == 0:
+        return []
+    max_shift = 4 * band if max_shift is None else max_shift
+    sa = np.array([mt.start() for mt in _MOTIF_RE.finditer(str(a))], dtype=np.int64)
+    sb = np.array([mt.start() for mt in _MOTIF_RE.finditer(str(b))], dtype=np.int64)
+    if sa.size == 0 or sb.size == 0:
+        return []
+    expected = sa * (n / m)
+    k = np.clip(np.searchsorted(sb, expected), 1, sb.size - 1) if sb.size > 1 else np.zeros(sa.size, dtype=int)
+    if sb.size > 1:
+        k -= (np.abs(sb[k - 1] - expected) <= np.abs(sb[k] - expected))
+    ok = np.abs(sb[k] - expected) <= max_shift
+    anchors, last_i, last_j = [], 0, 0
+    for i, j in zip(sa[ok].tolist(), sb[k[ok]].tolist()):
+        if i > last_i and j > last_j and i < m and j < n:
+            anchors.append((i, j))
+            last_i, last_j = i, j
+    return anchors
+
+def _band_limits(m, n, band=None, anchors=None):
+    """
+    Column range [lo[i], hi[i]] of each row i = 0..m of a (m+1, n+1) alignment matrix.
+
+    The band is centered on the line going through (0, 0), the anchors (i, j) and (m, n), with a
+    half-width `band` (None = full matrix). Rows are widened where needed so that the band remains
+    connected (lo[i] <= hi[i-1] + 1).
+    """
+    if band is None:
+        return np.zeros(m + 1, dtype=np.int64), np.full(m + 1, n, dtype=np.int64)
+    band = max(1, int(band))
+    anchors = sorted((int(i), int(j)) for i, j in (anchors or []) if 0 < i < m and 0 < j < n)
+    ai = np.array([0] + [i for i, _ in anchors] + [m], dtype=np.float64)
+    aj = np.array([0] + [j for _, j in anchors] + [n], dtype=np.float64)
+    keep = np.concatenate(([True], (np.diff(ai) > 0) & (np.diff(aj) >= 0)))
+    ai, aj = ai[keep], aj[keep]
+    if ai[-1] != m:
+        ai, aj = np.append(ai, m), np.append(aj, n)
+    center = np.interp(np.arange(m + 1), ai, aj)
+    lo = np.clip(np.floor(center).astype(np.int64) - band, 0, n)
+    hi = np.clip(np.ceil(center).astype(np.int64) + band, 0, n)
+    lo[0], hi[-1] = 0, n
+    lo = np.minimum(lo, np.concatenate(([0], hi[:-1] + 1)))
+    hi = np.maximum.accumulate(hi)
+    return lo, hi
+
+def _align_dp(ca, cb, lo, hi, match_score=1.0, mismatch_score=-1.0, gap_score=-1.0, wa=None, wb=None):
+    """
+    Global alignment by dynamic programming restricted to the columns [lo[i], hi[i]] of each row.
+
+    The matrix is filled row by row (rows = ca, columns = cb). With linear gap scores, the
+    horizontal recursion H[i, j] = max(C[j], H[i, j-1] + gap_j) is solved in one vectorized pass
+    as H[i, j] = G[j] + cummax(C[k] - G[k]), G being the cumulated gap scores along the row.
+
+    With weights (run-length form), symbol i of ca stands for wa[i] repeated samples: aligning two
+    runs scores the overlap min(wa, wb) as matches or mismatches and the surplus |wa - wb| as gaps,
+    and a gapped run scores gap_score * width.
+
+    Parameters
+    ----------
+    ca, cb : np.ndarray (integer codes)
+        Symbols of both sequences.
+    lo, hi : np.ndarray (int, length len(ca) + 1)
+        Band limits (see `_band_limits`).
+    match_score, mismatch_score, gap_score : float
+        Scores per sample.
+    wa, wb : np.ndarray or None
+        Widths of the symbols (None = 1).
+
+    Returns
+    -------
+    moves : np.ndarray (uint8)
+        Alignment path: 0 = pair (diagonal), 1 = symbol of ca against a gap, 2 = symbol of cb against a gap.
+    """
+    m, n = ca.size, cb.size
+    weighted = wa is not None or wb is not None
+    wa = np.ones(m) if wa is None else np.asarray(wa, dtype=np.float64)
+    wb = np.ones(n) if wb is None else np.asarray(wb, dtype=np.float64)
+    width = int(np.max(hi - lo)) + 1
+    if not weighted:
+        # substitution scores of each symbol of ca against cb
+        letters, ia = np.unique(ca, return_inverse=True)
+        sub = np.where(cb[None, :] == letters[:, None], match_score, mismatch_score).astype(np.float64)
+    # DP (two full-length rows, -inf outside the band) and traceback (0 diag, 1 up, 2 left)
+    trace = np.full((m + 1, width), 2, dtype=np.uint8)
+    prev = np.full(n + 1, -np.inf)
+    curr = np.full(n + 1, -np.inf)
+    cols = np.concatenate(([0.0], np.cumsum(wb))) * gap_score
+    prev[lo[0]:hi[0] + 1] = cols[lo[0]:hi[0] + 1]
+    lo_, hi_ = lo.tolist(), hi.tolist()
+    wa_, gapa = wa.tolist(), (gap_score * wa).tolist()
+    rows = ca.tolist() if weighted else ia.tolist()
+    for i in range(1, m + 1):
+        l, h = lo_[i], hi_[i]
+        up = prev[l:h + 1] + gapa[i - 1]
+        k0 = max(l, 1)
+        if weighted:
+            wj = wb[k0 - 1:h]
+            s = np.where(cb[k0 - 1:h] == rows[i - 1], match_score, mismatch_score) * np.minimum(wa_[i - 1], wj) \
+                + gap_score * np.abs(wa_[i - 1] - wj)
+        else:
+            s = sub[rows[i - 1], k0 - 1:h]
+        if l > 0:
+            diag = prev[l - 1:h] + s
+        else:
+            diag = np.empty(h + 1)
+            diag[0] = -np.inf
+            diag[1:] = prev[:h] + s
+        C = np.maximum(diag, up)
+        H = np.maximum.accumulate(C - cols[l:h + 1])
+        H += cols[l:h + 1]
+        t = trace[i, :h - l + 1]
+        np.less(diag, up, out=t, casting="unsafe")
+        t[H > C] = 2
+        prev[lo_[i - 1]:hi_[i - 1] + 1] = -np.inf
+        curr[l:h + 1] = H
+        prev, curr = curr, prev
+    if not np.isfinite(prev[n]):
+        raise RuntimeError("banded alignment failed: increase the band width")
+    # traceback
+    moves = bytearray()
+    i, j = m, n
+    while i > 0 or j > 0:
+        d = trace[i, j - lo_[i]] if i > 0 else 2
+        moves.append(d)
+        if d == 0:
+            i -= 1
+            j -= 1
+        elif d == 1:
+            i -= 1
+        else:
+            j -= 1
+    return np.frombuffer(bytes(moves[::-1]), dtype=np.uint8)
+
+def _apply_moves(moves, ca, cb, fill=ord(' ')):
+    """Aligned arrays of ca and cb (gaps = fill) following an alignment path (see `_align_dp`)"""
+    use_a = moves != 2
+    use_b = moves != 1
+    out_a = np.where(use_a, ca[np.maximum(np.cumsum(use_a) - 1, 0)], fill) if ca.size else np.full(moves.size, fill)
+    out_b = np.where(use_b, cb[np.maximum(np.cumsum(use_b) - 1, 0)], fill) if cb.size else np.full(moves.size, fill)
+    return out_a, out_b
+
+def _banded_align(a, b, band=64, anchors=None, match_score=1.0, mismatch_score=-1.0, gap_score=-1.0,
+                  max_shift=None):
+    """
+    Global alignment of two symbol strings restricted to a band around a (piecewise) diagonal.
+
+    The dynamic programming matrix is filled row by row (rows = a, columns = b), each row only
+    over its band (see `_align_dp`). The cost is O(len(a) * band) in time and memory
+    (one uint8 traceback byte per cell of the band).
+
+    Parameters
+    ----------
+    a, b : str
+        Sequences to align (a = reference/other, b = query/self in DNAstr.align).
+    band : int
+        Half-width of the band (default: 64). Where the band center line is steeper than one
+        column per row, rows are widened so that the band remains connected.
+    anchors : None, 'motifs' or list of (i, j)
+        Anchor positions (i in a, j in b) the band center line goes through. 'motifs' pairs the
+        YAZB-like motifs of both sequences (see `_motif_anchors`). None: straight diagonal.
+    match_score, mismatch_score, gap_score : float
+        Scores (default: 1, -1, -1).
+    max_shift : int or None
+        Maximum distance between paired motifs (anchors='motifs', default: 4 * band).
+
+    Returns
+    -------
+    aligned_a, aligned_b : str
+        Aligned sequences with gaps as spaces.
+    """
+    a, b = str(a), str(b)
+    m, n = len(a), len(b)
+    if m == 0 or n == 0:
+        return a.ljust(n), b.ljust(m)
+    if isinstance(anchors, str):
+        if anchors != "motifs":
+            raise ValueError(f"anchors must be None, 'motifs' or a list of (i, j) not '{anchors}'")
+        anchors = _motif_anchors(a, b, max(1, int(band)), max_shift)
+    lo, hi = _band_limits(m, n, band, anchors)
+    ca = np.frombuffer(a.encode("utf-32-le"), dtype=np.uint32)
+    cb = np.frombuffer(b.encode("utf-32-le"), dtype=np.uint32)
+    moves = _align_dp(ca, cb, lo, hi, match_score, mismatch_score, gap_score)
+    out_a, out_b = _apply_moves(moves, ca, cb)
+    return (out_a.astype(np.uint32).tobytes().decode("utf-32-le"),
+            out_b.astype(np.uint32).tobytes().decode("utf-32-le"))
+
+def _run_lengths(codes):
+    """Run-length form (letters, widths) of an array of symbol codes"""
+    codes = np.asarray(codes)
+    if codes.size == 0:
+        return codes[:0], np.zeros(0, dtype=np.int64)
+    starts = np.concatenate(([0], np.flatnonzero(codes[1:] != codes[:-1]) + 1))
+    return codes[starts], np.diff(np.append(starts, codes.size))
+
+def _rle_align(letters_a, widths_a, letters_b, widths_b, band=None, anchors=None,
+               match_score=1.0, mismatch_score=-1.0, gap_score=-1.0, max_shift=None, engineOpts=None):
+    """
+    Width-aware global alignment of two sequences in run-length form.
+
+    Runs are aligned as wholes: a pair of runs scores its overlap min(wa, wb) as matches or
+    mismatches and its surplus |wa - wb| as gaps, a gapped run scores gap_score * width (see
+    `_align_dp`). The DP runs over runs, which are usually 20-100x fewer than samples.
+
+    Parameters
+    ----------
+    letters_a, widths_a : np.ndarray (uint8), np.ndarray (int)
+        Runs of the reference (other in DNAstr.align).
+    letters_b, widths_b : np.ndarray (uint8), np.ndarray (int)
+        Runs of the query (self in DNAstr.align).
+    band : int or None
+        Half-width of the band in runs (None = full DP over runs).
+    anchors : None, 'motifs' or list of (i, j)
+        Anchor runs (see `_banded_align`), used only with a band.
+    match_score, mismatch_score, gap_score : float
+        Scores per sample (default: 1, -1, -1).
+    max_shift : int or None
+        Maximum distance (in runs) between paired motifs (anchors='motifs').
+    engineOpts : dict or None
+        Options recorded in the result.
+
+    Returns
+    -------
+    DNAsegmentAlignment
+        Run-level alignment (query = b, reference = a).
+    """
+    la, lb = np.asarray(letters_a, dtype=np.uint8), np.asarray(letters_b, dtype=np.uint8)
+    wa, wb = np.asarray(widths_a, dtype=np.int64), np.asarray(widths_b, dtype=np.int64)
+    m, n = la.size, lb.size
+    if isinstance(anchors, str):
+        if anchors != "motifs":
+            raise ValueError(f"anchors must be None, 'motifs' or a list of (i, j) not '{anchors}'")
+        anchors = _motif_anchors(la.tobytes().decode("ascii"), lb.tobytes().decode("ascii"),
+                                 max(1, int(band or 64)), max_shift)
+    if m == 0 or n == 0:
+        moves = np.full(m + n, 1 if m else 2, dtype=np.uint8)
+    else:
+        lo, hi = _band_limits(m, n, band, anchors)
+        moves = _align_dp(la, lb, lo, hi, match_score, mismatch_score, gap_score, wa=wa, wb=wb)
+    out_a, out_b = _apply_moves(moves, la, lb)
+    ow_a, ow_b = _apply_moves(moves, wa, wb, fill=0)
+    return DNAsegmentAlignment(out_b.astype(np.uint8).tobytes().decode("ascii"),
+                               out_a.astype(np.uint8).tobytes().decode("ascii"),
+                               ow_b, ow_a, engine="rle", engineOpts=engineOpts)
+
+# ------------------------
+# DNAstr class
+# ------------------------
+class DNAstr(str):
+    """
+    A symbolic DNA-like sequence class supporting alignment, entropy analysis,
+    edit-distance metrics, and signal reconstruction from symbolic codes.
+
+    Extended from `str`, it is designed for symbolic transformations of signals
+    (e.g., wavelet-encoded GC-MS peaks or time series).
+
+    Main Features
+    -------------
+    - Supports symbolic operations for pattern recognition, entropy, alignment.
+    - Encodes x-resolution (`dx`), original index (`iloc`), and physical x-range (`xloc`).
+    - Aligns sequences with visual inspection and rich diffs.
+    - Converts symbolic strings into synthetic numerical signals.
+
+    Operators
+    ---------
+    + : concatenate two DNAstr objects
+    - : symbolic difference after alignment (mismatches only)
+    == : equality comparison (exact content and dx)
+
+    Key Methods
+    -----------
+    - __init__ / __new__      : Constructor with metadata (`dx`, `iloc`, `xloc`)
+    - align(other)            : Align this DNAstr to another, return a DNAalignment (kept as self.alignment)
+    - wrapped_alignment()     : Pretty terminal view of the alignment with colors and symbols
+    - html_alignment()        : Rich HTML display of the alignment (Jupyter)
+    - plot_alignment()        : Visualize waveform alignment with symbolic signals
+    - plot_mask()             : Color block plot showing matches/mismatches/gaps
+    - find(pattern, regex=False) : Search for symbolic patterns with fuzziness or regex
+    - to_signal()             : Convert symbolic code into synthetic signal (NumPy)
+    - vectorized()            : Convert string to integer codes
+    - codes                   : Property: read-only uint8 view of the ASCII content (cached)
+    - counts / letter_counts  : Property: letter histogram (np.bincount on codes)
+    - summary()               : Print entropy and character frequencies
+    - mutation_counts         : Property: {'matches', 'mismatches', 'indels'}
+    - entropy                 : Property: Shannon entropy
+    - mutual_entropy(other)   : Mutual entropy of two sequences
+    - excess_entropy(other)   : Excess entropy H1 + H2 - 2 * H12
+    - jensen_shannon(other)   : Jensen-Shannon divergence
+    - jaccard(other)          : Jaccard similarity
+    - pairwise_levenshtein(list): Static: condensed Levenshtein distances of many sequences (bulk)
+    - pairwise_jensen_shannon(list): Static: condensed Jensen-Shannon distances (histogram matrix)
+    - alignment_stats         : Property: Match, substitution, gap counts
+    - score(normalized=True) : Alignment score (fraction of matches)
+    - has(other: str)         : Check if a pattern or substring exists
+    - digest(algorithm)       : Hexadecimal digest ('sha256', 'blake2b' or 'crc32'); _hash caches it lazily
 
     Attributes
     ----------
@@ -3056,16 +5033,18 @@ class DNAstr(str):
         Positional index or index range in the source DNA string.
     xloc : float or tuple of float
         Corresponding x-value(s) for the symbolic sequence.
+    alignment : DNAalignment or None
+        Result of the last call to align() (align() returns it as well).
     aligned_with : str or None
-        Aligned form of self with insertions (spaces) where needed.
+        Aligned form of self with insertions (spaces) where needed (read from alignment).
     other_copy : str or None
-        Aligned form of the reference sequence.
+        Aligned form of the reference sequence (read from alignment).
     ref_hash : str or None
-        SHA256 hash of the aligned reference sequence.
+        SHA256 hash of the aligned reference sequence (read from alignment).
     mask : str or None
-        Alignment mask: '=' for matches, '*' for substitutions, ' ' for gaps.
+        Alignment mask: '=' for matches, '*' for substitutions, ' ' for gaps (read from alignment).
     engine : str
-        Alignment engine: 'difflib' or 'bio'.
+        Alignment engine: 'difflib', 'bio' or 'banded'.
     engineOpts : dict
         Options passed to the alignment engine.
 
@@ -3096,7 +5075,7 @@ class DNAstr(str):
             Integer index or start index of the sequence (default: 0).
         xloc : float, optional
             X-coordinate of the sequence origin.
-        engine : {'difflib', 'bio'}, optional
+        engine : {'difflib', 'bio', 'banded'}, optional
             Default alignment engine to use.
         engineOpts : dict, optional
             Dictionary of alignment parameters for the selected engine.
@@ -3112,18 +5091,159 @@ class DNAstr(str):
         obj.xloc = xloc
         obj.x_label = x_label
         obj.x_unit = x_unit
-        obj.aligned_with = None
-        obj.other_copy = None
         obj.ref_aligned = None
-        obj.ref_hash = None
-        obj.mask = None
-        if engine not in ("difflib", "bio"):
-            raise ValueError('engine must be "difflib" or "bio"')
+        obj._alignment = None # last DNAalignment (see alignment)
+        if engine not in ("difflib", "bio", "banded", "rle"):
+            raise ValueError('engine must be "difflib", "bio", "banded" or "rle"')
         obj.engine = engine
         obj.engineOpts = engineOpts or {}
-        obj._hash = hashlib.sha256(obj.encode()).hexdigest()
+        obj._hash_value = None # digest computed on demand (see _hash)
+        obj._codes = None # uint8 view (see codes)
+        obj._counts = None # letter histogram (see counts)
+        obj._motifs = None # motif positions (see motif_positions)
         return obj
 
+    @classmethod
+    def from_codes(cls, codes, **kwargs):
+        """
+        Construct a DNAstr from an array of uint8 ASCII codes (the array is kept as `codes`).
+
+        Parameters
+        ----------
+        codes : np.ndarray (uint8)
+            ASCII codes of the letters.
+        **kwargs :
+            Passed to the DNAstr constructor (dx, iloc, xloc, x_label, x_unit...).
+
+        Returns
+        -------
+        DNAstr
+        """
+        codes = np.ascontiguousarray(codes, dtype=np.uint8)
+        obj = cls(codes.tobytes().decode("ascii"), **kwargs)
+        obj._codes = codes
+        obj._codes.flags.writeable = False
+        return obj
+
+    @staticmethod
+    def _as_codes(s):
+        """Return the uint8 ASCII codes of any str (cached view for DNAstr)"""
+        if isinstance(s, DNAstr):
+            return s.codes
+        return np.frombuffer(str(s).encode("ascii", errors="replace"), dtype=np.uint8)
+
+    @staticmethod
+    def _entropy_from_counts(counts):
+        """Shannon entropy (bits) of a histogram"""
+        counts = counts[counts > 0]
+        total = counts.sum()
+        if total == 0:
+            return 0.0
+        p = counts / total
+        return float(-np.sum(p * np.log2(p)))
+
+    # digest algorithm used by _hash: 'sha256' (default), 'blake2b' (faster) or 'crc32' (non-cryptographic)
+    hash_algorithm = "sha256"
+
+    def digest(self, algorithm=None):
+        """
+        Return a hexadecimal digest of the content.
+
+        Parameters
+        ----------
+        algorithm : {'sha256', 'blake2b', 'crc32'} or None, optional
+            Digest algorithm (default: DNAstr.hash_algorithm).
+            'blake2b' (128 bits) is faster than 'sha256', 'crc32' is a cheap non-cryptographic checksum.
+
+        Returns
+        -------
+        str
+            Hexadecimal digest (computed once per algorithm and memoised on the instance).
+        """
+        algorithm = algorithm or self.hash_algorithm
+        memo = getattr(self, "__dict__", {}).setdefault("_digests", {}) # per algorithm (DNAstr only)
+        h = memo.get(algorithm)
+        if h is None:
+            data = self.encode()
+            if algorithm == "sha256":
+                h = hashlib.sha256(data).hexdigest()
+            elif algorithm == "blake2b":
+                h = hashlib.blake2b(data, digest_size=16).hexdigest()
+            elif algorithm == "crc32":
+                h = f"{zlib.crc32(data):08x}"
+            else:
+                raise ValueError(f"unknown digest algorithm '{algorithm}' (use 'sha256', 'blake2b' or 'crc32')")
+            memo[algorithm] = h
+        return h
+
+    @property
+    def _hash(self):
+        """Digest of the content (computed on first access and cached), used as display name"""
+        h = self.__dict__.get("_hash_value")
+        if h is None:
+            h = self.digest()
+            self.__dict__["_hash_value"] = h
+        return h
+
+    @_hash.setter
+    def _hash(self, value):
+        self.__dict__["_hash_value"] = value
+
+    @property
+    def alignment(self):
+        """Last alignment result (DNAalignment) or None"""
+        return self.__dict__.get("_alignment")
+
+    @property
+    def aligned_with(self):
+        """Aligned form of self (from the last alignment) or None"""
+        aln = self.alignment
+        return None if aln is None else aln.aligned_self
+
+    @property
+    def other_copy(self):
+        """Aligned form of the reference sequence (from the last alignment) or None"""
+        aln = self.alignment
+        return None if aln is None else aln.aligned_other
+
+    @property
+    def mask(self):
+        """Alignment mask (from the last alignment) or None"""
+        aln = self.alignment
+        return None if aln is None else aln.mask
+
+    @property
+    def ref_hash(self):
+        """SHA256 hash of the aligned reference sequence (from the last alignment) or None"""
+        aln = self.alignment
+        return None if aln is None else aln.ref_hash
+
+    @property
+    def codes(self):
+        """
+        Read-only uint8 NumPy view of the ASCII content (cached).
+
+        Letter counts, entropy, Jensen-Shannon histograms and vectorization use this view with
+        `np.bincount` instead of Python loops over characters.
+        """
+        if getattr(self, "_codes", None) is None:
+            self._codes = np.frombuffer(str.encode(self, "ascii", errors="replace"), dtype=np.uint8)
+        return self._codes
+
+    @property
+    def counts(self):
+        """Histogram of ASCII codes (np.ndarray of length 256, cached)"""
+        if getattr(self, "_counts", None) is None:
+            self._counts = np.bincount(self.codes, minlength=256)
+            self._counts.flags.writeable = False
+        return self._counts
+
+    @property
+    def letter_counts(self):
+        """Dictionary {letter: count} of the letters present in the sequence"""
+        c = self.counts
+        return {chr(i): int(c[i]) for i in np.flatnonzero(c)}
+
     def __hash__(self):
         """
         Return hash combining the string content and dx.
@@ -3145,13 +5265,10 @@ class DNAstr(str):
             Dictionary containing length, letter frequency, Shannon entropy, and dx.
         """
         length = len(self)
-        freqs = Counter(self)
-        prob = np.array(list(freqs.values())) / length
-        entropy = -np.sum(prob * np.log2(prob))
         return {
             'length': length,
-            'letters': dict(freqs),
-            'entropy (Shannon)': entropy,
+            'letters': self.letter_counts,
+            'entropy (Shannon)': self.entropy,
             'dx': self.dx
         }
 
@@ -3171,11 +5288,15 @@ class DNAstr(str):
         np.ndarray
             Vectorized integer representation of the string.
         """
-        from collections import OrderedDict
+        codes = self.codes
         if codebook is None:
-            unique_chars = list(OrderedDict.fromkeys(self))
-            codebook = {c: i for i, c in enumerate(unique_chars)}
-        return np.array([codebook.get(c, -1) for c in self], dtype=int)
+            unique_codes, first = np.unique(codes, return_index=True)
+            codebook = {chr(c): i for i, c in enumerate(unique_codes[np.argsort(first)])}
+        lut = np.full(256, -1, dtype=int) # lookup table indexed by ASCII code
+        for c, v in codebook.items():
+            if len(c) == 1 and ord(c) < 256:
+                lut[ord(c)] = v
+        return lut[codes]
 
     def __eq__(self, other):
         """
@@ -3238,8 +5359,8 @@ class DNAstr(str):
         """
         if not isinstance(other, DNAstr):
             raise TypeError("Can only subtract DNAstr instances")
-        self.align(other)
-        mismatch = ''.join([a for a, b in zip(self.aligned_with, self.other_copy) if a != b and b != ' '])
+        aln = self.align(other)
+        mismatch = ''.join([a for a, b in zip(aln.aligned_self, aln.aligned_other) if a != b and b != ' '])
         return DNAstr(mismatch, dx=self.dx, iloc=self.iloc, xloc=self.xloc,
                                    x_label=self.x_label, x_unit=self.x_unit)
 
@@ -3255,26 +5376,22 @@ class DNAstr(str):
     @property
     def entropy(self):
         """Compute the Shannon entropy of the DNAstr sequence"""
-        count = Counter(self)
-        total = sum(count.values())
-        return -sum((v / total) * np.log2(v / total) for v in count.values())
+        return self._entropy_from_counts(self.counts)
 
-    def mutual_entropy(self, other=None):
+    def mutual_entropy(self, other=None, alignment=None):
         """Compute the Shannon mutual entropy of two DNAstr sequences from their aligned segments"""
+        if alignment is not None:
+            return alignment.mutual_entropy
         if other is not None and not isinstance(other,DNAstr):
             raise TypeError(f"other must be a DNAstr not a {type(self).__name__}")
-        if other is None and (not hasattr(self,"aligned_with") or self.aligned_with is None):
+        if other is None and self.alignment is None:
             raise ValueError("align the code with .align(other) or provide other")
-        if isinstance(other,DNAstr):
-            self.align(other)
-        aligned = self.aligned_code
-        count = Counter(aligned)
-        total = sum(count.values())
-        return -sum((v / total) * np.log2(v / total) for v in count.values())
-
-    def excess_entropy(self, other):
+        aln = self.align(other) if isinstance(other,DNAstr) else self.alignment
+        return aln.mutual_entropy
+
+    def excess_entropy(self, other, alignment=None):
         """Compute the excess Shannon entropy of two DNAstr sequences H(A)+H(B)-2*H(AB)"""
-        return self.entropy + other.entropy - 2 * self.mutual_entropy(other)
+        return self.entropy + other.entropy - 2 * self.mutual_entropy(other, alignment=alignment)
 
     def jensen_shannon(self, other, base=2):
         """
@@ -3292,11 +5409,11 @@ class DNAstr(str):
         float
             Jensen-Shannon distance.
         """
-        v1 = Counter(self)
-        v2 = Counter(other)
-        all_keys = sorted(set(v1) | set(v2))
-        p = np.array([v1.get(k, 0) for k in all_keys], dtype=float)
-        q = np.array([v2.get(k, 0) for k in all_keys], dtype=float)
+        v1 = self.counts
+        v2 = other.counts if isinstance(other, DNAstr) else np.bincount(self._as_codes(other), minlength=256)
+        all_keys = np.flatnonzero(v1 + v2)
+        p = v1[all_keys].astype(float)
+        q = v2[all_keys].astype(float)
         p /= p.sum()
         q /= q.sum()
         return jensenshannon(p, q, base=base)
@@ -3313,7 +5430,7 @@ class DNAstr(str):
         use_alignment : bool, default=True
             If True, uses the aligned sequences (computed if necessary).
             If False, compares the raw sequences directly.
-        engine : {'difflib', 'bio'}, optional
+        engine : {'difflib', 'bio', 'banded'}, optional
             Alignment engine to use if alignment is needed.
         engineOpts : dict, optional
             Parameters for the selected alignment engine.
@@ -3322,25 +5439,162 @@ class DNAstr(str):
 
         Returns
         -------
-        dist : int
-            Levenshtein distance between the two sequences (aligned or raw).
-
-        Examples
-        --------
-        A = DNAstr("YAZBZAY")
-        B = DNAstr("YAZBZZY")
-        A.levenshtein_distance(B, use_alignment=False)  # raw
-        A.levenshtein_distance(B, use_alignment=True, engine="bio")  # aligned
+        dist : int
+            Levenshtein distance between the two sequences (aligned or raw).
+
+        Examples
+        --------
+        A = DNAstr("YAZBZAY")
+        B = DNAstr("YAZBZZY")
+        A.levenshtein_distance(B, use_alignment=False)  # raw
+        A.levenshtein_distance(B, use_alignment=True, engine="bio")  # aligned
+        """
+        if not isinstance(other, DNAstr):
+            raise TypeError("Argument must be a DNAstr instance")
+        if use_alignment:
+            s1, s2 = self.align(other, engine=engine, engineOpts=engineOpts, forced=forced)
+        else:
+            s1, s2 = str(self), str(other)
+        return Levenshtein.distance(s1, s2)
+
+    @staticmethod
+    def pairwise_levenshtein(sequences, workers=-1, chunk=2048, dtype=np.int32, out=None):
+        """
+        Levenshtein distances between all pairs of sequences, as a condensed vector.
+
+        Distances are evaluated in bulk by `rapidfuzz.process.cdist` (multithreaded C++ kernels,
+        bit-parallel over the small alphabet) by blocks of `chunk` rows, so that no Python code
+        runs per pair. Without rapidfuzz, `Levenshtein.distance` is called for each pair.
+
+        Parameters
+        ----------
+        sequences : list of DNAstr or str
+            Sequences to compare (n).
+        workers : int, optional
+            Number of threads (-1 = all CPUs, default).
+        chunk : int, optional
+            Number of rows evaluated per block (bounds the memory to chunk * n distances).
+        dtype : numpy dtype, optional
+            Output type (default: np.int32).
+        out : np.ndarray (n * (n - 1) // 2,), optional
+            Output array (e.g. the memmap of a DNAdistanceStore) filled block by block.
+
+        Returns
+        -------
+        np.ndarray (n * (n - 1) // 2,)
+            Condensed distances in the order of scipy.spatial.distance.squareform
+            (pairs (i, j), i < j, row by row).
+
+        Example
+        -------
+        >>> d = DNAstr.pairwise_levenshtein([dna.codesfull[4] for dna in dnalist])
+        >>> D = squareform(d)
+        """
+        seqs = [str(s) for s in sequences]
+        n = len(seqs)
+        out = np.empty(n * (n - 1) // 2, dtype=dtype) if out is None else out
+        if n < 2:
+            return out
+        if rf_cdist is None:
+            k = 0
+            for i in range(n - 1):
+                for j in range(i + 1, n):
+                    out[k] = Levenshtein.distance(seqs[i], seqs[j])
+                    k += 1
+            return out
+        chunk = max(1, int(chunk))
+        k = 0
+        for i0 in range(0, n - 1, chunk):
+            i1 = min(n - 1, i0 + chunk)
+            if i0 == 0 and i1 == n - 1:
+                block = rf_cdist(seqs, seqs, scorer=rf_Levenshtein.distance, dtype=np.int32, workers=workers)
+            else:
+                block = rf_cdist(seqs[i0:i1], seqs[i0:], scorer=rf_Levenshtein.distance, dtype=np.int32,
+                                 workers=workers)
+            for r in range(i1 - i0):
+                row = block[r, r + 1:]
+                out[k:k + row.size] = row
+                k += row.size
+        return out
+
+    @staticmethod
+    def histograms(sequences):
+        """
+        Letter histograms of several sequences (np.bincount on their uint8 views).
+
+        Parameters
+        ----------
+        sequences : list of DNAstr or str
+
+        Returns
+        -------
+        H : np.ndarray (n, k)
+            Counts of the k letters present in at least one sequence.
+        letters : str
+            The k letters (columns of H), in ASCII order.
+        """
+        counts = np.array([s.counts if isinstance(s, DNAstr) else
+                           np.bincount(DNAstr._as_codes(s), minlength=256) for s in sequences],
+                          dtype=np.float64).reshape(-1, 256)
+        cols = np.flatnonzero(counts.sum(axis=0))
+        return counts[:, cols], ''.join(chr(c) for c in cols)
+
+    @staticmethod
+    def _jensen_shannon_profiles(H):
+        """Letter distributions P (n, k) of the histograms H and their entropies (nats)"""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            P = np.nan_to_num(H / H.sum(axis=1, keepdims=True))
+        return P, -_xlogx(P).sum(axis=1)
+
+    @staticmethod
+    def _jensen_shannon_block(Pa, Ha, Pb, Hb, base=2):
+        """Jensen-Shannon distances (na, nb) between two blocks of letter distributions (closed form)"""
+        jsd = -_xlogx(0.5 * (Pa[:, None, :] + Pb[None, :, :])).sum(axis=2) - 0.5 * (Ha[:, None] + Hb[None, :])
+        return np.sqrt(np.maximum(jsd, 0.0) / np.log(base))
+
+    @staticmethod
+    def pairwise_jensen_shannon(sequences, base=2, chunk=None, maxbytes=64 * 2**20, out=None):
+        """
+        Jensen-Shannon distances between the letter histograms of all pairs of sequences (condensed).
+
+        One (n, k) histogram matrix is built for the collection and the distances are derived by
+        broadcasting, by blocks of rows, from JSD(p, q) = H((p + q) / 2) - (H(p) + H(q)) / 2.
+        The result equals `DNAstr.jensen_shannon` (scipy.spatial.distance.jensenshannon) for each pair.
+
+        Parameters
+        ----------
+        sequences : list of DNAstr or str
+            Sequences to compare (n).
+        base : float, optional
+            Base of the logarithm (default: 2).
+        chunk : int or None, optional
+            Number of rows per block (None: derived from maxbytes).
+        maxbytes : int, optional
+            Approximate memory used by a block (default: 64 MB).
+        out : np.ndarray (n * (n - 1) // 2,), optional
+            Output array (e.g. the memmap of a DNAdistanceStore) filled block by block.
+
+        Returns
+        -------
+        np.ndarray (n * (n - 1) // 2,)
+            Condensed distances in the order of scipy.spatial.distance.squareform.
         """
-        if not isinstance(other, DNAstr):
-            raise TypeError("Argument must be a DNAstr instance")
-        if use_alignment:
-            self.align(other, engine=engine, engineOpts=engineOpts, forced=forced)
-            s1, s2 = self.aligned_with, self.other_copy
-        else:
-            s1, s2 = str(self), str(other)
-        return Levenshtein.distance(s1, s2)
-
+        P, Hp = DNAstr._jensen_shannon_profiles(DNAstr.histograms(sequences)[0])
+        n, k = P.shape
+        out = np.empty(n * (n - 1) // 2, dtype=np.float64) if out is None else out
+        if n < 2:
+            return out
+        if chunk is None:
+            chunk = max(1, int(maxbytes // (8 * 3 * max(1, n * k))))
+        pos = 0
+        for i0 in range(0, n - 1, chunk):
+            i1 = min(n - 1, i0 + chunk)
+            dist = DNAstr._jensen_shannon_block(P[i0:i1], Hp[i0:i1], P[i0:], Hp[i0:], base)
+            for r in range(i1 - i0):
+                row = dist[r, r + 1:]
+                out[pos:pos + row.size] = row
+                pos += row.size
+        return out
 
     def jaccard(self, other):
         """
@@ -3356,13 +5610,14 @@ class DNAstr(str):
         float
             Jaccard distance: 1 - (intersection / union) of unique letters.
         """
-        set_self = set(self)
-        set_other = set(other)
-        intersection = set_self & set_other
-        union = set_self | set_other
-        return 1 - len(intersection) / len(union) if union else 0.0
+        present_self = self.counts > 0
+        present_other = (other.counts if isinstance(other, DNAstr) else
+                         np.bincount(self._as_codes(other), minlength=256)) > 0
+        intersection = np.count_nonzero(present_self & present_other)
+        union = np.count_nonzero(present_self | present_other)
+        return 1 - intersection / union if union else 0.0
 
-    def align(self, other, engine=None, engineOpts=None, forced=False):
+    def align(self, other, engine=None, engineOpts=None, forced=False, store=True):
         """
         Align this DNAstr sequence to another, allowing insertions/deletions to maximize matches.
 
@@ -3370,40 +5625,51 @@ class DNAstr(str):
         ----------
         other : DNAstr
             Another DNAstr object to align with.
-        engine : {'difflib', 'bio'} or None
+        engine : {'difflib', 'bio', 'banded'} or None
             Alignment engine to use:
                 - 'difflib': uses difflib.SequenceMatcher (fast, approximate).
                 - 'bio'   : uses Bio.Align.PairwiseAligner (biologically inspired global alignment).
+                - 'banded': NumPy global alignment restricted to a band around the diagonal,
+                            optionally anchored on shared motifs, O(n * band) (see `_banded_align`).
+                            Options: band (64), anchors (None, 'motifs' or [(i_other, j_self), ...]),
+                            match_score (1), mismatch_score (-1), gap_score (-1), max_shift.
+                - 'rle'   : width-aware alignment of the run-length forms (runs of identical letters),
+                            see `_rle_align`. Options: band (None = full DP over runs), anchors,
+                            scores as 'banded', expand (True: full-resolution result; False: returns
+                            the run-level DNAsegmentAlignment).
             If None, defaults to self.engine.
         engineOpts : dict, optional
             Dictionary of alignment parameters for the selected engine.
         forced : bool
             If True, allow alignment even if `dx` values differ. If False (default), a mismatch in
             `dx` will raise an error to prevent incorrect alignment of signals with different sampling.
+        store : bool, optional
+            If True (default), the result is kept as `self.alignment` (read by aligned_with,
+            other_copy, mask, ref_hash, plots...). Use False to leave self untouched (e.g. when
+            the same sequence is aligned against several partners concurrently).
 
         Returns
         -------
-        aligned_self : str
-            Aligned version of this sequence (with gaps inserted where needed).
-        aligned_other : str
-            Aligned version of the other sequence.
+        DNAalignment
+            Immutable alignment result, which unpacks as (aligned_self, aligned_other):
+            aligned_self : str
+                Aligned version of this sequence (with gaps inserted where needed).
+            aligned_other : str
+                Aligned version of the other sequence.
 
         Notes
         -----
-        The alignment is symmetric and permanent: both sequences are aligned with
-        gaps introduced (spaces) to preserve positional correspondence. A hash of
-        the aligned `other` sequence is stored to detect redundant alignments.
+        Both sequences are aligned with gaps introduced (spaces) to preserve positional
+        correspondence. The stored result is reused when self is aligned again against the
+        same content with the same engine and options.
 
-        A match mask (`self.mask`) is generated with:
+        A match mask (`result.mask`, also `self.mask`) is generated with:
             '=' for exact matches,
             '*' for mismatches (substitutions),
             ' ' for insertions/deletions (gaps).
 
-        The method updates:
-            - self.aligned_with
-            - self.other_copy
-            - self.mask
-            - self.ref_hash
+        The method updates (unless store=False):
+            - self.alignment (aligned_with, other_copy, mask and ref_hash are read from it)
 
         Example:
         --------
@@ -3442,11 +5708,11 @@ class DNAstr(str):
             raise TypeError("Alignment requires another DNAstr instance")
         if not forced and self.dx != other.dx:
             raise ValueError("dx mismatch. Use forced=True to override.")
-        if hasattr(other, 'ref_hash') and self.ref_hash is not None and self.ref_hash == other.ref_hash:
-            return self.aligned_with, self.other_copy
-
         engine = engine or self.engine
         engineOpts = engineOpts or self.engineOpts.get(engine, {})
+        last = self.alignment
+        if last is not None and last.is_alignment_of(other, engine, engineOpts):
+            return last
 
         if engine == 'difflib':
             sm = SequenceMatcher(None, other, self)
@@ -3455,9 +5721,10 @@ class DNAstr(str):
                 if tag == 'equal':
                     aligned_self.extend(self[j1:j2])
                     aligned_other.extend(other[i1:i2])
-                elif tag == 'replace':
-                    aligned_self.extend(self[j1:j2])
-                    aligned_other.extend(other[i1:i2])
+                elif tag == 'replace': # blocks of different lengths are padded with gaps
+                    w = max(j2 - j1, i2 - i1)
+                    aligned_self.extend(self[j1:j2].ljust(w))
+                    aligned_other.extend(other[i1:i2].ljust(w))
                 elif tag == 'insert':
                     aligned_self.extend(self[j1:j2])
                     aligned_other.extend(' ' * (j2 - j1))
@@ -3507,37 +5774,41 @@ class DNAstr(str):
             aligned_other.extend(other[other_pos:])
             aligned_self.extend([' '] * (len(other) - other_pos))
 
-        else:
-            raise ValueError("Unknown alignment engine: choose 'difflib' or 'bio'")
+        elif engine == 'banded':
+            aligned_other, aligned_self = _banded_align(other, self, **engineOpts)
 
-        self.aligned_with = ''.join(aligned_self)
-        self.other_copy = ''.join(aligned_other)
-        if len(self.aligned_with) != len(self.other_copy):
-            raise RuntimeError("Mismatch in alignment lengths: check alignment logic.")
-        self.mask = ''.join('=' if a == b else '*' if b != ' ' and a != ' ' else ' '
-                            for a, b in zip(self.aligned_with, self.other_copy))
-        self.ref_hash = hashlib.sha256(self.other_copy.encode()).hexdigest()
-        self.engine = engine
-        self.engineOpts[engine] = engineOpts
-        return self.aligned_with, self.other_copy
+        elif engine == 'rle':
+            opts = dict(engineOpts)
+            expand = opts.pop("expand", True)
+            result = _rle_align(*_run_lengths(other.codes), *_run_lengths(self.codes),
+                                engineOpts=engineOpts, **opts)
+            if expand:
+                result = result.expand()
+
+        else:
+            raise ValueError("Unknown alignment engine: choose 'difflib', 'bio', 'banded' or 'rle'")
+
+        if engine != 'rle':
+            result = DNAalignment(''.join(aligned_self), ''.join(aligned_other), engine=engine, engineOpts=engineOpts)
+        if store:
+            self._alignment = result
+            self.engine = engine
+            self.engineOpts[engine] = engineOpts
+        return result
 
     @property
     def alignment_stats(self):
         """Retrun DNAstr alignment statistics"""
-        if self.mask is None:
+        if self.alignment is None:
             raise ValueError("No alignment performed yet.")
-        return {
-            "matches": self.mask.count('='),
-            "substitutions": self.mask.count('*'),
-            "gaps": self.mask.count(' ')
-        }
+        return self.alignment.stats
 
     @property
     def aligned_code(self):
         """return aligned code"""
-        if not hasattr(self,"aligned_with") or self.aligned_with is None:
+        if self.alignment is None:
             raise ValueError("the code is not aligned")
-        return re.sub(r'[^A-CX-Z]', '', self.aligned_with)
+        return self.alignment.aligned_code
 
     def score(self, normalized=True):
         """
@@ -3553,9 +5824,9 @@ class DNAstr(str):
         float
             Alignment score.
         """
-        stats = self.alignment_stats
-        score = stats["matches"]
-        return score / len(self.mask) if normalized else score
+        if self.alignment is None:
+            raise ValueError("No alignment performed yet.")
+        return self.alignment.score(normalized)
 
     @staticmethod
     def _supports_color():
@@ -3847,6 +6118,36 @@ class DNAstr(str):
         plt.tight_layout()
         return fig, ax
 
+    def motif_positions(self, pattern='YAZB', minlen=4):
+        """
+        Positions of the YAZB-like motifs (Y+A+Z+B+) of the sequence, extracted once and cached.
+
+        Parameters
+        ----------
+        pattern : str
+            Canonical motif pattern (default is 'YAZB').
+        minlen : int
+            Minimum motif length to be considered valid.
+
+        Returns
+        -------
+        SimpleNamespace
+            start, end : np.ndarray (int64), bounds of each motif (end exclusive)
+            canonical : np.ndarray (bool), True if the motif equals `pattern`
+        """
+        key = (pattern, minlen)
+        if getattr(self, "_motifs", None) is None:
+            self._motifs = {}
+        if key not in self._motifs:
+            sequence = str(self)
+            spans = [(m.start(), m.end()) for m in _MOTIF_RE.finditer(sequence)]
+            span = np.array(spans, dtype=np.int64).reshape(-1, 2)
+            span = span[(span[:, 1] - span[:, 0]) >= minlen]
+            canonical = np.array([sequence[a:b] == pattern for a, b in span.tolist()], dtype=bool)
+            self._motifs[key] = SimpleNamespace(start=span[:, 0].copy(), end=span[:, 1].copy(),
+                                                canonical=canonical)
+        return self._motifs[key]
+
     def extract_motifs(self, pattern='YAZB', minlen=4, plot=True):
         """
         Extract and analyze YAZB motifs (canonical and distorted) from the symbolic sequence.
@@ -3866,24 +6167,15 @@ class DNAstr(str):
             Table of detected motifs with start/end positions, length, and classification.
         """
         sequence = str(self)
-        canonical = pattern
-        motif_re = re.compile(r'Y+A+Z+B+')
-
-        matches = []
-        for m in motif_re.finditer(sequence):
-            start, end = m.span()
-            substr = m.group()
-            motif_len = end - start
-            canonical_match = substr == canonical
-            classification = 'canonical' if canonical_match else 'variant'
-            if motif_len >= minlen:
-                matches.append({
+        motifs = self.motif_positions(pattern, minlen)
+        matches = [{
                     'start': start,
                     'end': end,
-                    'length': motif_len,
-                    'sequence': substr,
-                    'classification': classification
-                })
+                    'length': end - start,
+                    'sequence': sequence[start:end],
+                    'classification': 'canonical' if canonical else 'variant'
+                   } for start, end, canonical in zip(motifs.start.tolist(), motifs.end.tolist(),
+                                                      motifs.canonical.tolist())]
 
         df = pd.DataFrame(matches)
 
@@ -3916,6 +6208,152 @@ class DNAstr(str):
 
         return df
 
+# --------------------------
+# DNAdistanceStore class
+# --------------------------
+class DNAdistanceStore:
+    """
+    💾 DNAdistanceStore
+    Disk-backed condensed distance matrix for libraries that do not fit in memory.
+
+    The n(n-1)/2 distances of the upper triangle (scipy's squareform/pdist layout) are kept in a
+    `np.memmap` file. Row i of the matrix owns the contiguous segment of pairs (i, j > i), so the
+    pairwise builders write distances by blocks of rows and readers fetch blocks of dense rows
+    (`rows`), submatrices or nearest neighbours without materializing the n x n matrix.
+    A JSON sidecar (path + '.json') records n and the dtype so that the store can be reopened.
+
+    The store is accepted wherever condensed distances are expected: pass it as `out=` to the
+    `DNAsignal._pairwise*Distance` builders and the resulting DNApairwiseAnalysis reads its
+    distances lazily from disk (classical PCoA then runs a blocked randomized eigensolver).
+
+    Parameters
+    ----------
+    n : int
+        Number of samples.
+    path : str or Path or None
+        File of the distances (default: a temporary file deleted with the store).
+    dtype : np.float64 or np.float32
+        Dtype of the stored distances (default: np.float64).
+    mode : {'w+', 'r+', 'r'}
+        Memory-map mode ('w+' creates the file).
+    block_rows : int or None
+        Number of dense rows per block (default: blocks of about 64 MB).
+
+    Attributes
+    ----------
+    d : np.memmap
+        Condensed distances.
+    n, path, dtype, block_rows
+
+    Methods
+    -------
+    open(path, mode='r')
+        Reopen an existing store (class method).
+    row_blocks()
+        Iterate over the (i0, i1) blocks of rows.
+    rows(i0, i1)
+        Dense rows i0...i1-1 as an (i1 - i0, n) array.
+    write_rows(i0, rows)
+        Write the upper part of dense rows.
+    submatrix(idx)
+        Square submatrix D[idx][:, idx].
+    nearest(i, k=5)
+        Indices and distances of the k nearest samples of sample i.
+    flush(), close()
+
+    Example
+    -------
+    >>> store = DNAdistanceStore(len(library), "library.dist", dtype=np.float32)
+    >>> A = DNAsignal._pairwiseJensenShannonDistance(library, scale=4, out=store)
+    >>> A.heatmap()    # read from disk
+    """
+
+    def __init__(self, n, path=None, dtype=np.float64, mode="w+", block_rows=None):
+        self.n = int(n)
+        self.dtype = np.dtype(dtype)
+        self._temporary = path is None
+        if path is None:
+            fd, path = tempfile.mkstemp(suffix=".dist", prefix="sig2dna_")
+            os.close(fd)
+        self.path = Path(path)
+        npairs = self.n * (self.n - 1) // 2
+        if mode == "w+":
+            with open(self.path.with_name(self.path.name + ".json"), "w") as f:
+                json.dump(dict(kind="DNAdistanceStore", n=self.n, dtype=self.dtype.str), f)
+        self.d = (np.memmap(self.path, dtype=self.dtype, mode=mode, shape=(npairs,)) if npairs
+                  else np.zeros(0, dtype=self.dtype))
+        self.block_rows = block_rows or max(1, int(64 * 2**20 // (8 * max(1, self.n))))
+
+    @classmethod
+    def open(cls, path, mode="r", block_rows=None):
+        """Reopen the store saved at path (mode 'r' or 'r+')"""
+        with open(Path(path).with_name(Path(path).name + ".json")) as f:
+            meta = json.load(f)
+        return cls(meta["n"], path, dtype=meta["dtype"], mode=mode, block_rows=block_rows)
+
+    def __len__(self):
+        return self.d.size
+
+    @property
+    def nbytes(self):
+        """Size of the stored distances in bytes"""
+        return self.d.nbytes
+
+    def row_blocks(self):
+        """Iterate over (i0, i1) blocks of block_rows rows"""
+        for i0 in range(0, self.n, self.block_rows):
+            yield i0, min(self.n, i0 + self.block_rows)
+
+    def rows(self, i0, i1):
+        """Dense rows i0...i1-1 of the distance matrix, (i1 - i0, n) float64"""
+        return _condensed_rows(self.d, self.n, i0, i1)
+
+    def write_rows(self, i0, rows):
+        """Write the upper part (j > i) of the dense rows starting at row i0"""
+        _write_condensed_rows(self.d, self.n, i0, rows)
+
+    def submatrix(self, idx):
+        """Square submatrix D[idx][:, idx] (idx without duplicates)"""
+        return _condensed_submatrix(self.d, self.n, idx)
+
+    def nearest(self, i, k=5):
+        """Indices and distances of the k nearest samples of sample i (excluding i)"""
+        return _condensed_nearest(self.d, self.n, i, k)
+
+    def flush(self):
+        """Write pending changes to disk"""
+        if isinstance(self.d, np.memmap):
+            self.d.flush()
+
+    def close(self):
+        """Release the memory map (and delete the files of a temporary store)"""
+        d, self.d = self.d, np.zeros(0, dtype=self.dtype)
+        if isinstance(d, np.memmap):
+            d.flush()
+            del d
+        if self._temporary:
+            for f in (self.path, self.path.with_name(self.path.name + ".json")):
+                try:
+                    f.unlink()
+                except OSError:
+                    pass
+            self._temporary = False
+
+    def __del__(self):
+        try:
+            if self._temporary:
+                self.close()
+        except Exception:
+            pass
+
+    def __repr__(self):
+        return (f"<DNAdistanceStore(n={self.n}, dtype={self.dtype}, {self.nbytes / 2**20:.1f} MB, "
+                f"path='{self.path}'{', temporary' if self._temporary else ''})>")
+
+    def __str__(self):
+        return f"<DNAdistanceStore of {self.n} samples ({self.nbytes / 2**20:.1f} MB on disk)>"
+
+
 # --------------------------
 # DNAPairwiseAnalysis class
 # --------------------------
@@ -3925,40 +6363,455 @@ class DNApairwiseAnalysis:
     Class to handle pairwise distance analysis, PCoA, clustering, and visualization
     for DNA-coded signals.
 
+    Distances are stored in condensed form (upper triangle, as returned by scipy's pdist and
+    accepted by squareform and linkage): n(n-1)/2 values instead of n^2, optionally as float32.
+    The square matrix D is only materialized on request. Distances can also stay on disk in a
+    DNAdistanceStore (memory-mapped), from which PCoA, heatmaps and neighbour queries read lazily.
+
     Attributes
     ----------
+    condensed : np.ndarray
+        Condensed pairwise distances (length n(n-1)/2, np.memmap for a disk-backed analysis).
+    store : DNAdistanceStore or None
+        Disk-backed storage of the distances (None when held in memory).
     D : np.ndarray
-        Pairwise excess entropy distance matrix.
+        Square pairwise distance matrix (property, built from condensed on each access).
+    dtype : np.dtype
+        Dtype of the stored distances (float64 or float32).
     names : list
         Names of the DNA signals.
     DNAsignals : list
         original DNAsignal objects
     coords : np.ndarray
-        Coordinates in reduced space (PCoA).
+        Coordinates in reduced space (PCoA, computed on first access).
+    eigenvalues : np.ndarray or None
+        Eigenvalues of the double-centered matrix (classical PCoA), in decreasing order.
+    pcoa_method : str
+        PCoA engine: 'classical' (default, eigendecomposition) or 'smacof' (sklearn MDS).
     dimensions : list
-        Selected dimensions for reduced analysis.
+        Selected dimensions for reduced analysis (default: all PCoA axes).
     linkage_matrix : np.ndarray
-        Linkage matrix used for hierarchical clustering.
+        Linkage matrix used for hierarchical clustering (last computed by compute_linkage).
+    linkage_method : str
+        Method of linkage_matrix ('ward' by default).
+    metric : str or None
+        Metric of the builder ('entropy', 'jaccard', 'jensenshannon', 'levenshtein'), used by extend().
+    metricOpts : dict
+        Options of the builder (scale, engine, ...), used by extend().
     """
 
-    def __init__(self, D, names, DNAsignals, name=None):
+    def __init__(self, D, names, DNAsignals, name=None, dtype=None, metric=None, metricOpts=None,
+                 pcoa_method="classical"):
+        """
+        Parameters
+        ----------
+        D : np.ndarray or DNAdistanceStore
+            Condensed distances (length n(n-1)/2), square (n, n) distance matrix or disk-backed store.
+        names : list
+            Names of the DNA signals.
+        DNAsignals : list
+            Original DNAsignal objects.
+        name : str, optional
+            Name of the analysis.
+        dtype : np.float64, np.float32 or None (default = dtype of D if floating, float64 otherwise)
+            Dtype of the stored distances.
+        metric : str, optional
+            Metric used to compute D (set by the DNAsignal._pairwise*Distance builders).
+        metricOpts : dict, optional
+            Options of the metric (scale, engine, engineOpts...).
+        pcoa_method : {'classical', 'smacof'}, optional
+            PCoA engine used when the coordinates are first accessed (see pcoa()).
+        """
         self.name = name if not name is None else "unamed"
-        self.D = np.array(D)
         self.names = list(names)
         self.n = len(self.names)
+        self.store = None
+        if isinstance(D, DNAdistanceStore):
+            if D.n != self.n:
+                raise ValueError(f"the store holds {D.n} samples, not {self.n}")
+            D.flush()
+            self.store, D = D, D.d
+            dtype = None  # kept on disk with its own dtype
+        self._d = self._as_condensed(D, self.n, dtype)
+        self.metric = metric
+        self.metricOpts = dict(metricOpts) if metricOpts else {}
         self.DNAsignals = DNAsignals
-        self.coords = None
-        self.dimensions = list(range(self.n))  # All by default
+        self.pcoa_method = pcoa_method
+        self.eigenvalues = None
+        self._coords = None       # PCoA coordinates, computed on first access
+        self._dimensions = None   # All by default
+        self._reset_clustering()
+
+    # clustering backend: linkages and reduced distances are cached per (dimensions[, method])
+    reduced_cache_size = 2          # number of cached reduced (condensed) distance vectors
+    clustering_maxbytes = 2**30     # above, Ward linkage runs on coordinates (NN-chain, no distance matrix)
+
+    def _reset_clustering(self):
+        """Forget linkages and reduced distances (called when coordinates or distances change)"""
         self.linkage_matrix = None
-        self.pcoa()
+        self.linkage_method = getattr(self, "linkage_method", "ward")
+        self._linkage_cache = {}
+        self._reduced_cache = OrderedDict()
+
+    @staticmethod
+    def _as_condensed(D, n, dtype=None):
+        """Return D (condensed or square) as a condensed vector of the requested float dtype"""
+        D = D if isinstance(D, np.memmap) else np.asarray(D)
+        if dtype is None:
+            dtype = D.dtype if np.issubdtype(D.dtype, np.floating) else np.float64
+        if D.ndim == 2:
+            if D.shape != (n, n):
+                raise ValueError(f"D must be a ({n}, {n}) matrix not {D.shape}")
+            iu = np.triu_indices(n, 1)
+            d = D[iu] if np.array_equal(D[iu], D.T[iu]) else 0.5 * (D[iu] + D.T[iu])  # force symmetry
+        elif D.ndim == 1:
+            if D.size != n * (n - 1) // 2:
+                raise ValueError(f"condensed D must have {n * (n - 1) // 2} elements not {D.size}")
+            if isinstance(D, np.memmap) and D.dtype == np.dtype(dtype):
+                return D  # disk-backed: not loaded
+            d = D
+        else:
+            raise ValueError(f"D must be a condensed vector or a square matrix not a {D.ndim}D array")
+        return np.ascontiguousarray(d, dtype=dtype)
+
+    @property
+    def condensed(self):
+        """Condensed pairwise distances (upper triangle, scipy squareform layout)"""
+        return self._d
+
+    @property
+    def D(self):
+        """Square (n, n) pairwise distance matrix (materialized from the condensed distances)"""
+        return squareform(self._d, checks=False) if self.n > 1 else np.zeros((self.n, self.n), dtype=self._d.dtype)
+
+    @D.setter
+    def D(self, value):
+        self._d = self._as_condensed(value, self.n)
+        self.store = None
+        self._coords, self.eigenvalues = None, None
+        self._reset_clustering()
+
+    @property
+    def dtype(self):
+        """Dtype of the stored distances"""
+        return self._d.dtype
+
+    def astype(self, dtype):
+        """Convert the stored distances to dtype (e.g. np.float32 to halve memory), return self"""
+        if np.dtype(dtype) != self._d.dtype:
+            self._d, self.store = self._d.astype(dtype), None  # loaded in memory
+        return self
+
+    def nearest(self, i, k=5):
+        """
+        Nearest samples of sample i (read from the condensed distances, no n x n matrix).
+
+        Parameters
+        ----------
+        i : int or str
+            Index or name of the sample.
+        k : int
+            Number of neighbours (default 5).
+
+        Returns
+        -------
+        idx : np.ndarray of int
+            Indices of the k nearest samples, by increasing distance.
+        dist : np.ndarray
+            Their distances to sample i.
+        """
+        if isinstance(i, str):
+            i = self.names.index(i)
+        return _condensed_nearest(self._d, self.n, int(i), k)
+
+    def extend(self, new_DNAsignals, metric=None, names=None, refit=False, cache=None, **metricOpts):
+        """
+        Append new signals by computing only their distances to the current samples and to each other.
+
+        The condensed distances grow from n(n-1)/2 to N(N-1)/2 values (N = n + k) with the n x k
+        new-to-current and k(k-1)/2 new-to-new distances; existing distances are not recomputed.
+        Unless refit is True, the current PCoA coordinates are kept and new samples are projected
+        into them with Gower's out-of-sample formula: with X the centered coordinates and d2 the
+        squared distances of a new sample to the current ones, y = 1/2 (X'X)^-1 X' (diag(XX') - d2).
+        The linkage is reset (recomputed on next use) and existing cluster labels are extended with
+        the label of the nearest current sample.
+
+        Parameters
+        ----------
+        new_DNAsignals : DNAsignal or list of DNAsignal
+            Signals to append (with codesfull at the scale of the analysis).
+        metric : {'entropy', 'jaccard', 'jensenshannon', 'levenshtein'} or None
+            Distance metric (default: metric recorded by the builder).
+        names : list of str, optional
+            Names of the new samples (default: names of the signals).
+        refit : bool, optional
+            If True, recompute the PCoA of all samples instead of projecting the new ones.
+        cache : AlignmentCache, None (default = AlignmentCache.default, if enabled) or False
+            Alignment cache for alignment-based metrics.
+        **metricOpts :
+            Options overriding those recorded by the builder (scale, engine, engineOpts, ...).
+
+        Returns
+        -------
+        self : DNApairwiseAnalysis
+
+        Example
+        -------
+        >>> A = DNAsignal._pairwiseEntropyDistance(library, scale=4)
+        >>> A.extend(new_sample)   # n distances instead of a full rebuild
+        """
+        if isinstance(new_DNAsignals, DNAsignal):
+            new_DNAsignals = [new_DNAsignals]
+        new_DNAsignals = list(new_DNAsignals)
+        for o in new_DNAsignals:
+            if not isinstance(o, DNAsignal):
+                raise TypeError(f"all new elements must be a DNAsignal not a {type(o).__name__}")
+        if not isinstance(self.DNAsignals, list) or len(self.DNAsignals) != self.n:
+            raise ValueError("extend requires the original list of DNAsignals of the analysis")
+        if metric is None:
+            metric = getattr(self, "metric", None)
+        if metric is None:
+            raise ValueError("metric must be given (it was not recorded by the builder)")
+        if getattr(self, "metric", None) is not None and metric != self.metric:
+            raise ValueError(f"metric '{metric}' differs from the metric '{self.metric}' of the analysis")
+        opts = {**getattr(self, "metricOpts", {}), **metricOpts}
+        scale = opts.pop("scale", None)
+        names = [o.name for o in new_DNAsignals] if names is None else list(names)
+        if len(names) != len(new_DNAsignals):
+            raise ValueError("names and new_DNAsignals must have the same length")
+        k, n = len(new_DNAsignals), self.n
+        if k == 0:
+            return self
+
+        C = DNAsignal._crossDistance(new_DNAsignals, self.DNAsignals, metric, scale, cache=cache, **opts)
+        S = DNAsignal._crossDistance(new_DNAsignals, None, metric, scale, cache=cache, symmetric=True, **opts)
+
+        # grow the condensed vector row by row: row i < n = [old row i, new distances to i]
+        N = n + k
+        if self.store is not None:  # disk-backed: the grown distances go to a new store next to the current one
+            path = self.store.path
+            store = DNAdistanceStore(N, None if self.store._temporary else path.with_name(f"{path.stem}.n{N}{path.suffix}"),
+                                     dtype=self._d.dtype)
+            d = store.d
+        else:
+            store, d = None, np.empty(N * (N - 1) // 2, dtype=self._d.dtype)
+        CT = np.ascontiguousarray(C.T, dtype=d.dtype)
+        pos = old = 0
+        for i in range(N - 1):
+            if i < n:
+                L = n - 1 - i
+                d[pos:pos + L] = self._d[old:old + L]
+                d[pos + L:pos + L + k] = CT[i]
+                old, pos = old + L, pos + L + k
+            else:
+                row = S[i - n, i - n + 1:]
+                d[pos:pos + row.size] = row
+                pos += row.size
+        if store is not None:
+            store.flush()
+        self._d, self.store = d, store
+        self.names += names
+        self.DNAsignals = self.DNAsignals + new_DNAsignals
+        self.n = N
+        self._reset_clustering()
+        if getattr(self, "cluster_labels", None) is not None and n > 0:
+            self.cluster_labels = np.concatenate([self.cluster_labels,
+                                                  self.cluster_labels[np.argmin(C, axis=1)]])
+        if refit or self._coords is None or n < 2:
+            self._coords, self._dimensions = None, None  # recomputed on next access
+        else:
+            X = self.coords
+            mu = X.mean(axis=0)
+            Xc = X - mu
+            b = np.einsum('ij,ij->i', Xc, Xc)
+            Y = 0.5 * ((b[None, :] - C**2) @ Xc) @ np.linalg.pinv(Xc.T @ Xc)
+            self._coords = np.vstack([X, Y + mu])
+        return self
+
+    def __setstate__(self, state):
+        """Restore pickled analyses, including those saved with a square matrix D"""
+        if "D" in state:
+            D = state.pop("D")
+            state["_d"] = self._as_condensed(D, len(state["names"]))
+        for key in ("coords", "dimensions"):
+            if key in state:
+                state["_" + key] = state.pop(key)
+        state.setdefault("pcoa_method", "smacof" if state.get("_coords") is not None else "classical")
+        state.setdefault("eigenvalues", None)
+        state.setdefault("store", None)
+        self.__dict__.update(state)
+        if "_linkage_cache" not in state:
+            linkage_matrix = self.linkage_matrix
+            self._reset_clustering()
+            self.linkage_matrix = linkage_matrix
+
+    def __getstate__(self):
+        """Pickle without the cached reduced distances (recomputed on demand)"""
+        state = self.__dict__.copy()
+        state["_reduced_cache"] = OrderedDict()
+        state["store"] = None  # distances are pickled by value
+        if isinstance(self._d, np.memmap):
+            state["_d"] = np.asarray(self._d)
+        return state
+
+    @property
+    def coords(self):
+        """PCoA coordinates (n, n_components), computed with pcoa() on first access"""
+        if self._coords is None:
+            self.pcoa()
+        return self._coords
+
+    @coords.setter
+    def coords(self, value):
+        self._coords = None if value is None else np.asarray(value)
+        self._reset_clustering()
+
+    @property
+    def dimensions(self):
+        """Active dimensions (all PCoA axes unless selected with select_dimensions)"""
+        if self._dimensions is None:
+            return list(range(self.coords.shape[1]))
+        return self._dimensions
+
+    @dimensions.setter
+    def dimensions(self, dims):
+        self._dimensions = None if dims is None else list(dims)
+
+    def pcoa(self, n_components=None, method=None, random_state=42, solver="auto"):
+        """
+        Perform Principal Coordinate Analysis (PCoA).
+
+        The 'classical' engine (Gower/Torgerson) double-centers the squared distances,
+        B = -1/2 J D^2 J, and keeps the axes of its largest positive eigenvalues
+        (coords = V sqrt(lambda)). The 'smacof' engine runs the iterative metric MDS of
+        scikit-learn (much slower).
+
+        Parameters
+        ----------
+        n_components : int or None
+            Number of axes (default: all positive axes up to 1000 for n <= 1000, 100 above;
+            min(n, 1000) for 'smacof').
+        method : {'classical', 'smacof'} or None
+            PCoA engine (default: self.pcoa_method).
+        random_state : int
+            Seed of the randomized/eigsh solvers or of SMACOF.
+        solver : {'auto', 'dense', 'randomized', 'eigsh', 'blocked'}
+            Eigensolver of the classical engine: 'dense' (full spectrum, LAPACK), 'randomized'
+            (subspace iteration, then the eigenproblem projected on it; the spectrum is shifted when
+            large negative eigenvalues would take the place of positive axes, see _randomized_eigh),
+            'eigsh' (Lanczos), 'blocked' (randomized, with products by blocks of rows read from the
+            condensed distances: the n x n matrix is never formed) or 'auto' = 'blocked' for
+            disk-backed analyses or when the n x n matrix exceeds pcoa_maxbytes, 'dense' for
+            n <= 1000 or n_components >= n/2, 'randomized' otherwise.
+        """
+        method = self.pcoa_method if method is None else method
+        if method == "classical":
+            self._coords, self.eigenvalues = self._classical_pcoa(self._d, self.n, n_components,
+                                                                  random_state, solver)
+        elif method == "smacof":
+            if n_components is None:
+                n_components = min(self.n, 1000)
+            mds = MDS(n_components=n_components, dissimilarity='precomputed', random_state=random_state)
+            self._coords = mds.fit_transform(self.D)
+            self.eigenvalues = None
+        else:
+            raise ValueError(f"method must be 'classical' or 'smacof' not '{method}'")
+        self.pcoa_method = method
+        self._dimensions = None
+        self._reset_clustering()
 
-    def pcoa(self, n_components=None):
-        """Perform Principal Coordinate Analysis (PCoA)."""
+    # above, classical PCoA does not form the n x n double-centered matrix (solver 'blocked')
+    pcoa_maxbytes = 2**31
+
+    @staticmethod
+    def _randomized_eigh(Bmul, n, k, random_state=42, n_iter=4):
+        """
+        Largest algebraic eigenpairs of the symmetric operator B (Q -> B Q) by randomized subspace iteration.
+
+        Subspace iteration converges to the eigenvalues of largest magnitude: for non-Euclidean
+        distances (Levenshtein, Jensen-Shannon...), large negative eigenvalues of B can take the
+        place of positive axes. When the first pass finds such negative eigenvalues, the iteration
+        is repeated on B - lambda_min I (non-negative spectrum, same eigenvectors), whose dominant
+        subspace is that of the largest algebraic eigenvalues. Eigenvalues are those of B
+        (Rayleigh-Ritz on the final subspace).
+        """
+        rng = np.random.default_rng(random_state)
+        size = min(n, k + 10)
+        def subspace(shift, n_iter):
+            Y = Bmul(rng.normal(size=(n, size)))
+            for _ in range(n_iter):
+                Q, _ = np.linalg.qr(Y)
+                Y = Bmul(Q) + shift * Q
+            Q, _ = np.linalg.qr(Y)
+            BQ = Bmul(Q)
+            w, U = np.linalg.eigh(0.5 * (Q.T @ BQ + BQ.T @ Q))
+            return w, Q @ U
+        w, V = subspace(0.0, n_iter)
+        if size < n and w[0] < -1e-10 * np.abs(w).max():
+            # 5% margin (the Ritz value underestimates |lambda_min|), more iterations (smaller gaps)
+            w, V = subspace(-1.05 * w[0], 2 * n_iter)
+        return w, V
+
+    @staticmethod
+    def _blocked_pcoa(d, n, k, random_state=42, n_iter=4, block_rows=None):
+        """Randomized eigendecomposition of B = -1/2 J D^2 J using row blocks of the condensed distances"""
+        block_rows = block_rows or max(1, int(64 * 2**20 // (8 * n)))
+        def Bmul(Q):  # B Q = -1/2 J (D^2 (J Q))
+            Qc = Q - Q.mean(axis=0)
+            AQ = np.zeros_like(Q)
+            for i0 in range(0, n - 1, block_rows):
+                # each stored d_ij (i < j) is read once, sequentially, and contributes to AQ[i] and AQ[j]
+                i1 = min(n - 1, i0 + block_rows)
+                U = _condensed_upper_block(d, n, i0, i1)
+                U *= U
+                AQ[i0:i1] += U @ Qc
+                AQ += U.T @ Qc[i0:i1]
+            return -0.5 * (AQ - AQ.mean(axis=0))
+        return DNApairwiseAnalysis._randomized_eigh(Bmul, n, k, random_state, n_iter)
+
+    @staticmethod
+    def _classical_pcoa(d, n, n_components=None, random_state=42, solver="auto"):
+        """Classical PCoA of condensed distances d: return (coords, eigenvalues in decreasing order)"""
+        if n < 2:
+            return np.zeros((n, 1)), np.zeros(1)
         if n_components is None:
-            n_components = min(self.n, 1000)
-        mds = MDS(n_components=n_components, dissimilarity='precomputed', random_state=42)
-        self.coords = mds.fit_transform(self.D)
-        self.dimensions = list(range(n_components))
+            n_components = n if n <= 1000 else 100
+        if solver == "blocked" or (solver == "auto" and n > 1000 and
+                                   (isinstance(d, np.memmap) or n * n * 8 > DNApairwiseAnalysis.pcoa_maxbytes)):
+            w, V = DNApairwiseAnalysis._blocked_pcoa(d, n, max(1, min(int(n_components), n)), random_state)
+            return DNApairwiseAnalysis._pcoa_coords(w, V, max(1, min(int(n_components), n)), n)
+        B = squareform(np.asarray(d, dtype=np.float64)**2, checks=False)
+        B *= -0.5
+        r = B.mean(axis=0)
+        B -= r[:, None]
+        B -= r[None, :]
+        B += r.mean()
+        k = max(1, min(int(n_components), n))
+        if solver == "auto":
+            solver = "dense" if n <= 1000 or k >= n // 2 else "randomized"
+        if solver == "dense":
+            w, V = np.linalg.eigh(B)
+        elif solver == "randomized":
+            w, V = DNApairwiseAnalysis._randomized_eigh(B.__matmul__, n, k, random_state)
+        elif solver == "eigsh":
+            v0 = np.random.default_rng(random_state).uniform(-1, 1, n)
+            w, V = eigsh(B, k=min(k, n - 1), which='LA', v0=v0)
+        else:
+            raise ValueError(f"solver must be 'auto', 'dense', 'randomized', 'eigsh' or 'blocked' not '{solver}'")
+        del B
+        return DNApairwiseAnalysis._pcoa_coords(w, V, k, n)
+
+    @staticmethod
+    def _pcoa_coords(w, V, k, n):
+        """Coordinates V sqrt(w) of the k largest positive eigenvalues (deterministic signs)"""
+        order = np.argsort(w)[::-1]
+        w, V = w[order], V[:, order]
+        keep = np.flatnonzero(w[:k] > 1e-10 * max(1.0, np.abs(w).max()))
+        if keep.size == 0:
+            return np.zeros((n, 1)), w
+        V = V[:, keep]
+        V *= np.where(V[np.abs(V).argmax(axis=0), np.arange(keep.size)] < 0, -1.0, 1.0)  # deterministic signs
+        return V * np.sqrt(w[keep]), w
 
     def select_dimensions(self, dims):
         """Update active dimensions."""
@@ -3969,29 +6822,84 @@ class DNApairwiseAnalysis:
         else:
             raise TypeError(f"dims must be a int, list or tuple not a {type(dims).__name__}")
 
-    def reduced_distances(self):
-        """Recompute distances on selected subspace."""
-        coords_sel = self.coords[:, self.dimensions]
-        return pairwise_distances(coords_sel)
+    def reduced_distances(self, condensed=False):
+        """
+        Distances on the selected subspace (condensed=True returns the condensed vector).
+
+        Condensed distances are cached per selection of dimensions (reduced_cache_size entries).
+        """
+        key = tuple(self.dimensions)
+        d = self._reduced_cache.get(key)
+        if d is None:
+            d = pdist(self.coords[:, list(key)])
+            self._reduced_cache[key] = d
+            while len(self._reduced_cache) > max(1, self.reduced_cache_size):
+                self._reduced_cache.popitem(last=False)
+        else:
+            self._reduced_cache.move_to_end(key)
+        return d if condensed else squareform(d)
+
+    def compute_linkage(self, method='ward', backend='auto'):
+        """
+        Compute hierarchical clustering on the selected dimensions.
+
+        Linkages are cached per (dimensions, method) and shared by get_cluster_labels, cluster,
+        plot_dendrogram and scatter.
 
-    def compute_linkage(self, method='ward'):
-        """Compute hierarchical clustering."""
-        D = self.reduced_distances()
-        D = (D + D.T) / 2  # force symmetry
-        reduced_D = squareform(D)
-        self.linkage_matrix = linkage(reduced_D, method=method)
+        Parameters
+        ----------
+        method : str
+            Linkage method of scipy.cluster.hierarchy.linkage (default 'ward').
+        backend : {'auto', 'scipy', 'nnchain'}
+            'scipy' runs linkage on the cached condensed reduced distances (n(n-1)/2 values);
+            'nnchain' (Ward only) runs the nearest-neighbour chain on the coordinates with O(n d)
+            memory but O(n^2 d) time in a Python loop (slower than scipy; same tree, tied heights
+            excepted, see _ward_nn_chain); 'auto' uses 'nnchain' for Ward only when the condensed
+            distances exceed clustering_maxbytes.
+
+        Returns
+        -------
+        linkage_matrix : np.ndarray
+        """
+        key = (tuple(self.dimensions), method)
+        Z = self._linkage_cache.get(key)
+        if Z is None:
+            if backend == 'auto':
+                large = self.n * (self.n - 1) // 2 * 8 > self.clustering_maxbytes
+                backend = 'nnchain' if method == 'ward' and large else 'scipy'
+            if backend == 'nnchain':
+                if method != 'ward':
+                    raise ValueError("the 'nnchain' backend supports only method='ward'")
+                Z = _ward_nn_chain(self.coords[:, list(key[0])])
+            elif backend == 'scipy':
+                Z = linkage(self.reduced_distances(condensed=True), method=method)
+            else:
+                raise ValueError(f"backend must be 'auto', 'scipy' or 'nnchain' not '{backend}'")
+            self._linkage_cache[key] = Z
+        self.linkage_matrix, self.linkage_method = Z, method
+        return Z
+
+    def heatmap(self, figsize=(10, 8), max_size=500):
+        """
+        Plot heatmap of pairwise distances.
 
-    def heatmap(self, figsize=(10, 8)):
-        """Plot heatmap of pairwise distances."""
+        Above max_size samples, the heatmap shows max_size evenly spaced samples, read directly
+        from the condensed distances (the full matrix is not built).
+        """
+        if self.n > max_size:
+            idx = np.unique(np.linspace(0, self.n - 1, max_size).round().astype(np.int64))
+            M, labels = _condensed_submatrix(self._d, self.n, idx), [self.names[i] for i in idx]
+        else:
+            M, labels = self.D, self.names
         fig=plt.figure(figsize=figsize)
-        sns.heatmap(self.D, xticklabels=self.names, yticklabels=self.names, cmap='viridis')
+        sns.heatmap(M, xticklabels=labels, yticklabels=labels, cmap='viridis')
         title = f'Pairwise Excess Entropy Distances — {getattr(self, "name", "Unnamed Analysis")}'
         plt.title(title)
         plt.tight_layout()
         plt.show()
         return fig
 
-    def get_cluster_labels(self, n_clusters=2, method='ward'):
+    def get_cluster_labels(self, n_clusters=2, method=None):
         """
         Returns cluster labels from hierarchical clustering. If not computed yet, computes linkage.
 
@@ -3999,17 +6907,16 @@ class DNApairwiseAnalysis:
         ----------
         n_clusters : int
             Number of clusters to assign.
-        method : str
-            Linkage method to use if recomputing linkage.
+        method : str or None
+            Linkage method (default: method of the current linkage, 'ward' initially).
 
         Returns
         -------
         labels : np.ndarray of int
             Cluster IDs for each sample.
         """
-        if self.linkage_matrix is None:
-            self.compute_linkage(method=method)
-        self.cluster_labels = fcluster(self.linkage_matrix, t=n_clusters, criterion='maxclust')
+        Z = self.compute_linkage(method=self.linkage_method if method is None else method)
+        self.cluster_labels = fcluster(Z, t=n_clusters, criterion='maxclust')
         return self.cluster_labels
 
     def scatter(self, dims=(0, 1), annotate=True, figsize=(8, 6), n_clusters=None):
@@ -4096,10 +7003,9 @@ class DNApairwiseAnalysis:
 
     def plot_dendrogram(self, truncate_mode=None, p=10):
         """Plot dendrogram from linkage matrix."""
-        if self.linkage_matrix is None:
-            self.compute_linkage()
+        Z = self.compute_linkage(method=self.linkage_method)
         fig=plt.figure(figsize=(10, 6))
-        dendrogram(self.linkage_matrix, labels=self.names, truncate_mode=truncate_mode, p=p)
+        dendrogram(Z, labels=self.names, truncate_mode=truncate_mode, p=p)
         plt.title("Hierarchical Clustering Dendrogram")
         plt.xlabel("Sample Index or Name")
         plt.ylabel("Distance")
@@ -4111,20 +7017,57 @@ class DNApairwiseAnalysis:
 
     def cluster(self, t=1.0, criterion='distance'):
         """Assign cluster labels from linkage matrix."""
-        if self.linkage_matrix is None:
-            self.compute_linkage()
-        return fcluster(self.linkage_matrix, t=t, criterion=criterion)
+        return fcluster(self.compute_linkage(method=self.linkage_method), t=t, criterion=criterion)
+
+    def best_dimension(self, max_dim=10, n_clusters=2, sample_size=2000, random_state=0, backend='auto'):
+        """
+        Determine optimal dimension by maximizing silhouette score.
+
+        Candidate dimensions d = 2...max_dim are scanned in a single pass: the squared
+        contribution of each axis to the pairwise distances is accumulated, so that the reduced
+        distances of d axes are obtained from those of d-1 axes without recomputing them. The
+        Ward linkages are cached (compute_linkage reuses them) and silhouette scores are
+        estimated on sample_size samples when n is larger.
+
+        Parameters
+        ----------
+        max_dim : int
+            Largest number of dimensions tested (default 10).
+        n_clusters : int
+            Number of clusters used to score each dimension (default 2).
+        sample_size : int or None
+            Number of samples used by silhouette_score (None = all samples).
+        random_state : int
+            Seed of the silhouette sample.
+        backend : {'auto', 'scipy', 'nnchain'}
+            Ward linkage backend (see compute_linkage).
 
-    def best_dimension(self, max_dim=10):
-        """Determine optimal dimension by maximizing silhouette score."""
+        Returns
+        -------
+        best_d, best_score : int, float (None, None if no dimension could be scored)
+        """
+        coords = self.coords
+        max_d = min(self.n - 1, max_dim, coords.shape[1])
+        if backend == 'auto':
+            backend = 'nnchain' if self.n * (self.n - 1) // 2 * 8 > self.clustering_maxbytes else 'scipy'
+        sample_size = None if sample_size is None or sample_size >= self.n else sample_size
+        acc = np.zeros(self.n * (self.n - 1) // 2) if backend == 'scipy' else None
         scores = []
-        for d in range(2, min(self.n, max_dim + 1)):
-            coords = self.coords[:, :d]
-            labels = fcluster(linkage(coords, method='ward'), t=2, criterion='maxclust')
+        for d in range(1, max_d + 1):
+            if acc is not None:
+                acc += pdist(coords[:, d - 1:d], 'sqeuclidean')
+            if d < 2:
+                continue
+            key = (tuple(range(d)), 'ward')
+            Z = self._linkage_cache.get(key)
+            if Z is None:
+                Z = linkage(np.sqrt(acc), method='ward') if acc is not None else _ward_nn_chain(coords[:, :d])
+                self._linkage_cache[key] = Z
+            labels = fcluster(Z, t=n_clusters, criterion='maxclust')
             try:
-                score = silhouette_score(coords, labels)
+                score = silhouette_score(coords[:, :d], labels, sample_size=sample_size, random_state=random_state)
                 scores.append((d, score))
-            except:
+            except ValueError:
                 continue
         if scores:
             best_d, best_score = max(scores, key=lambda x: x[1])
@@ -4132,34 +7075,201 @@ class DNApairwiseAnalysis:
             return best_d, best_score
         return None, None
 
-    def save(self, path):
-        """Save current analysis to file."""
-        with open(path, 'wb') as f:
-            pickle.dump(self, f)
+    # version of the .npz layout written by save()
+    npz_format_version = 1
+
+    def save(self, path, format=None, compress=False, signals_path=None):
+        """
+        Save current analysis to file.
+
+        Two formats are available:
+        - 'npz' (default for *.npz paths): columnar NumPy archive holding the condensed distances,
+          names, coordinates, eigenvalues, current linkage and cluster labels, plus a JSON header
+          (format version, metric, options...). Signals are stored by reference only (name and
+          digest of their code at the analysis scale); they can be pickled to a separate file
+          given by signals_path, whose path is recorded relative to the archive (absolute if they
+          lie on different drives), so both files can be moved together. No pickle is used in the archive.
+        - 'pickle' (other paths): the whole object, including its DNAsignals.
+
+        Parameters
+        ----------
+        path : str or Path
+            Output file.
+        format : {'npz', 'pickle'} or None
+            File format (default: from the extension of path).
+        compress : bool
+            Compress the npz archive (smaller, but arrays cannot be memory-mapped on load).
+        signals_path : str or Path, optional
+            npz format: file where the DNAsignals are pickled (default: not saved).
+        """
+        path = Path(path)
+        if format is None:
+            format = "npz" if path.suffix == ".npz" else "pickle"
+        if format == "pickle":
+            with open(path, 'wb') as f:
+                pickle.dump(self, f)
+            return
+        if format != "npz":
+            raise ValueError(f"format must be 'npz' or 'pickle' not '{format}'")
+        if signals_path is not None:
+            signals_path = Path(signals_path)
+            with open(signals_path, 'wb') as f:
+                pickle.dump(self.DNAsignals, f)
+            try:  # recorded relative to the directory of the archive
+                signals_path = os.path.relpath(signals_path.resolve(), path.resolve().parent)
+            except ValueError:  # no relative path (e.g. another drive on Windows)
+                signals_path = str(signals_path.resolve())
+        linkage_dims = next((dims for (dims, method), Z in self._linkage_cache.items()
+                             if Z is self.linkage_matrix), None)
+        header = dict(
+            kind="DNApairwiseAnalysis", format_version=self.npz_format_version, name=self.name, n=self.n,
+            metric=self.metric, metricOpts=self.metricOpts, pcoa_method=self.pcoa_method,
+            dimensions=self._dimensions, linkage_method=self.linkage_method,
+            linkage_dimensions=None if linkage_dims is None else list(linkage_dims),
+            signals_path=signals_path)
+        arrays = dict(header=np.array(json.dumps(header, default=str)),
+                      condensed=self._d,
+                      names=np.array([str(x) for x in self.names], dtype=str),
+                      signal_digests=np.array(self._signal_digests(), dtype=str))
+        if self._coords is not None:
+            arrays["coords"] = self._coords
+        if self.eigenvalues is not None:
+            arrays["eigenvalues"] = self.eigenvalues
+        if linkage_dims is not None:
+            arrays["linkage_matrix"] = self.linkage_matrix
+        if getattr(self, "cluster_labels", None) is not None:
+            arrays["cluster_labels"] = np.asarray(self.cluster_labels)
+        with open(path, 'wb') as f:  # file object: np.savez would otherwise append .npz
+            (np.savez_compressed if compress else np.savez)(f, **arrays)
+
+    def _signal_digests(self):
+        """Reference of each signal: digest of its code at the scale of the analysis ('' if unknown)"""
+        scale = self.metricOpts.get("scale")
+        if not isinstance(self.DNAsignals, list) or len(self.DNAsignals) != self.n:
+            return [""] * self.n
+        digests = []
+        for o in self.DNAsignals:
+            codes = getattr(o, "codesfull", None)
+            try:
+                digests.append(codes[scale].digest("blake2b"))
+            except (KeyError, TypeError, AttributeError):
+                digests.append("")
+        return digests
 
     @staticmethod
-    def load(path):
-        """Load analysis from file."""
+    def _npz_memmap(path, key):
+        """Memory-map the array key of an uncompressed npz archive (None if it is compressed)"""
+        with zipfile.ZipFile(path) as zf:
+            info = zf.getinfo(key + ".npy")
+        if info.compress_type != zipfile.ZIP_STORED:
+            return None
         with open(path, 'rb') as f:
-            return pickle.load(f)
+            f.seek(info.header_offset)
+            name_len, extra_len = struct.unpack('<HH', f.read(30)[26:30])  # local file header
+            f.seek(info.header_offset + 30 + name_len + extra_len)
+            version = np.lib.format.read_magic(f)
+            read_header = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+            shape, fortran_order, dtype = read_header(f)
+            offset = f.tell()
+        if int(np.prod(shape)) == 0:
+            return np.zeros(shape, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=shape,
+                         order='F' if fortran_order else 'C')
+
+    @staticmethod
+    def load(path, mmap_mode=None, DNAsignals=None, load_signals=False):
+        """
+        Load analysis from file (npz archive written by save() or pickle).
+
+        Parameters
+        ----------
+        path : str or Path
+            File written by save().
+        mmap_mode : None or 'r'
+            npz format: memory-map the distances and coordinates instead of reading them
+            (uncompressed archives only; arrays are read-only).
+        DNAsignals : list of DNAsignal, optional
+            npz format: signals of the analysis (checked against the stored digests).
+        load_signals : bool
+            npz format: load the signals from the signals_path recorded by save().
+
+        Returns
+        -------
+        DNApairwiseAnalysis
+        """
+        if not zipfile.is_zipfile(path):
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        with np.load(path, allow_pickle=False) as z:
+            header = json.loads(str(z["header"]))
+            if header.get("kind") != "DNApairwiseAnalysis":
+                raise ValueError(f"{path} does not contain a DNApairwiseAnalysis")
+            if header.get("format_version", 0) > DNApairwiseAnalysis.npz_format_version:
+                raise ValueError(f"{path} was written with a newer format (version {header['format_version']})")
+            def get(key, mmap=False):
+                if key not in z.files:
+                    return None
+                if mmap and mmap_mode is not None:
+                    a = DNApairwiseAnalysis._npz_memmap(path, key)
+                    if a is not None:
+                        return a
+                return z[key]
+            d = get("condensed", mmap=True)
+            names = z["names"].tolist()
+            digests = z["signal_digests"].tolist()
+            coords, eigenvalues = get("coords", mmap=True), get("eigenvalues")
+            linkage_matrix, cluster_labels = get("linkage_matrix"), get("cluster_labels")
+        if DNAsignals is None and load_signals:
+            if header.get("signals_path") is None:
+                raise ValueError("no signals were saved with this analysis (use save(..., signals_path=...))")
+            signals_path = Path(header["signals_path"])
+            if not signals_path.is_absolute():
+                signals_path = Path(path).resolve().parent / signals_path
+            with open(signals_path, 'rb') as f:
+                DNAsignals = pickle.load(f)
+        A = DNApairwiseAnalysis(d, names, DNAsignals, name=header.get("name"),
+                                metric=header.get("metric"), metricOpts=header.get("metricOpts"),
+                                pcoa_method=header.get("pcoa_method", "classical"))
+        if DNAsignals is not None:
+            current = A._signal_digests()
+            if len(DNAsignals) != A.n or any(a and b and a != b for a, b in zip(digests, current)):
+                raise ValueError("DNAsignals do not match the signals referenced by the analysis")
+        A._coords, A.eigenvalues = coords, eigenvalues
+        A._dimensions = header.get("dimensions")
+        A.linkage_method = header.get("linkage_method") or "ward"
+        if linkage_matrix is not None:
+            A._linkage_cache[(tuple(header["linkage_dimensions"]), A.linkage_method)] = linkage_matrix
+            A.linkage_matrix = linkage_matrix
+        if cluster_labels is not None:
+            A.cluster_labels = cluster_labels
+        return A
 
     def __repr__(self):
         return (f"DNAPairwiseAnalysis(\n"
                 f"  name={self.name},\n"
                 f"  n_samples={self.n},\n"
-                f"  dimensions={len(self.dimensions)},\n"
-                f"  active_dims={self.dimensions},\n"
+                f"  distances=condensed {self._d.dtype} ({self._d.nbytes / 2**20:.1f} MB),\n"
+                f"  pcoa={self.pcoa_method}{'' if self._coords is not None else ' (not computed yet)'},\n"
+                f"  dimensions={len(self.dimensions) if self._coords is not None else 'pending'},\n"
+                f"  active_dims={self._dimensions if self._dimensions is not None else 'all'},\n"
                 f"  linkage_computed={'Yes' if self.linkage_matrix is not None else 'No'}\n)")
 
     def __str__(self):
+        if self._coords is None:
+            return f"DNAPairwiseAnalysis with {self.n} samples (PCoA not computed yet)"
         return f"DNAPairwiseAnalysis with {self.n} samples in {len(self.dimensions)} dimensions"
 
-    def dimension_variance_curve(self, threshold=0.5, plot=True, figsize=(8, 5)):
+    def dimension_variance_curve(self, threshold=0.5, plot=True, figsize=(8, 5),
+                                 method="distance", sample=None, random_state=0):
         """
         Computes the cumulative explained variance (based on pairwise distances) as a function of
         the number of dimensions used (from 1 to n-1). Optionally plots the curve and the point
         where the threshold (default 0.5) is reached.
 
+        The curve is computed in a single pass over the PCoA axes: the squared contribution of
+        each axis to every pairwise distance is accumulated once and reused by all prefixes
+        (the distance on the first d axes is the square root of the sum of the d contributions).
+
         Parameters
         ----------
         threshold : float
@@ -4168,23 +7278,52 @@ class DNApairwiseAnalysis:
             If True, display the variance curve and highlight dhalf.
         figsize : tuple
             Size of the figure if plotted.
+        method : {'distance', 'variance', 'eigen'}
+            'distance' (default): sum of the pairwise Euclidean distances on the first d axes,
+            relative to all axes. 'variance': sum of squared distances, i.e. cumulative variance
+            of the axes (O(n d)). 'eigen': cumulative positive eigenvalues of the classical PCoA.
+        sample : int or None
+            For method='distance', number of randomly drawn samples used to estimate the curve
+            (default None = all samples; use a few thousands for very large n).
+        random_state : int
+            Seed of the sample.
 
         Returns
         -------
         dhalf : int
             Number of dimensions needed to reach the threshold.
-        curve : list of float
-            Normalized cumulative variance (in [0, 1]) for dimensions 1 to n-1.
-        """
-        max_d = self.coords.shape[1] # min(self.n - 1, self.coords.shape[1])
-        total_var = np.sum(pairwise_distances(self.coords[:, :max_d]))
-        curve = []
-        for d in range(1, max_d + 1):
-            d_var = np.sum(pairwise_distances(self.coords[:, :d]))
-            curve.append(d_var / total_var)
+        fig : matplotlib.figure.Figure or None
+            Figure of the curve (None if plot is False). The curve, normalized cumulative variance
+            (in [0, 1]) for dimensions 1 to max_d, is stored in self.variance_curve.
+        """
+        coords = self.coords
+        max_d = coords.shape[1] # min(self.n - 1, self.coords.shape[1])
+        if method == "eigen":
+            if self.eigenvalues is None:
+                raise ValueError("method='eigen' requires a classical PCoA (use method='variance')")
+            contrib = np.maximum(self.eigenvalues[:max_d], 0.0)
+            curve = np.cumsum(contrib) / max(contrib.sum(), np.finfo(float).tiny)
+        elif method == "variance":
+            contrib = coords.var(axis=0)
+            curve = np.cumsum(contrib) / max(contrib.sum(), np.finfo(float).tiny)
+        elif method == "distance":
+            X = coords
+            if sample is not None and sample < self.n:
+                X = X[np.sort(np.random.default_rng(random_state).choice(self.n, size=sample, replace=False))]
+            acc = np.zeros(X.shape[0] * (X.shape[0] - 1) // 2)  # squared distances on the first d axes
+            sums = np.empty(max_d)
+            for d in range(max_d):
+                acc += pdist(X[:, d:d + 1], 'sqeuclidean')
+                sums[d] = np.sqrt(acc).sum()
+            curve = sums / max(sums[-1], np.finfo(float).tiny)
+        else:
+            raise ValueError(f"method must be 'distance', 'variance' or 'eigen' not '{method}'")
+        curve = curve.tolist()
+        self.variance_curve = curve
 
         dhalf = next((i + 1 for i, v in enumerate(curve) if v >= threshold), max_d)
 
+        fig = None
         if plot:
             fig=plt.figure(figsize=figsize)
             plt.plot(range(1, max_d + 1), curve, marker='o', label='Cumulative variance')
@@ -4202,6 +7341,314 @@ class DNApairwiseAnalysis:
         return dhalf, fig
 
 
+# --------------------------------------------
+# DNALibraryIndex class
+# Nearest-neighbour lookup of unknown signals
+# --------------------------------------------
+class DNALibraryIndex:
+    """
+    🔎 DNALibraryIndex
+    Approximate nearest-neighbour index of reference DNAsignals for library lookup.
+
+    Each reference is summarized by a fixed-length feature vector computed at a given scale, so
+    that an unknown signal is identified against a large library without computing its symbolic
+    distance to every reference:
+
+    - 'histogram': square roots of the letter frequencies. The Euclidean distance between two
+      vectors is sqrt(2) times the Hellinger distance of the letter distributions, a close
+      relative of the Jensen-Shannon distance used by `DNApairwiseAnalysis`.
+    - 'profile': square roots of the letter frequencies in `bins` consecutive windows of the
+      sequence (positional histograms, which keep the retention-time information).
+    - 'sinusoidal': L2-normalized aggregated sinusoidal embeddings (`sincodesfull_aggregated`,
+      see `DNAsignal.sinencode_dna_full(operation="sum")`) concatenated letter by letter.
+    - callable: any function f(signal, scale) returning a 1D vector.
+
+    Queries are answered by a KD-tree (exact, sub-linear in low dimensions) or by random-hyperplane
+    locality-sensitive hashing (LSH) in high dimensions: every table hashes the centered vectors
+    into `n_bits`-bit buckets, the buckets of the query (and of its one-bit neighbours, multiprobe)
+    provide candidates that are re-ranked exactly. 'brute' scans the whole library.
+
+    Parameters
+    ----------
+    scale : int
+        Scale of the symbolic codes (default: 4).
+    features : {'histogram', 'profile', 'sinusoidal'} or callable
+        Feature vectors of the samples (default: 'profile').
+    backend : {'auto', 'kdtree', 'lsh', 'brute'}
+        Search structure; 'auto' uses a KD-tree up to `kdtree_maxdim` dimensions and LSH above.
+    letters : str or None
+        Alphabet of the histograms (default: DNALibraryIndex.letters). Other letters are ignored.
+    bins : int
+        Number of windows of the 'profile' features (default: 32).
+    n_tables : int
+        Number of LSH hash tables (default: 8).
+    n_bits : int or None
+        Bits per LSH table (default: about log2(n / 8), between 4 and 24).
+    random_state : int
+        Seed of the LSH hyperplanes.
+
+    Attributes
+    ----------
+    X : np.ndarray
+        (n, d) feature vectors of the references.
+    names : list of str
+        Names of the references.
+    dim : int
+        Dimension of the features.
+
+    Methods
+    -------
+    add(DNAsignals, names=None)
+        Add references to the library (the search structure is rebuilt at the next query).
+    vectorize(signal)
+        Feature vector of a DNAsignal (or DNAstr).
+    query(signals, k=5, n_probe=None, exact=False)
+        Indices and distances of the k nearest references.
+    lookup(signal, k=5)
+        List of (name, distance) of the k nearest references.
+    from_analysis(analysis, **kwargs)
+        Index built from the signals of a DNApairwiseAnalysis (class method).
+
+    Example
+    -------
+    >>> index = DNALibraryIndex(scale=4, features="profile")
+    >>> index.add(library)                    # list of DNAsignals
+    >>> index.lookup(unknown, k=3)
+    [('ref_0123', 0.041), ('ref_0877', 0.063), ('ref_0007', 0.089)]
+    """
+
+    letters = "ABCXYZ_"
+    kdtree_maxdim = 16
+
+    def __init__(self, scale=4, features="profile", backend="auto", letters=None, bins=32,
+                 n_tables=8, n_bits=None, random_state=0):
+        if not callable(features) and features not in ("histogram", "profile", "sinusoidal"):
+            raise ValueError(f"features must be 'histogram', 'profile', 'sinusoidal' or a callable not '{features}'")
+        if backend not in ("auto", "kdtree", "lsh", "brute"):
+            raise ValueError(f"backend must be 'auto', 'kdtree', 'lsh' or 'brute' not '{backend}'")
+        self.scale = scale
+        self.features = features
+        self.backend = backend
+        self.letters = DNALibraryIndex.letters if letters is None else letters
+        self.bins = int(bins)
+        self.n_tables = int(n_tables)
+        self.n_bits = n_bits
+        self.random_state = random_state
+        self._lut = np.full(256, -1, dtype=np.int64)
+        self._lut[[ord(c) for c in self.letters]] = np.arange(len(self.letters))
+        self.X = None
+        self.names = []
+        self._structure = self._sqnorms = None
+
+    # ---- features
+    def _codes_of(self, signal):
+        """ASCII codes of the sequence of a DNAsignal (or DNAstr) at self.scale"""
+        seq = signal if isinstance(signal, str) else signal.codesfull[self.scale]
+        if not isinstance(seq, DNAstr):
+            seq = DNAstr(seq)
+        return seq.codes
+
+    def vectorize(self, signal):
+        """Feature vector (1D np.ndarray) of a DNAsignal (or DNAstr for histogram features)"""
+        if callable(self.features):
+            return np.asarray(self.features(signal, self.scale), dtype=np.float64).ravel()
+        nletters = len(self.letters)
+        if self.features == "sinusoidal":
+            aggregated = getattr(signal, "sincodesfull_aggregated", None)
+            if aggregated is None or not aggregated.get(self.scale):
+                raise ValueError("sinusoidal features require sinencode_dna_full(operation='sum' or 'mean') first")
+            vectors = aggregated[self.scale]
+            d_model = len(next(iter(vectors.values())))
+            v = np.zeros((nletters, d_model))
+            for ch, vec in vectors.items():
+                if ch in self.letters:
+                    v[self.letters.index(ch)] = vec
+            v = v.ravel()
+            norm = np.linalg.norm(v)
+            return v / norm if norm > 0 else v
+        codes = self._codes_of(signal)
+        col = self._lut[codes]
+        keep = col >= 0
+        if self.features == "histogram":
+            v = np.bincount(col[keep], minlength=nletters).astype(np.float64)
+        else:
+            window = (np.arange(len(codes)) * self.bins) // max(len(codes), 1)
+            v = np.bincount(window[keep] * nletters + col[keep], minlength=self.bins * nletters).astype(np.float64)
+        total = v.sum()
+        return np.sqrt(v / total) if total > 0 else v
+
+    def _vectorize_all(self, signals):
+        return np.vstack([self.vectorize(s) for s in signals]) if len(signals) else np.empty((0, self.dim or 0))
+
+    # ---- library
+    @property
+    def dim(self):
+        """Dimension of the feature vectors (None before the first add)"""
+        return None if self.X is None else self.X.shape[1]
+
+    def __len__(self):
+        return 0 if self.X is None else self.X.shape[0]
+
+    def add(self, DNAsignals, names=None):
+        """
+        Add references to the library.
+
+        Parameters
+        ----------
+        DNAsignals : DNAsignal or list of DNAsignal
+            References (DNAstr are accepted by the histogram features).
+        names : list of str or None
+            Names of the references (default: signal.name or 'ref<i>').
+
+        Returns
+        -------
+        self
+        """
+        if isinstance(DNAsignals, (DNAsignal, str)):
+            DNAsignals = [DNAsignals]
+        n0 = len(self)
+        if names is None:
+            names = [getattr(s, "name", None) or f"ref{n0 + i}" for i, s in enumerate(DNAsignals)]
+        elif len(names) != len(DNAsignals):
+            raise ValueError(f"{len(names)} names given for {len(DNAsignals)} signals")
+        X = self._vectorize_all(DNAsignals)
+        if self.X is not None and X.shape[1] != self.X.shape[1]:
+            raise ValueError(f"feature dimension {X.shape[1]} does not match the library ({self.X.shape[1]})")
+        self.X = X if self.X is None else np.vstack([self.X, X])
+        self.names.extend(names)
+        self._structure = self._sqnorms = None
+        return self
+
+    @classmethod
+    def from_analysis(cls, analysis, **kwargs):
+        """Index of the signals of a DNApairwiseAnalysis (the scale and names of the analysis are kept)"""
+        if analysis.DNAsignals is None:
+            raise ValueError("the analysis has no DNAsignals (load it with DNAsignals= or load_signals=True)")
+        kwargs.setdefault("scale", (getattr(analysis, "metricOpts", None) or {}).get("scale", 4))
+        return cls(**kwargs).add(analysis.DNAsignals, names=list(analysis.names))
+
+    # ---- search structure
+    def _resolved_backend(self):
+        if self.backend != "auto":
+            return self.backend
+        return "kdtree" if self.dim <= self.kdtree_maxdim else "lsh"
+
+    def _build(self):
+        """Build the KD-tree or the LSH tables of the current library"""
+        if not len(self):
+            raise ValueError("the library is empty, add references first")
+        backend = self._resolved_backend()
+        if backend == "kdtree":
+            self._structure = ("kdtree", cKDTree(self.X))
+        elif backend == "lsh":
+            n, d = self.X.shape
+            n_bits = self.n_bits or int(np.clip(np.log2(max(n, 1) / 8), 4, 24))
+            rng = np.random.default_rng(self.random_state)
+            center = self.X.mean(axis=0)
+            planes = rng.standard_normal((self.n_tables, d, n_bits))
+            weights = np.left_shift(1, np.arange(n_bits, dtype=np.int64))
+            tables = []
+            for t in range(self.n_tables):
+                keys = ((self.X - center) @ planes[t] > 0) @ weights
+                order = np.argsort(keys, kind="stable")
+                tables.append((keys[order], order))
+            self._structure = ("lsh", center, planes, weights, tables)
+        else:
+            self._structure = ("brute",)
+        return self._structure
+
+    def _lsh_candidates(self, x, n_probe):
+        """Union of the references sharing a bucket with x (and its n_probe one-bit neighbours)"""
+        _, center, planes, weights, tables = self._structure
+        probes = np.concatenate([[0], weights[:n_probe]])
+        codes = ((x - center) @ planes > 0) @ weights  # bucket of x in every table
+        found = []
+        for (keys, order), code in zip(tables, codes):
+            buckets = code ^ probes
+            lo = np.searchsorted(keys, buckets)
+            hi = np.searchsorted(keys, buckets + 1)
+            found.extend(order[a:b] for a, b in zip(lo, hi) if b > a)
+        return np.unique(np.concatenate(found)) if found else np.empty(0, dtype=np.int64)
+
+    def _brute(self, x, k, candidates=None):
+        if getattr(self, "_sqnorms", None) is None or len(self._sqnorms) != len(self):
+            self._sqnorms = np.einsum("ij,ij->i", self.X, self.X)
+        X, sqnorms = (self.X, self._sqnorms) if candidates is None else (self.X[candidates], self._sqnorms[candidates])
+        dist = np.sqrt(np.maximum(sqnorms - 2 * (X @ x) + x @ x, 0))
+        k = min(k, len(dist))
+        top = np.argpartition(dist, k - 1)[:k] if k < len(dist) else np.arange(len(dist))
+        top = top[np.argsort(dist[top], kind="stable")]
+        idx = top if candidates is None else candidates[top]
+        return idx, dist[top]
+
+    def query(self, signals, k=5, n_probe=None, exact=False):
+        """
+        Nearest references of one or several signals.
+
+        Parameters
+        ----------
+        signals : DNAsignal, DNAstr, np.ndarray or list
+            Query signal(s); a 1D (or 2D) array is taken as feature vector(s).
+        k : int
+            Number of neighbours (default: 5).
+        n_probe : int or None
+            Number of one-bit neighbouring buckets probed per LSH table (default: all n_bits).
+        exact : bool
+            Scan the whole library regardless of the backend (default: False).
+
+        Returns
+        -------
+        idx : np.ndarray of int
+            (k,) indices of the references (rows of self.X, names in self.names), (m, k) for m queries.
+        dist : np.ndarray
+            Euclidean distances between the feature vectors, same shape as idx.
+            When LSH finds fewer than k candidates, the library is scanned exhaustively.
+        """
+        single = isinstance(signals, (DNAsignal, str)) or (isinstance(signals, np.ndarray) and signals.ndim == 1)
+        if isinstance(signals, np.ndarray):
+            Q = np.atleast_2d(signals).astype(np.float64)
+        else:
+            Q = self._vectorize_all([signals] if single else signals)
+        structure = self._structure or self._build()
+        if Q.shape[1] != self.dim:
+            raise ValueError(f"query dimension {Q.shape[1]} does not match the library ({self.dim})")
+        k = min(int(k), len(self))
+        if exact or structure[0] == "brute":
+            results = [self._brute(x, k) for x in Q]
+        elif structure[0] == "kdtree":
+            dist, idx = structure[1].query(Q, k=k)
+            results = list(zip(np.asarray(idx).reshape(len(Q), k), np.asarray(dist).reshape(len(Q), k)))
+        else:
+            n_bits = structure[2].shape[2]
+            n_probe = n_bits if n_probe is None else min(int(n_probe), n_bits)
+            results = []
+            for x in Q:
+                candidates = self._lsh_candidates(x, n_probe)
+                results.append(self._brute(x, k, candidates) if len(candidates) >= k else self._brute(x, k))
+        idx = np.array([r[0] for r in results], dtype=np.int64)
+        dist = np.array([r[1] for r in results])
+        return (idx[0], dist[0]) if single else (idx, dist)
+
+    def lookup(self, signal, k=5, **kwargs):
+        """List of (name, distance) of the k nearest references of a signal"""
+        idx, dist = self.query(signal, k=k, **kwargs)
+        return [(self.names[i], float(d)) for i, d in zip(idx, dist)]
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_structure"] = None  # rebuilt at the first query
+        return state
+
+    def __repr__(self):
+        features = self.features if isinstance(self.features, str) else getattr(self.features, "__name__", "callable")
+        backend = self._resolved_backend() if len(self) else self.backend
+        return (f"<DNALibraryIndex(n={len(self)}, dim={self.dim}, scale={self.scale}, "
+                f"features='{features}', backend='{backend}')>")
+
+    def __str__(self):
+        return f"<DNALibraryIndex of {len(self)} references (scale {self.scale})>"
+
+
 # --------------------------------------------
 # DNAsignal_collection class
 # This class is intended for 2D intepretation
@@ -4587,14 +8034,17 @@ class DNAsignal_collection(list):
         letter_to_int = {l: i for i, l in enumerate(letters)}
         int_to_letter = {i: l for l, i in letter_to_int.items()}
 
-        # Build numeric matrix
+        # Build numeric matrix (lookup table indexed by ASCII codes)
+        lut = np.zeros(256, dtype=int)
+        for l, i in letter_to_int.items():
+            lut[ord(l)] = i
         mat = np.zeros((m, T), dtype=int)
-        counts = {l: 0 for l in letters}
+        hist = np.zeros(256, dtype=int)
         for i, sig in enumerate(self):
-            seq = sig.codesfull[scale]
-            for t, c in enumerate(seq):
-                mat[i, t] = letter_to_int.get(c, 0)
-                counts[c] = counts.get(c, 0) + 1
+            codes = DNAstr._as_codes(sig.codesfull[scale])
+            mat[i, :min(T, codes.size)] = lut[codes[:T]]
+            hist += np.bincount(codes, minlength=256)
+        counts = {l: int(hist[ord(l)]) for l in letters}
 
         # Plot
         fig, ax = plt.subplots(figsize=figsize)
@@ -8,7 +8,22 @@ Generative Simulation Initiative\olivier.vitrac@gmail.com
 """
 
 import os
-from sig2dna_core.signomics import peaks, signal_collection, DNAsignal
+import hashlib
+import pickle
+import tempfile
+import zlib
+import numpy as np
+import Levenshtein
+import pywt
+from scipy.interpolate import interp1d
+from scipy.spatial.distance import squareform, pdist
+from scipy.cluster.hierarchy import linkage
+from sig2dna_core.signomics import peaks, signal, signal_collection, DNAsignal, DNAsegments, DNAstr
+from sig2dna_core.signomics import DNAalignment, DNAsegmentAlignment, AlignmentCache
+from sig2dna_core.signomics import DNApairwiseAnalysis, DNAdistanceStore, DNALibraryIndex, _ward_nn_chain
+import sig2dna_core.signomics as signomics_module
+from sig2dna_core.signomics import WaveletKernelCache, _wavelet_kernel, _cwt_batch
+from sig2dna_core.signomics import _jaccard_incidence, _jaccard_from_incidence, _jaccard_width, _jaccard_distances
 
 # %% Output configuration
 outputfolder = "./images" if os.path.isdir("./images") else ("../images" if os.path.isdir("../images") else None)
@@ -51,3 +66,473 @@ s_dna.codesfull[4].align(s_dna.codesfull[16],"bio")
 s_dna.codesfull[4].plot_mask() # plot alignment mask
 fig4vs16,_ = s_dna.codesfull[4].plot_alignment()
 fig4vs16.print("test_simple_alignment_scale16vs4")
+
+# %% ----------------------------------------------
+# 2. Batched CWT engine (user-001)
+# ----------------------------------------------
+
+# the FFT engine (default) and pywt.cwt give the same coefficients and the same DNA codes
+for sig in (s, s_noisy):
+    s_fft, s_pywt = DNAsignal(sig), DNAsignal(sig)
+    s_fft.compute_cwt(method="fft")
+    s_pywt.compute_cwt(method="pywt")
+    assert np.allclose(s_fft.cwt_block, s_pywt.cwt_block, rtol=0, atol=1e-12)
+    s_fft.encode_dna()
+    s_pywt.encode_dna()
+    for scale in s_fft.scales:
+        assert s_fft.codes[scale]["letters"] == s_pywt.codes[scale]["letters"], f"codes differ at scale {scale}"
+# flat regions (zero baseline, offset plateaus) are resolved without recomputing most coefficients
+x_flat = np.arange(20000, dtype=float)
+y_flat = sum(a * np.exp(-(x_flat - c)**2 / (2 * w**2)) for a, c, w in ((1, 3000, 20), (2, 9000, 60), (.5, 15000, 8)))
+y_flat[np.abs(y_flat) < 1e-6] = 0.0
+recomputed, cwt_direct = [], signomics_module._cwt_direct
+def counting_cwt_direct(data, kernel, scale, idx, values=None):
+    recomputed.append(idx.size)
+    return cwt_direct(data, kernel, scale, idx, values)
+signomics_module._cwt_direct = counting_cwt_direct
+try:
+    for y_test in (y_flat, y_flat + 0.3, np.round(y_flat * 3) / 3):
+        recomputed.clear()
+        block_fft = _cwt_batch(y_test, [1, 2, 4, 8, 16, 32])
+        assert sum(recomputed) < 0.05 * block_fft.size, sum(recomputed)
+        block_pywt, _ = pywt.cwt(y_test, [1, 2, 4, 8, 16, 32], "mexh")
+        for seg_fft, seg_pywt in zip(DNAsignal._segment_monotonic(block_fft, x_flat),
+                                     DNAsignal._segment_monotonic(block_pywt, x_flat)):
+            assert np.array_equal(seg_fft.letters, seg_pywt.letters) and np.array_equal(seg_fft.start, seg_pywt.start)
+finally:
+    signomics_module._cwt_direct = cwt_direct
+# kernels too short for a direct convolution keep the given (FFT) values
+assert np.array_equal(cwt_direct(y_flat, np.ones(1), 0.1, np.array([3, 4]), np.array([0.5, -0.5])), [0.5, -0.5])
+
+# %% ----------------------------------------------
+# 3. Wavelet kernel cache (user-002)
+# ----------------------------------------------
+
+# kernels are computed once, shared read-only, and evicted in LRU order
+kcache = WaveletKernelCache(maxsize=3)
+k1 = kcache.kernel("mexh", 4)
+assert np.array_equal(k1, _wavelet_kernel("mexh", 4)) and not k1.flags.writeable
+assert kcache.kernel("mexh", 4) is k1 and kcache.hits == 1
+for scale in (1, 2, 8, 16):
+    kcache.kernel("mexh", scale)
+assert len(kcache) <= 3
+# cached and uncached transforms are identical
+assert np.array_equal(_cwt_batch(s.y, [1, 4, 16], cache=kcache), _cwt_batch(s.y, [1, 4, 16], cache=False))
+
+# %% ----------------------------------------------
+# 4. Lazy transforms (user-003)
+# ----------------------------------------------
+
+# compute_cwt stores coefficients only, signal wrappers are built on first access and cached
+s_lazy = DNAsignal(s)
+s_lazy.compute_cwt()
+assert s_lazy._transforms is None
+assert len(s_lazy.transforms) == len(s_lazy.scales) and s_lazy.transforms is s_lazy.transforms
+for sig, scale in zip(s_lazy.transforms, s_lazy.scales):  # collections share a resampled x grid
+    assert sig.name == f"CWT_scale_{scale}"
+    assert np.allclose(sig.y, np.interp(sig.x, s_lazy.x, s_lazy.cwt_coeffs[scale]))
+# legacy pickles hold a `transforms` attribute and per-scale arrays without cwt_block
+state = {k: v for k, v in s_lazy.__dict__.items() if k not in ("_transforms", "cwt_block")}
+state["transforms"] = s_lazy.transforms
+state["cwt_coeffs"] = {scale: c.copy() for scale, c in s_lazy.cwt_coeffs.items()}
+legacy = DNAsignal.__new__(DNAsignal)
+legacy.__setstate__(state)
+assert legacy.transforms is s_lazy.transforms and legacy.cwt_block.shape == s_lazy.cwt_block.shape
+assert all(np.shares_memory(legacy.cwt_coeffs[scale], legacy.cwt_block) for scale in legacy.scales)
+legacy.encode_dna(); s_lazy.encode_dna()
+assert all(np.array_equal(legacy.codes[scale].letters, s_lazy.codes[scale].letters) for scale in s_lazy.scales)
+legacy = pickle.loads(pickle.dumps(legacy))
+assert legacy._transforms is not None and np.array_equal(legacy.cwt_block, s_lazy.cwt_block)
+
+# %% ----------------------------------------------
+# 5. Vectorized run-length segmenter (user-004)
+# ----------------------------------------------
+
+def reference_segments(coef, x):
+    """Segment-by-segment loop of the original encode_dna (letters, widths, iloc)"""
+    ends = np.append(np.where(np.diff(np.sign(np.diff(coef))) != 0)[0] + 1, len(coef) - 1)
+    letters, widths, iloc, start = [], [], [], 0
+    for count, idx in enumerate(ends):
+        letters.append(DNAsignal._get_letter(coef[start], coef[idx]) if idx > start else '_')
+        widths.append(x[idx] - x[start])
+        iloc.append((start, idx + 1 if count == len(ends) - 1 else idx))
+        start = idx
+    return ''.join(letters), widths, iloc
+
+s_seg = DNAsignal(s_noisy)
+s_seg.compute_cwt()
+s_seg.encode_dna()
+for scale in s_seg.scales:
+    letters, widths, iloc = reference_segments(s_seg.cwt_coeffs[scale], s_seg.x)
+    code = s_seg.codes[scale]
+    assert code["letters"] == letters, f"letters differ at scale {scale}"
+    assert np.allclose(code["widths"], widths) and [tuple(map(int, ij)) for ij in code["iloc"]] == iloc
+
+# %% ----------------------------------------------
+# 6. Columnar DNAsegments tables (user-005)
+# ----------------------------------------------
+
+# array-backed tables keep the legacy dict access and round-trip through dict/pickle
+code = s_seg.codes[4]
+assert isinstance(code, DNAsegments) and code.n == len(code["letters"]) == len(code["widths"])
+assert code["xloc"][1][0] == s_seg.x[code["iloc"][1][0]] and code.get("dx") == code.dx
+legacy = DNAsegments.from_dict(dict(code))
+assert legacy.letters == code.letters and np.array_equal(legacy.start, code.start)
+assert np.allclose(legacy.xloc, code.xloc)
+assert pickle.loads(pickle.dumps(code)).letters == code.letters
+
+# %% ----------------------------------------------
+# 7. All scales in one pass, fused encode_all (user-006)
+# ----------------------------------------------
+
+# encode_dna encodes every requested scale; encode_all = compute_cwt + encode_dna + encode_dna_full
+s_all = DNAsignal(s_noisy)
+s_all.encode_all()
+assert sorted(s_all.codes) == sorted(s_all.codesfull) == sorted(s_seg.scales)
+for scale in s_seg.scales:
+    assert s_all.codes[scale]["letters"] == s_seg.codes[scale]["letters"]
+s_seg.encode_dna_full()
+assert all(s_all.codesfull[scale] == s_seg.codesfull[scale] for scale in s_seg.scales)
+
+# %% ----------------------------------------------
+# 8. Vectorized full-resolution strings (user-007)
+# ----------------------------------------------
+
+def reference_full_x(code, n_points):
+    """Original builder of the resolution='x' strings (nearest segment center)"""
+    centers = [(x1 + x2) / 2 for x1, x2 in code["xloc"]]
+    grid = np.linspace(code["xloc"][0][0], code["xloc"][-1][1], n_points, endpoint=True)
+    ints = [ord(ch) for ch in code["letters"]]
+    nearest = interp1d(centers, ints, kind="nearest", bounds_error=False, fill_value=ints[-1])
+    return ''.join(chr(int(i)) for i in np.round(nearest(grid)))
+
+# the number of points is set by the first scale and shared by all scales (as originally)
+rng = np.random.default_rng(2)
+x_ref = np.linspace(0, 119, 424)
+y_ref = sum(np.exp(-(x_ref - rng.uniform(0, 119)) ** 2 / rng.uniform(.5, 5)) for _ in range(5))
+sig_ref = signal(x=x_ref, y=y_ref + rng.normal(0, 0.01, x_ref.size))
+s_full = DNAsignal(sig_ref)
+s_full.compute_cwt()
+s_full.encode_dna()
+first = s_full.codes[s_full.scales[0]]
+n_ref = int(np.ceil(sum(x2 - x1 for x1, x2 in first["xloc"]) * 10))
+for codesfull in (s_full.encode_dna_full(resolution="x"), DNAsignal(sig_ref).encode_all(resolution="x").codesfull):
+    for scale in s_full.scales:
+        assert str(codesfull[scale]) == reference_full_x(s_full.codes[scale], n_ref), f"scale {scale}"
+# index resolution: each letter repeated over its index span
+assert str(s_full.encode_dna_full()[4]) == ''.join(
+    letter * max(1, j - i) for letter, (i, j) in zip(s_full.codes[4]["letters"], s_full.codes[4]["iloc"]))
+
+# %% ----------------------------------------------
+# 9. Byte-backed DNAstr (user-008)
+# ----------------------------------------------
+
+# the uint8 view, counts and from_codes agree with the str content
+seq = DNAstr("YYAAZZB__AZ", dx=0.5)
+assert seq.codes.dtype == np.uint8 and not seq.codes.flags.writeable
+assert bytes(seq.codes) == b"YYAAZZB__AZ" and seq.letter_counts == {'A': 3, 'B': 1, 'Y': 2, 'Z': 3, '_': 2}
+rebuilt = DNAstr.from_codes(seq.codes, dx=0.5)
+assert rebuilt == seq and rebuilt.dx == 0.5 and np.array_equal(rebuilt.counts, seq.counts)
+assert str(s_all.codesfull[4]).encode() == bytes(s_all.codesfull[4].codes) and s_all.codesfull[4].codes.size == len(s_all.codesfull[4])
+
+# %% ----------------------------------------------
+# 10. Lazy DNAstr digest (user-009)
+# ----------------------------------------------
+
+# no hashing at construction, digests are computed on demand
+seq = DNAstr("YAZB" * 1000)
+assert seq.__dict__.get("_hash_value") is None
+assert seq._hash == hashlib.sha256(str(seq).encode()).hexdigest() == seq.__dict__["_hash_value"]
+assert seq.digest("blake2b") == hashlib.blake2b(str(seq).encode(), digest_size=16).hexdigest()
+assert seq.digest("crc32") == f"{zlib.crc32(str(seq).encode()):08x}"
+
+# %% ----------------------------------------------
+# 11. Immutable alignment results (user-010)
+# ----------------------------------------------
+
+# align returns a DNAalignment that unpacks as (aligned_self, aligned_other) and cannot be mutated
+A, B = DNAstr("AABBCCYYZZ"), DNAstr("AACBCCYZZ")
+aln = A.align(B)
+aligned_self, aligned_other = aln
+assert isinstance(aln, DNAalignment) and A.alignment is aln and A.aligned_with == aligned_self
+assert aln.mask == "==*==== ==" and aln.stats == {'matches': 8, 'substitutions': 1, 'gaps': 1}
+assert aln.query == str(A) and aln.reference == str(B)
+try:
+    aln.engine = "bio"
+    raise AssertionError("DNAalignment must be immutable")
+except AttributeError:
+    pass
+assert pickle.loads(pickle.dumps(aln)) == aln
+# store=False leaves the sequences untouched (results can be shared between partners)
+C = DNAstr("AAZZ")
+assert A.align(C, store=False).reference == "AAZZ" and A.alignment is aln
+
+# %% ----------------------------------------------
+# 12. Alignment cache (user-011)
+# ----------------------------------------------
+
+# alignments are cached by content digest (memoised per algorithm), caching is opt-in
+assert AlignmentCache.default is None
+acache = AlignmentCache()
+A, B = DNAstr("YAZB" * 50), DNAstr("YAZZB" * 40)
+first = acache.align(A, B)
+assert acache.align(DNAstr(str(A)), DNAstr(str(B))) is first and (acache.hits, acache.misses) == (1, 1)
+assert first == A.align(B, store=False) and set(A.__dict__["_digests"]) == {acache.digest}
+assert AlignmentCache.enable_default() is AlignmentCache.default
+AlignmentCache.disable_default()
+assert AlignmentCache.default is None
+
+# %% ----------------------------------------------
+# 13. Process-pool pairwise builders (user-012)
+# ----------------------------------------------
+
+class CodedSignal(DNAsignal):
+    """DNAsignal holding only full codes at scale 4 (fast fixtures for the pairwise builders)"""
+    def __init__(self, sequence, name):
+        self.codesfull = {4: DNAstr(sequence)}
+        self.name = name
+
+rng = np.random.default_rng(12)
+library = [CodedSignal(''.join(rng.choice(list("YAZB_"), int(rng.integers(60, 120)))), f"ref{i}") for i in range(12)]
+
+# parallel runs give exactly the serial distances
+for builder, opts in ((DNAsignal._pairwiseEntropyDistance, {}),
+                      (DNAsignal._pairwiseLevenshteinDistance, {"use_alignment": True})):
+    serial = builder(library, scale=4, **opts)
+    parallel = builder(library, scale=4, n_jobs=2, **opts)
+    assert np.array_equal(serial.D, parallel.D), builder.__name__
+# Jensen-Shannon workers apply the closed form of the serial builder to their segments of rows
+serial = DNAsignal._pairwiseJensenShannonDistance(library, scale=4)
+parallel = DNAsignal._pairwiseJensenShannonDistance(library, scale=4, n_jobs=3)
+assert np.allclose(serial.condensed, parallel.condensed, rtol=0, atol=1e-14)
+assert np.isclose(parallel.D[7, 2], library[7].codesfull[4].jensen_shannon(library[2].codesfull[4]))
+
+# %% ----------------------------------------------
+# 14. Banded global aligner (user-013)
+# ----------------------------------------------
+
+def global_score(a, b, match=1, mismatch=-1, gap=-1):
+    """Needleman-Wunsch optimal score (reference for the banded engine)"""
+    prev = [j * gap for j in range(len(b) + 1)]
+    for i, ca in enumerate(a, 1):
+        row = [i * gap]
+        for j, cb in enumerate(b, 1):
+            row.append(max(prev[j - 1] + (match if ca == cb else mismatch), prev[j] + gap, row[j - 1] + gap))
+        prev = row
+    return prev[-1]
+
+def aligned_score(aln, match=1, mismatch=-1, gap=-1):
+    st = aln.stats
+    return match * st["matches"] + mismatch * st["substitutions"] + gap * st["gaps"]
+
+A, B = library[0].codesfull[4], library[1].codesfull[4]
+full = A.align(B, engine="banded", engineOpts={"band": max(len(A), len(B))}, store=False)
+assert aligned_score(full) == global_score(str(B), str(A))
+for opts in ({"band": 8}, {"band": 8, "anchors": "motifs"}):  # narrow bands remain valid alignments
+    aln = A.align(B, engine="banded", engineOpts=opts, store=False)
+    assert aln.query == str(A) and aln.reference == str(B) and aligned_score(aln) <= aligned_score(full)
+
+# %% ----------------------------------------------
+# 15. Run-length alignment of segments (user-014)
+# ----------------------------------------------
+
+# run-level alignments carry their widths and expand to a full-resolution alignment with the same stats
+rle_opts = {"expand": False}
+A, B = library[2].codesfull[4], library[3].codesfull[4]
+runs = A.align(B, engine="rle", engineOpts=rle_opts, store=False)
+assert isinstance(runs, DNAsegmentAlignment) and runs.stats == runs.expand().stats
+assert runs.expand().query == str(A) and runs.expand().reference == str(B)
+# a cache hit from the on-disk tier gives the same result as a miss (widths are stored)
+with tempfile.TemporaryDirectory() as cachedir:
+    dcache = AlignmentCache(cachedir)
+    fresh = dcache.align(A, B, engine="rle", engineOpts=rle_opts)
+    dcache.close()
+    dcache = AlignmentCache(cachedir)
+    reloaded = dcache.align(DNAstr(str(A)), DNAstr(str(B)), engine="rle", engineOpts=rle_opts)
+    assert dcache.hits == 1 and isinstance(reloaded, DNAsegmentAlignment) and reloaded == fresh
+    assert reloaded.stats == fresh.stats and reloaded.mutual_entropy == fresh.mutual_entropy
+    D_fresh = DNAsignal._pairwiseEntropyDistance(library[:5], scale=4, engine="rle", engineOpts=rle_opts).D
+    D_cached = DNAsignal._pairwiseEntropyDistance(library[:5], scale=4, engine="rle", engineOpts=rle_opts, cache=dcache).D
+    dcache.close()
+    dcache = AlignmentCache(cachedir)
+    D_disk = DNAsignal._pairwiseEntropyDistance(library[:5], scale=4, engine="rle", engineOpts=rle_opts, cache=dcache).D
+    dcache.close()
+    assert np.array_equal(D_fresh, D_cached) and np.array_equal(D_fresh, D_disk)
+
+# %% ----------------------------------------------
+# 16. Bulk Levenshtein engine (user-015)
+# ----------------------------------------------
+
+# condensed bulk distances equal the pair-by-pair edit distances (builder and DNAstr API)
+sequences = [o.codesfull[4] for o in library]
+pairs = [(i, j) for i in range(len(sequences)) for j in range(i + 1, len(sequences))]
+expected = np.array([Levenshtein.distance(str(sequences[i]), str(sequences[j])) for i, j in pairs])
+assert np.array_equal(DNAstr.pairwise_levenshtein(sequences), expected)
+assert np.array_equal(DNAsignal._pairwiseLevenshteinDistance(library, scale=4).condensed, expected)
+
+# %% ----------------------------------------------
+# 17. Closed-form Jensen-Shannon builder (user-016)
+# ----------------------------------------------
+
+# matrix-level distances equal the per-pair DNAstr.jensen_shannon (scipy, base 2)
+expected = np.array([sequences[i].jensen_shannon(sequences[j]) for i, j in pairs])
+assert np.allclose(DNAstr.pairwise_jensen_shannon(sequences), expected, rtol=0, atol=1e-12)
+assert np.allclose(DNAsignal._pairwiseJensenShannonDistance(library, scale=4).condensed, expected, rtol=0, atol=1e-12)
+
+# %% ----------------------------------------------
+# 18. Jaccard motif distance (user-017)
+# ----------------------------------------------
+
+# sparse incidence distances equal the set-based Jaccard distances of the motif start positions
+motif_blocks = ["YYAAZZBB", "YAZB", "YYYAZZB", "AZB_", "__"]
+motif_library = [CodedSignal(''.join(rng.choice(motif_blocks, 30)), f"motif{i}") for i in range(8)]
+starts = [set(o.codesfull[4].extract_motifs(plot=False)["start"]) for o in motif_library]
+assert all(starts)
+expected = np.array([1 - len(starts[i] & starts[j]) / len(starts[i] | starts[j])
+                     for i in range(len(starts)) for j in range(i + 1, len(starts))])
+J = DNAsignal._pairwiseJaccardMotifDistance(motif_library, scale=4, plot=False)
+assert np.allclose(J.condensed, expected, rtol=0, atol=1e-12)
+# row blocks sliced from the incidence matrix built once equal the distances of the block alone
+starts = [np.array(sorted(st)) for st in starts]
+X, counts = _jaccard_incidence(starts, _jaccard_width(starts))
+assert np.array_equal(_jaccard_from_incidence(X[2:5], counts[2:5], X, counts), _jaccard_distances(starts[2:5], starts))
+
+# %% ----------------------------------------------
+# 19. Condensed distance storage (user-018)
+# ----------------------------------------------
+
+# analyses keep the upper triangle only; the square matrix is rebuilt on demand
+L = DNAsignal._pairwiseLevenshteinDistance(library, scale=4)
+assert L.condensed.shape == (len(pairs),) and np.array_equal(L.D, squareform(L.condensed))
+L32 = L.astype(np.float32)
+assert L32.dtype == np.float32 and np.allclose(L32.D, L.D)
+square = DNApairwiseAnalysis(L.D, L.names, None)
+assert np.array_equal(square.condensed, L.condensed)
+# pickles of the square-matrix layout are still readable
+legacy_state = {k: v for k, v in L.__getstate__().items() if k != "_d"} | {"D": L.D}
+legacy = DNApairwiseAnalysis.__new__(DNApairwiseAnalysis)
+legacy.__setstate__(legacy_state)
+assert np.array_equal(legacy.condensed, L.condensed)
+
+# %% ----------------------------------------------
+# 20. Incremental append of samples (user-019)
+# ----------------------------------------------
+
+# extend() computes only the new rows, its distances equal those of a full rebuild
+JS = DNAsignal._pairwiseJensenShannonDistance(library[:8], scale=4)
+JS.extend(library[8:])
+rebuilt = DNAsignal._pairwiseJensenShannonDistance(library, scale=4)
+assert JS.names == rebuilt.names and np.allclose(JS.condensed, rebuilt.condensed, rtol=0, atol=1e-12)
+assert JS.coords.shape[0] == len(library)
+
+# %% ----------------------------------------------
+# 21. Classical PCoA engine (user-020)
+# ----------------------------------------------
+
+# non-Euclidean distances (large negative eigenvalues): every solver returns the largest algebraic axes
+n_pcoa = 400
+Xp, Xn = rng.normal(size=(n_pcoa, 4)) * [3, 2.5, 2, 1.5], rng.normal(size=(n_pcoa, 40))
+G = Xp @ Xp.T - Xn @ Xn.T
+D2 = np.diag(G)[:, None] + np.diag(G)[None, :] - 2 * G
+D2 -= D2[np.triu_indices(n_pcoa, 1)].min()
+np.fill_diagonal(D2, 0)
+d_pcoa = np.sqrt(squareform(D2, checks=False))
+C_dense, w_dense = DNApairwiseAnalysis._classical_pcoa(d_pcoa, n_pcoa, 4, solver="dense")
+assert w_dense.min() < -0.1 * w_dense.max()
+for solver in ("randomized", "blocked", "eigsh"):
+    C, w = DNApairwiseAnalysis._classical_pcoa(d_pcoa, n_pcoa, 4, solver=solver)
+    assert np.allclose(np.sort(w)[::-1][:4], w_dense[:4], rtol=1e-6), solver
+    assert np.allclose(C, C_dense, atol=1e-3 * np.abs(C_dense).max()), solver
+# classical PCoA of Euclidean distances recovers the configuration (same distances on all axes)
+P = DNApairwiseAnalysis(pdist(Xp), [f"p{i}" for i in range(n_pcoa)], None)
+assert P.pcoa_method == "classical" and np.allclose(pdist(P.coords), pdist(Xp))
+
+# %% ----------------------------------------------
+# 22. Single-pass variance curve (user-021)
+# ----------------------------------------------
+
+# the cumulative curve equals the distances summed on the first d axes, recomputed for each d
+dhalf, fig = JS.dimension_variance_curve(threshold=0.5, plot=False)
+curve = [pdist(JS.coords[:, :d]).sum() for d in range(1, JS.coords.shape[1] + 1)]
+assert fig is None and np.allclose(JS.variance_curve, np.array(curve) / curve[-1])
+assert dhalf == next(d for d, v in enumerate(JS.variance_curve, 1) if v >= 0.5)
+
+# %% ----------------------------------------------
+# 23. Scalable clustering backend (user-022)
+# ----------------------------------------------
+
+# the nearest-neighbour chain reproduces scipy's ward linkage, tie-breaking included (integer grid, duplicates)
+for seed in (2, 3, 4, 5):
+    Xt = np.random.default_rng(seed).integers(0, 4, (40, 2)).astype(float)
+    Zt, Zs = _ward_nn_chain(Xt), linkage(Xt, 'ward')
+    assert np.array_equal(Zt[:, [0, 1, 3]], Zs[:, [0, 1, 3]]) and np.allclose(Zt[:, 2], Zs[:, 2]), seed
+Zt, Zs = _ward_nn_chain(Xp), linkage(Xp, 'ward')
+assert np.array_equal(Zt[:, [0, 1, 3]], Zs[:, [0, 1, 3]]) and np.allclose(Zt[:, 2], Zs[:, 2])
+# both backends of compute_linkage give the same tree on the selected dimensions
+Z_nn = JS.compute_linkage(backend='nnchain')
+assert np.allclose(Z_nn, linkage(JS.reduced_distances(condensed=True), method='ward'))
+
+# %% ----------------------------------------------
+# 24. Columnar analysis archive (user-023)
+# ----------------------------------------------
+
+# the archive records the signals file relative to itself: both can be moved together
+with tempfile.TemporaryDirectory() as tmp:
+    os.mkdir(os.path.join(tmp, "run"))
+    JS.save(os.path.join(tmp, "run", "analysis.npz"), signals_path=os.path.join(tmp, "run", "signals.pkl"))
+    os.rename(os.path.join(tmp, "run"), os.path.join(tmp, "moved"))
+    JS2 = DNApairwiseAnalysis.load(os.path.join(tmp, "moved", "analysis.npz"), load_signals=True)
+    assert JS2.names == JS.names and np.array_equal(JS2.condensed, JS.condensed)
+    assert JS2._signal_digests() == JS._signal_digests() and all(JS2._signal_digests())
+    JS3 = DNApairwiseAnalysis.load(os.path.join(tmp, "moved", "analysis.npz"), mmap_mode="r")
+    assert np.array_equal(JS3.condensed, JS.condensed) and np.allclose(JS3.coords, JS.coords)
+
+# %% ----------------------------------------------
+# 25. Disk-backed distance store (user-024)
+# ----------------------------------------------
+
+# a builder writing into a store gives the in-memory distances; rows, submatrices and neighbours read from disk
+Dfull = squareform(rebuilt.condensed)
+with tempfile.TemporaryDirectory() as tmp:
+    store = DNAdistanceStore(len(library), os.path.join(tmp, "library.dist"), block_rows=5)
+    A_store = DNAsignal._pairwiseJensenShannonDistance(library, scale=4, out=store)
+    assert A_store.store is store and np.allclose(store.d, rebuilt.condensed, rtol=0, atol=1e-12)
+    assert np.allclose(store.rows(3, 9), Dfull[3:9], rtol=0, atol=1e-12)
+    assert np.array_equal(np.vstack([store.rows(i0, i1) for i0, i1 in store.row_blocks()]), squareform(store.d))
+    # the blocked PCoA streams the upper triangle once per product and matches the dense solver
+    w_blocked, V_blocked = DNApairwiseAnalysis._blocked_pcoa(store.d, len(library), 3, block_rows=5)
+    C_dense, w_dense = DNApairwiseAnalysis._classical_pcoa(rebuilt.condensed, len(library), 3, solver="dense")
+    assert np.allclose(np.sort(w_blocked)[::-1][:3], w_dense[:3], rtol=1e-6)
+    assert np.allclose(store.submatrix([7, 1, 10]), Dfull[np.ix_([7, 1, 10], [7, 1, 10])], rtol=0, atol=1e-12)
+    idx, dist = store.nearest(4, k=3)
+    assert list(idx) == list(np.argsort(np.where(np.arange(len(library)) == 4, np.inf, Dfull[4]))[:3])
+    assert np.allclose(dist, Dfull[4, idx], rtol=0, atol=1e-12)
+    store.flush()
+    reopened = DNAdistanceStore.open(os.path.join(tmp, "library.dist"))
+    assert reopened.n == len(library) and reopened.dtype == np.float64
+    assert np.array_equal(np.asarray(reopened.d), np.asarray(store.d))
+    reopened.close(); store.close()
+
+# %% ----------------------------------------------
+# 26. Library lookup index (user-025)
+# ----------------------------------------------
+
+# KD-tree and brute force agree with the exhaustive scan, LSH finds the exact match of every reference
+for features, backend in (("histogram", "kdtree"), ("profile", "brute"), ("profile", "lsh")):
+    index = DNALibraryIndex(scale=4, features=features, backend=backend).add(library)
+    idx_exact, dist_exact = index.query(library, k=3, exact=True)
+    idx_q, dist_q = index.query(library, k=3)
+    if backend == "lsh":
+        assert np.array_equal(idx_q[:, 0], np.arange(len(library))) and np.allclose(dist_q[:, 0], 0, atol=1e-6)
+    else:
+        assert np.array_equal(idx_q, idx_exact) and np.allclose(dist_q, dist_exact)
+    name, dist = index.lookup(library[5], k=1)[0]
+    assert name == library[5].name and dist < 1e-6
+# the exact scan returns the Euclidean distances between the feature vectors
+index = DNALibraryIndex(scale=4, features="profile", backend="lsh").add(library)
+idx_exact, dist_exact = index.query(library[0], k=len(library), exact=True)
+assert np.allclose(dist_exact, np.sort(np.linalg.norm(index.X - index.vectorize(library[0]), axis=1)), atol=1e-6)
+# pickling drops the search structure, the restored index answers the same queries
+restored = pickle.loads(pickle.dumps(index))
+assert restored._structure is None and restored.names == index.names
+assert restored.lookup(library[7], k=3) == index.lookup(library[7], k=3)
@@ -1,2 +1,2 @@
 # __all__ for sig2dna_core.signomics
-__all__ = ['DNACodes', 'DNAFullCodes', 'DNApairwiseAnalysis', 'DNAsignal', 'DNAsignal_collection', 'DNAstr', 'SinusoidalEncoder', 'generator', 'import_local_module', 'peaks', 'signal', 'signal_collection']
+__all__ = ['AlignmentCache', 'DNACodes', 'DNAFullCodes', 'DNALibraryIndex', 'DNAalignment', 'DNAdistanceStore', 'DNApairwiseAnalysis', 'DNAsegmentAlignment', 'DNAsegments', 'DNAsignal', 'DNAsignal_collection', 'DNAstr', 'SinusoidalEncoder', 'WaveletKernelCache', 'generator', 'import_local_module', 'peaks', 'signal', 'signal_collection']